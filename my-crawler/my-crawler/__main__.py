@@ -1,6 +1,24 @@
+import argparse
 import asyncio
 
 from .main import main
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description='Crawl listings found for a natural language query.')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue from the last checkpoint after a crash')
+    parser.add_argument('--fetch-mode', choices=('adaptive', 'browser'), default='adaptive')
+    parser.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on this port')
+    parser.add_argument('--no-prewarm', dest='prewarm', action='store_false',
+                        help='Let each extraction worker load its own models')
+    parser.add_argument('--shards', type=int, default=0,
+                        help='Split the crawl by domain over this many worker processes')
+    args = parser.parse_args()
+
+    asyncio.run(main(
+        fetch_mode=args.fetch_mode,
+        metrics_port=args.metrics_port,
+        prewarm=args.prewarm,
+        resume=args.resume,
+        shards=args.shards
+    ))
@@ -0,0 +1,280 @@
+from crawlee import ConcurrencySettings, Request
+from crawlee.configuration import Configuration
+from crawlee.beautifulsoup_crawler import BeautifulSoupCrawler, BeautifulSoupCrawlingContext
+from crawlee.playwright_crawler import PlaywrightCrawler
+from crawlee.router import Router
+from crawlee.storages import RequestQueue
+from urllib.parse import urlparse
+from typing import Dict, List, Optional
+import json
+import logging
+import os
+
+from .routes import router, detect_content_type, remember_page, skip_duplicate, store_page
+from .near_dedup import get_dedup_index, rough_visible_text, content_hash
+from .page_state import get_page_state
+from .extraction_pool import get_extraction_executor
+from .storage_utils import storage_path
+from .load_profile import LoadProfile, make_browser_pool
+from .browser_pool import BrowserPoolSettings, browser_concurrency
+from .politeness import PolitenessScheduler, PoliteHttpClient
+from .frontier_queue import BROWSER_LANE
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+class DomainFetchPolicy:
+    """
+    Learns per domain whether a plain HTTP fetch is enough.
+
+    Every HTTP attempt is recorded as served or escalated. Once a domain has
+    `min_samples` attempts and more than `max_escalation_rate` of them needed
+    the browser, its pages go straight to Playwright. The counts are saved
+    between runs.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 min_samples: int = 3,
+                 max_escalation_rate: float = 0.5):
+        self.path = path or storage_path('fetch_policy.json')
+        self.min_samples = min_samples
+        self.max_escalation_rate = max_escalation_rate
+        self.domains: Dict[str, Dict[str, int]] = {}
+
+    def load(self) -> 'DomainFetchPolicy':
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.domains = json.load(f)
+            except Exception as e:
+                logger.debug(f"Failed to load fetch policy: {str(e)}")
+        return self
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.domains, f, indent=2)
+
+    def record(self, url: str, served_by_http: bool) -> None:
+        stats = self.domains.setdefault(urlparse(url).netloc, {'http': 0, 'browser': 0})
+        stats['http' if served_by_http else 'browser'] += 1
+
+    def prefers_browser(self, url: str) -> bool:
+        stats = self.domains.get(urlparse(url).netloc)
+        if not stats:
+            return False
+        attempts = stats['http'] + stats['browser']
+        if attempts < self.min_samples:
+            return False
+        return stats['browser'] / attempts > self.max_escalation_rate
+
+
+class AdaptiveCrawler:
+    """
+    Fetches pages over plain HTTP first and renders them only when needed.
+
+    Pages whose static HTML yields a record (structured data or a profile
+    match) never start a browser. The rest, plus domains the policy has
+    learned need rendering, are crawled afterwards by a PlaywrightCrawler
+    using the regular router. `max_requests_per_crawl` is one budget for
+    both passes: the browser pass gets what the HTTP pass left.
+
+    With a `request_provider` (a distributed worker's shard of the shared
+    frontier) the HTTP pass takes its requests from there instead of a
+    private queue. Escalated pages then move to the shard's browser lane,
+    and the browser pass crawls that lane, so the links it finds go through
+    the frontier and its budgets too.
+    """
+
+    def __init__(self,
+                 max_requests_per_crawl: Optional[int] = 50,
+                 policy: Optional[DomainFetchPolicy] = None,
+                 load_profile: Optional[LoadProfile] = None,
+                 scheduler: Optional[PolitenessScheduler] = None,
+                 concurrency_settings: Optional[ConcurrencySettings] = None,
+                 configuration: Optional[Configuration] = None,
+                 request_provider=None,
+                 pool_settings: Optional[BrowserPoolSettings] = None,
+                 **browser_options):
+        self.max_requests_per_crawl = max_requests_per_crawl
+        self.policy = policy or DomainFetchPolicy().load()
+        self.load_profile = load_profile
+        self.scheduler = scheduler or PolitenessScheduler()
+        self.concurrency_settings = concurrency_settings
+        self.configuration = configuration
+        self.request_provider = request_provider
+        self.pool_settings = pool_settings
+        self.browser_options = browser_options
+        self.escalated: List[str] = []
+        # Pages the HTTP pass served itself; they count against the browser pass's budget
+        self.http_served = 0
+        # Set once the HTTP pass has finished, so a resumed crawl skips it
+        self.http_done = False
+        self.http_router = Router[BeautifulSoupCrawlingContext]()
+        self.http_router.default_handler(self._http_handler)
+
+    async def _http_handler(self, context: BeautifulSoupCrawlingContext) -> None:
+        url = context.request.url
+        page_state = get_page_state()
+
+        if context.http_response.status_code == 304:
+            # Conditional request: the server says nothing changed
+            state = page_state.not_modified(url)
+            if state is not None and state.extracted_data:
+                context.log.info(f'{url} not modified since last crawl')
+                METRICS.count('http_pages', outcome='not_modified')
+                self._served(url)
+                await store_page(context, {'url': url, 'title': state.extracted_data.get('title')},
+                                 state.extracted_data)
+            else:
+                self._escalate(context.request)
+            return
+
+        body = context.http_response.read()
+        html = body.decode(context.soup.original_encoding or 'utf-8', errors='replace')
+        with METRICS.span('detect_content_type'):
+            content_type = detect_content_type(url, html)
+
+        context.log.info(f'Processing {url} as {content_type} over HTTP')
+        data_dict = {
+            'url': url,
+            'title': context.soup.title.get_text(strip=True) if context.soup.title else None
+        }
+
+        text = rough_visible_text(html)
+        text_hash = content_hash(text).hex()
+
+        state = page_state.unchanged(url, text_hash)
+        if state is not None:
+            if state.extracted_data:
+                context.log.info(f'{url} unchanged since last crawl')
+                METRICS.count('http_pages', outcome='unchanged')
+                self._served(url)
+                await store_page(context, data_dict, state.extracted_data)
+            else:
+                # Last time this page needed the browser
+                self._escalate(context.request)
+            return
+
+        fingerprint = get_dedup_index().fingerprint(text)
+        if await skip_duplicate(context, data_dict, fingerprint):
+            METRICS.count('http_pages', outcome='duplicate')
+            self._served(url)
+            return
+
+        extracted_data: dict = await get_extraction_executor().extract(
+            html=html,
+            url=url,
+            content_type=content_type
+        )
+
+        if extracted_data and not extracted_data.get('error'):
+            self._served(url)
+            METRICS.count('http_pages', outcome='served')
+            remember_page(context, text_hash, extracted_data, context.http_response.headers)
+            await store_page(context, data_dict, extracted_data, fingerprint)
+        else:
+            self._escalate(context.request)
+
+    def _served(self, url: str) -> None:
+        self.http_served += 1
+        self.policy.record(url, served_by_http=True)
+
+    def _remaining_budget(self) -> Optional[int]:
+        if self.max_requests_per_crawl is None:
+            return None
+        return max(self.max_requests_per_crawl - self.http_served, 0)
+
+    def _escalate(self, request: Request) -> None:
+        METRICS.count('http_pages', outcome='escalated')
+        self.policy.record(request.url, served_by_http=False)
+        self.escalated.append(request.url)
+        if self.request_provider is not None:
+            self.request_provider.escalate(request, BROWSER_LANE)
+
+    async def _open_http_queue(self) -> RequestQueue:
+        queue = await RequestQueue.open(name='http-first', configuration=self.configuration)
+        configuration = self.configuration or Configuration.get_global_configuration()
+        if configuration.purge_on_start:
+            # purge_on_start only empties the default storages; a fresh crawl
+            # must not inherit what a crashed one left in the named queue
+            await queue.drop()
+            queue = await RequestQueue.open(name='http-first', configuration=self.configuration)
+        return queue
+
+    async def run(self, urls: List[str]) -> None:
+        http_urls = [url for url in urls if not self.policy.prefers_browser(url)]
+        browser_urls = [url for url in urls if self.policy.prefers_browser(url)]
+
+        # A separate queue, so the browser crawl later gets a clean default one
+        http_queue = self.request_provider or await self._open_http_queue()
+        http_crawler = BeautifulSoupCrawler(
+            request_handler=self.http_router,
+            request_provider=self.scheduler.wrap(http_queue),
+            http_client=PoliteHttpClient(self.scheduler),
+            concurrency_settings=self.concurrency_settings,
+            # Less than the full budget when resuming a pass that had started
+            max_requests_per_crawl=self._remaining_budget(),
+            max_request_retries=1,
+            configuration=self.configuration,
+        )
+
+        @http_crawler.failed_request_handler
+        async def failed_handler(context, error: Exception) -> None:
+            # Blocked or broken static fetches get a real browser instead
+            self._escalate(context.request)
+
+        try:
+            if (http_urls or self.request_provider is not None) and not self.http_done:
+                # Pages seen on an earlier crawl are requested conditionally
+                page_state = get_page_state()
+                await http_crawler.run(page_state.conditional_requests(http_urls))
+        finally:
+            self.policy.save()
+
+        # Only a finished pass gives up its queue; after a crash it is resumed
+        if self.request_provider is None:
+            await http_queue.drop()
+        self.http_done = True
+
+        # Both passes share one budget. Escalated pages are only counted
+        # once the browser pass has handled them
+        browser_budget = self._remaining_budget()
+        if browser_budget == 0:
+            logger.info(f"{self.http_served} pages served over HTTP used up the budget; "
+                        f"{len(self.escalated)} escalated pages are not rendered")
+            return
+
+        browser_provider = None
+        if self.request_provider is not None:
+            # Every worker crawls the browser lane: other shards' browser passes add to it
+            browser_provider = self.request_provider.for_lane(BROWSER_LANE)
+            logger.info(f"{len(self.escalated)} pages escalated to the browser lane")
+        else:
+            browser_urls += [url for url in self.escalated if url not in browser_urls]
+            logger.info(f"{len(self.escalated)} pages escalated; {len(browser_urls)} go to the browser")
+
+        if browser_urls or browser_provider is not None:
+            browser_crawler = PlaywrightCrawler(
+                request_handler=router,
+                request_provider=self.scheduler.wrap(
+                    browser_provider or await RequestQueue.open(configuration=self.configuration)
+                ),
+                browser_pool=make_browser_pool(self.pool_settings),
+                concurrency_settings=(
+                    browser_concurrency(self.pool_settings, self.concurrency_settings)
+                    if self.pool_settings else self.concurrency_settings
+                ),
+                max_requests_per_crawl=browser_budget,
+                configuration=self.configuration,
+                **self.browser_options
+            )
+            (self.load_profile or LoadProfile()).attach(browser_crawler)
+            self.scheduler.attach(browser_crawler)
+            try:
+                await browser_crawler.run(browser_urls)
+            finally:
+                if browser_provider is not None:
+                    browser_provider.close()
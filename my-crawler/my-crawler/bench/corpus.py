@@ -0,0 +1,177 @@
+"""
+Generated site stand-in for offline benchmarks.
+
+Job, rental and generic pages, some carrying JSON-LD and some not, served
+from a local HTTP server so crawls are reproducible and need no network.
+
+Serve it with: poetry run python -m my-crawler.bench.corpus [pages] [port]
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+import json
+import random
+import sys
+import threading
+
+KINDS = ('job', 'rent', 'article')
+
+SUBURBS = ['Adelaide', 'Glenelg', 'Norwood', 'Prospect', 'Unley', 'Mawson Lakes']
+COMPANIES = ['Example Pty Ltd', 'Southern Software', 'Harbour Analytics', 'Torrens Systems']
+
+
+def _job_page(i: int, rng: random.Random, json_ld: bool) -> str:
+    suburb = rng.choice(SUBURBS)
+    company = rng.choice(COMPANIES)
+    low = rng.randrange(55, 90)
+    structured = ''
+    if json_ld:
+        structured = json.dumps({
+            '@context': 'https://schema.org',
+            '@type': 'JobPosting',
+            'title': f'Graduate Software Engineer {i}',
+            'description': f'Graduate program position with {company} in {suburb}.',
+            'baseSalary': {'@type': 'MonetaryAmount', 'value': low * 1000},
+            'hiringOrganization': {'@type': 'Organization', 'name': company},
+            'jobLocation': {'@type': 'Place', 'address': {'addressLocality': suburb}},
+            'datePosted': f'2024-{1 + i % 12:02d}-{1 + i % 28:02d}',
+            'employmentType': 'FULL_TIME'
+        })
+    paragraphs = '\n'.join(
+        f'<p>Join {company} as a graduate in {suburb}. This full time position offers '
+        f'a salary of ${low}k-{low + 10}k, mentoring and a structured graduate program. '
+        f'Requirements: a degree in Computer Science or related field.</p>'
+        for _ in range(rng.randrange(4, 12))
+    )
+    return _page(f'Graduate Software Engineer {i}', structured, f"""
+<h1>Graduate Software Engineer {i}</h1>
+<div class="meta">Job type: Full time | Location: {suburb} | Company: {company}</div>
+<article>{paragraphs}<p>Posted {rng.randrange(1, 30)} days ago. Apply now.</p></article>""")
+
+
+def _rental_page(i: int, rng: random.Random, json_ld: bool) -> str:
+    suburb = rng.choice(SUBURBS)
+    bedrooms = rng.randrange(1, 5)
+    rent = rng.randrange(350, 900)
+    structured = ''
+    if json_ld:
+        structured = json.dumps({
+            '@context': 'https://schema.org',
+            '@type': 'Residence',
+            'name': f'{bedrooms} bedroom apartment in {suburb}',
+            'description': f'{bedrooms} bedroom, 1 bathroom apartment with parking.',
+            'price': rent,
+            'address': {'addressLocality': suburb}
+        })
+    paragraphs = '\n'.join(
+        f'<p>Bright {bedrooms} bedroom, 1 bathroom apartment in {suburb} with secure parking. '
+        f'Rent ${rent} per week, bond four weeks, lease term 12 months, partly furnished.</p>'
+        for _ in range(rng.randrange(3, 10))
+    )
+    return _page(f'{bedrooms} bedroom apartment in {suburb}', structured, f"""
+<h1>{bedrooms} bedroom apartment for rent in {suburb}</h1>
+<article>{paragraphs}<p>Available from 2024-{1 + i % 12:02d}-01. Inspection Saturday.</p></article>""")
+
+
+def _generic_page(i: int, rng: random.Random, json_ld: bool) -> str:
+    structured = ''
+    if json_ld:
+        structured = json.dumps({
+            '@context': 'https://schema.org',
+            '@type': 'Article',
+            'headline': f'Adelaide technology news {i}',
+            'datePublished': f'2024-{1 + i % 12:02d}-{1 + i % 28:02d}'
+        })
+    paragraphs = '\n'.join(
+        f'<p>This article covers the {rng.choice(SUBURBS)} technology scene, with content on '
+        f'local startups, events on 2024-{1 + i % 12:02d}-15 and a description of new funding.</p>'
+        for _ in range(rng.randrange(5, 15))
+    )
+    return _page(f'Adelaide technology news {i}', structured, f"""
+<h1>Adelaide technology news {i}</h1><article>{paragraphs}</article>""")
+
+
+def _page(title: str, structured: str, body: str) -> str:
+    json_ld = f'<script type="application/ld+json">{structured}</script>' if structured else ''
+    return f"""<!DOCTYPE html><html><head><title>{title}</title>
+<meta property="og:title" content="{title}">{json_ld}
+<script>window.analytics = {{"page": "{title}"}};</script>
+<style>body {{ font-family: sans-serif; }}</style>
+</head><body><nav><a href="/">Home</a></nav>{body}
+<footer>Contact us</footer></body></html>"""
+
+
+def make_corpus(pages: int = 300, json_ld_ratio: float = 0.5, seed: int = 42) -> Dict[str, str]:
+    """
+    Path to HTML for `pages` pages split evenly across KINDS.
+
+    Every page links to a few others and '/' links to all of them, so a
+    crawl started from '/' reaches the whole corpus.
+    """
+    rng = random.Random(seed)
+    builders = {'job': _job_page, 'rent': _rental_page, 'article': _generic_page}
+    paths = [f'/{KINDS[i % len(KINDS)]}/{i}' for i in range(pages)]
+
+    corpus = {}
+    for i, path in enumerate(paths):
+        kind = KINDS[i % len(KINDS)]
+        html = builders[kind](i, rng, rng.random() < json_ld_ratio)
+        links = ''.join(f'<a href="{other}">Related</a>' for other in rng.sample(paths, min(3, pages)))
+        corpus[path] = html.replace('<footer>', f'<aside>{links}</aside><footer>')
+
+    index_links = ''.join(f'<li><a href="{path}">{path}</a></li>' for path in paths)
+    corpus['/'] = _page('Listings', '', f'<ul>{index_links}</ul>')
+    return corpus
+
+
+class CorpusServer:
+    """Serves a corpus on 127.0.0.1 from a background thread; use as a context manager."""
+
+    def __init__(self, corpus: Dict[str, str], port: int = 0):
+        pages = {path: html.encode('utf-8') for path, html in corpus.items()}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = pages.get(self.path.split('?', 1)[0])
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.paths = [path for path in corpus if path != '/']
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def urls(self) -> List[str]:
+        return [self.base_url + path for path in self.paths]
+
+    def __enter__(self) -> 'CorpusServer':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == '__main__':
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    with CorpusServer(make_corpus(page_count), port) as server:
+        print(f'Serving {page_count} pages at {server.base_url}/')
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,113 @@
+"""
+End-to-end crawl of the generated corpus: pages per second and peak RSS.
+
+Runs the real router through PlaywrightCrawler against the local corpus
+server, with crawl state kept in a temporary directory. RSS at the end is
+reported next to the peak: with the managed browser pool it should stay
+close to the peak however many pages are crawled.
+
+Run with: poetry run python -m my-crawler.bench.crawl [pages] [extraction mode] [managed|default]
+"""
+from typing import Dict
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from crawlee import ConcurrencySettings
+from crawlee.playwright_crawler import PlaywrightCrawler
+import psutil
+
+from ..routes import router
+from ..extraction_pool import configure_extraction_executor
+from ..load_profile import LoadProfile, make_browser_pool
+from ..browser_pool import BrowserPoolSettings, browser_concurrency
+from ..url_filter import configure_url_filter
+from ..page_state import configure_page_state
+from ..result_store import configure_result_sink
+from ..smart_extractor import PIPELINE_STATS
+from .corpus import CorpusServer, make_corpus
+
+
+def tree_rss() -> int:
+    """RSS of this process and every child (browsers, extraction workers)."""
+    process = psutil.Process()
+    total = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+async def sample_peak_rss(peak: Dict[str, int], interval: float = 0.2) -> None:
+    while True:
+        peak['rss'] = max(peak['rss'], tree_rss())
+        await asyncio.sleep(interval)
+
+
+async def run(page_count: int = 150,
+              extraction_mode: str = 'process',
+              browser_pool: str = 'managed') -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as state_dir, CorpusServer(make_corpus(page_count)) as server:
+        executor = configure_extraction_executor(mode=extraction_mode)
+        page_state = configure_page_state(path=os.path.join(state_dir, 'page_state.sqlite'))
+        result_sink = configure_result_sink(path=os.path.join(state_dir, 'results'))
+        url_filter = configure_url_filter(max_pages_per_domain=page_count)
+
+        concurrency_settings = ConcurrencySettings(desired_concurrency=8, max_concurrency=16)
+        pool_settings = BrowserPoolSettings() if browser_pool == 'managed' else None
+        crawler = PlaywrightCrawler(
+            request_handler=router,
+            browser_pool=make_browser_pool(pool_settings),
+            max_requests_per_crawl=page_count,
+            concurrency_settings=(
+                browser_concurrency(pool_settings, concurrency_settings) if pool_settings else concurrency_settings
+            ),
+        )
+        LoadProfile().attach(crawler)
+
+        peak = {'rss': tree_rss()}
+        sampler = asyncio.create_task(sample_peak_rss(peak))
+        started = time.perf_counter()
+        try:
+            await crawler.run(url_filter.filter_urls(server.urls()))
+        finally:
+            elapsed = time.perf_counter() - started
+            final_rss = tree_rss()
+            sampler.cancel()
+            executor.shutdown()
+            page_state.close()
+            result_sink.close()
+
+    pages = sum(PIPELINE_STATS.snapshot().values())
+    return {
+        'pages': pages,
+        'records': result_sink.records_written,
+        'seconds': elapsed,
+        'pages_per_second': pages / elapsed if elapsed else 0.0,
+        'peak_rss_bytes': peak['rss'],
+        'final_rss_bytes': final_rss,
+        'extraction_mode': extraction_mode,
+        'browser_pool': browser_pool,
+        'outcomes': PIPELINE_STATS.snapshot(),
+    }
+
+
+def main(page_count: int = 150,
+         extraction_mode: str = 'process',
+         browser_pool: str = 'managed') -> Dict[str, float]:
+    results = asyncio.run(run(page_count, extraction_mode, browser_pool))
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 150,
+        sys.argv[2] if len(sys.argv) > 2 else 'process',
+        sys.argv[3] if len(sys.argv) > 3 else 'managed'
+    )
@@ -0,0 +1,82 @@
+"""
+Throughput of the shared SQLite frontier under 1, 2, 4, ... worker processes.
+
+Each worker claims and completes requests from its own shard the way a
+distributed crawl worker does, optionally sleeping `work_ms` per request to
+stand in for fetching and extraction. With no work the numbers are the
+queue's ceiling; with realistic work they show how close to linear the
+crawl can scale before the frontier becomes the bottleneck.
+
+Run with: poetry run python -m my-crawler.bench.frontier [requests] [work_ms]
+"""
+from typing import Dict, List
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from ..frontier_queue import SqliteFrontierQueue
+
+
+def _worker(path: str, shard: int, work_ms: float) -> None:
+    queue = SqliteFrontierQueue(path)
+    completed: List[str] = []
+    while True:
+        # Completions ride along with the next claim, as in ShardRequestProvider
+        requests = queue.claim(shard, 8, completed)
+        if not requests:
+            break
+        completed = []
+        for request in requests:
+            if work_ms:
+                time.sleep(work_ms / 1000)
+            completed.append(request.unique_key)
+    queue.close()
+
+
+def measure(workers: int, request_count: int, work_ms: float) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as state_dir:
+        path = os.path.join(state_dir, 'frontier.sqlite')
+        queue = SqliteFrontierQueue(path, shards=workers)
+        # Many small domains, so every shard gets a similar share
+        queue.put(f'https://site-{i % 997}.example/page/{i}' for i in range(request_count))
+
+        context = multiprocessing.get_context('spawn')
+        processes = [context.Process(target=_worker, args=(path, shard, work_ms)) for shard in range(workers)]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        handled = sum(counts['handled'] for counts in queue.counts().values())
+        queue.close()
+    return {
+        'workers': workers,
+        'handled': handled,
+        'seconds': elapsed,
+        'requests_per_second': handled / elapsed if elapsed else 0.0,
+    }
+
+
+def main(request_count: int = 5000, work_ms: float = 0.0, max_workers: int = 8) -> List[Dict[str, float]]:
+    results = []
+    workers = 1
+    while workers <= max_workers:
+        results.append(measure(workers, request_count, work_ms))
+        workers *= 2
+    base = results[0]['requests_per_second'] or 1.0
+    for result in results:
+        result['speedup'] = result['requests_per_second'] / base
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    )
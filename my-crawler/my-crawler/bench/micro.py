@@ -0,0 +1,104 @@
+"""
+Micro-benchmarks for the hot per-page functions, over the generated corpus.
+
+Run with: poetry run python -m my-crawler.bench.micro [pages]
+"""
+from typing import Callable, Dict, List
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from ..routes import detect_content_type
+from ..smart_extractor import SmartExtractor, ProfileMatcher, EXTRACTION_PROFILES
+from ..storage_utils import read_storage_data
+from .corpus import make_corpus
+
+
+def timed(fn: Callable[[], None], calls: int, repeat: int = 3) -> Dict[str, float]:
+    """Best of `repeat` runs of `calls` calls, as seconds per call."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return {'calls': calls, 'seconds_per_call': best / calls, 'calls_per_second': calls / best}
+
+
+def bench_detect_content_type(pages: Dict[str, str]) -> Dict[str, float]:
+    items = [(f'https://example.com{path}', html) for path, html in pages.items()]
+
+    def run():
+        for url, html in items:
+            detect_content_type(url, html)
+
+    return timed(run, len(items))
+
+
+def bench_profile_match(records: List[Dict]) -> Dict[str, float]:
+    matchers = [ProfileMatcher(profile) for profile in EXTRACTION_PROFILES.values()]
+
+    def run():
+        for record in records:
+            for matcher in matchers:
+                matcher.match(record)
+
+    return timed(run, len(records) * len(matchers))
+
+
+def bench_extract_content(pages: Dict[str, str]) -> Dict[str, float]:
+    items = []
+    for path, html in pages.items():
+        url = f'https://example.com{path}'
+        items.append((url, html, detect_content_type(url, html)))
+    loop = asyncio.new_event_loop()
+
+    def run():
+        for url, html, content_type in items:
+            loop.run_until_complete(SmartExtractor(content_type).extract_content(html, url))
+
+    # Load the models before timing
+    loop.run_until_complete(SmartExtractor().extract_content(items[0][1], items[0][0]))
+    try:
+        return timed(run, len(items), repeat=1)
+    finally:
+        loop.close()
+
+
+def bench_read_storage_data(records: List[Dict], copies: int = 20) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as path:
+        for i in range(len(records) * copies):
+            with open(os.path.join(path, f'{i + 1:09d}.json'), 'w', encoding='utf-8') as f:
+                json.dump(records[i % len(records)], f)
+        return timed(lambda: read_storage_data(path=path), len(records) * copies)
+
+
+def main(page_count: int = 150) -> Dict[str, Dict[str, float]]:
+    corpus = make_corpus(page_count)
+    pages = {path: html for path, html in corpus.items() if path != '/'}
+
+    # Records shaped like extraction output, for the matcher and storage reads
+    loop = asyncio.new_event_loop()
+    records = []
+    for path, html in pages.items():
+        url = f'https://example.com{path}'
+        extracted = loop.run_until_complete(
+            SmartExtractor(detect_content_type(url, html)).extract_content(html, url)
+        )
+        records.append({'url': url, 'title': path, 'extracted_data': extracted})
+    loop.close()
+
+    results = {
+        'detect_content_type': bench_detect_content_type(pages),
+        'ProfileMatcher.match': bench_profile_match([record['extracted_data'] for record in records]),
+        'SmartExtractor.extract_content': bench_extract_content(pages),
+        'read_storage_data': bench_read_storage_data(records),
+    }
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 150)
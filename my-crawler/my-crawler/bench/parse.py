@@ -0,0 +1,85 @@
+"""
+Parse cost per page, before and after sharing one parsed document.
+
+Run with: poetry run python -m my-crawler.bench.parse
+"""
+from typing import Callable, Dict, List
+import json
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+from newspaper import Article
+from readability.readability import Document
+import trafilatura
+
+from ..parsed_document import ParsedDocument
+from ..smart_extractor import _shared_tree_parser
+
+
+def make_page(paragraphs: int = 200) -> str:
+    """A job-listing style page with JSON-LD, navigation and scripts."""
+    body = '\n'.join(
+        f'<p>Paragraph {i}: graduate program position in Adelaide, salary $70k-80k, '
+        f'full time role with benefits and a great team.</p>'
+        for i in range(paragraphs)
+    )
+    return f"""<html><head><title>Graduate Software Engineer</title>
+<meta property="og:title" content="Graduate Software Engineer">
+<script type="application/ld+json">{{"@type": "BreadcrumbList"}}</script>
+<script>var analytics = {{"a": 1}};</script><style>p {{ color: red; }}</style>
+</head><body><nav>Menu Sign in</nav><h1>Graduate Software Engineer</h1>
+<article>{body}</article><footer>Contact</footer></body></html>"""
+
+
+def parse_before(html: str, url: str) -> None:
+    """The parses extraction used to do for one page."""
+    BeautifulSoup(html, 'html.parser').find('script', {'type': 'application/ld+json'})
+    BeautifulSoup(html, 'html.parser').find('h1')
+    trafilatura.extract(html, include_links=True, include_images=True)
+    article = Article(url)
+    article.download(input_html=html)
+    article.parse()
+    Document(html).title()
+
+
+def parse_after(html: str, url: str) -> None:
+    """The same stages reading one shared document."""
+    doc = ParsedDocument(html)
+    doc.json_ld_blocks()
+    doc.first_text('h1')
+    trafilatura.extract(doc.copy_tree(), include_links=True, include_images=True)
+    article = Article(url)
+    shared_parser = _shared_tree_parser(doc)
+    article.config.get_parser = lambda: shared_parser
+    article.download(input_html=doc.html)
+    article.parse()
+
+
+def measure(fn: Callable[[str, str], None], pages: List[str]) -> Dict[str, float]:
+    url = 'https://jobs.example.com/job/1'
+    tracemalloc.start()
+    started = time.perf_counter()
+    for html in pages:
+        fn(html, url)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'seconds_per_page': elapsed / len(pages),
+        'peak_bytes': peak
+    }
+
+
+def main(page_count: int = 20) -> Dict[str, Dict[str, float]]:
+    pages = [make_page() for _ in range(page_count)]
+    results = {
+        'before': measure(parse_before, pages),
+        'after': measure(parse_after, pages)
+    }
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
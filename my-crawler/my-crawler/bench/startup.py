@@ -0,0 +1,92 @@
+"""
+Startup cost: how long importing the crawler and each heavy dependency takes.
+
+Every module is imported in a fresh interpreter with -X importtime, so the
+numbers are cold-start costs and include everything the module pulls in.
+
+Run with: poetry run python -m my-crawler.bench.startup [top]
+"""
+from typing import Dict, List
+import json
+import os
+import subprocess
+import sys
+import time
+
+PACKAGE = __package__.rsplit('.', 1)[0]
+
+MODULES = [
+    f'{PACKAGE}.main',
+    f'{PACKAGE}.smart_extractor',
+    f'{PACKAGE}.routes',
+    'crawlee.playwright_crawler',
+    'crawlee.beautifulsoup_crawler',
+    'trafilatura',
+    'newspaper',
+    'readability.readability',
+    'price_parser',
+    'spacy',
+    'yake',
+    'nltk',
+    'googlesearch',
+    'lxml.html',
+]
+
+
+def _project_dir() -> str:
+    # The directory holding the package, so `import my-crawler...` resolves
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Rows of -X importtime output as {'module', 'self_us', 'cumulative_us'}."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        rows.append({
+            'module': name.strip(),
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us)
+        })
+    return rows
+
+
+def measure_import(module: str, top: int) -> Dict:
+    code = f'import importlib; importlib.import_module({module!r})'
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, cwd=_project_dir()
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'}
+
+    rows = parse_importtime(result.stderr)
+    # Sum self time per top-level package to see which dependency dominates
+    by_package: Dict[str, int] = {}
+    for row in rows:
+        package = row['module'].split('.')[0]
+        by_package[package] = by_package.get(package, 0) + row['self_us']
+
+    return {
+        'wall_seconds': wall,
+        'import_seconds': max((row['cumulative_us'] for row in rows), default=0) / 1e6,
+        'modules_loaded': len(rows),
+        'top_packages': [
+            {'package': package, 'seconds': us / 1e6}
+            for package, us in sorted(by_package.items(), key=lambda item: -item[1])[:top]
+        ]
+    }
+
+
+def main(top: int = 10) -> Dict[str, Dict]:
+    results = {module: measure_import(module, top) for module in MODULES}
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
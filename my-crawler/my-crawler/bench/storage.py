@@ -0,0 +1,91 @@
+"""
+Dataset reading: the old read_storage_data against iter_storage_data.
+
+Run with: poetry run python -m my-crawler.bench.storage [records]
+"""
+from typing import Callable, Dict, List
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from ..storage_utils import iter_storage_data
+
+
+def make_dataset(path: str, records: int) -> None:
+    """Write `records` crawlee-style dataset files."""
+    for i in range(records):
+        record = {
+            'url': f'https://jobs.example.com/job/{i}',
+            'title': f'Graduate Software Engineer {i}',
+            'extracted_data': {
+                'title': f'Graduate Software Engineer {i}',
+                'salary': 60000 + (i * 37) % 40000,
+                'main_content': 'Full time graduate position in Adelaide. ' * 40,
+                'key_phrases': ['graduate program', 'software engineer', 'adelaide'],
+                'named_entities': {'GPE': ['Adelaide'], 'ORG': ['Example Pty Ltd']}
+            }
+        }
+        with open(os.path.join(path, f'{i + 1:09d}.json'), 'w', encoding='utf-8') as f:
+            json.dump(record, f)
+
+
+def read_legacy(path: str) -> List[Dict]:
+    """read_storage_data as it was: load everything and print every record."""
+    data = []
+    for filename in os.listdir(path):
+        if filename.endswith('.json'):
+            print(f"\nReading file: {filename}")
+            with open(os.path.join(path, filename), 'r', encoding='utf-8') as f:
+                json_data = json.load(f)
+                print(f"Content: {json_data}")
+                data.append(json_data)
+    return data
+
+
+def measure(fn: Callable[[], int]) -> Dict[str, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'records': count, 'seconds': elapsed, 'peak_bytes': peak}
+
+
+def main(records: int = 100_000) -> Dict[str, Dict[str, float]]:
+    fields = ['url', 'title', 'extracted_data.salary']
+
+    def high_salary(record: Dict) -> bool:
+        return (record.get('extracted_data') or {}).get('salary', 0) > 90000
+
+    with tempfile.TemporaryDirectory() as path:
+        make_dataset(path, records)
+
+        def legacy() -> int:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                return len(read_legacy(path))
+
+        results = {
+            'read_storage_data (legacy)': measure(legacy),
+            'iter_storage_data': measure(lambda: sum(1 for _ in iter_storage_data(path=path))),
+            'iter_storage_data projected': measure(
+                lambda: sum(1 for _ in iter_storage_data(fields=fields, path=path))
+            ),
+            'iter_storage_data filtered': measure(
+                lambda: sum(1 for _ in iter_storage_data(fields=fields, where=high_salary, path=path))
+            ),
+            'iter_storage_data 4 workers': measure(
+                lambda: sum(1 for _ in iter_storage_data(fields=fields, path=path, workers=4))
+            ),
+        }
+
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
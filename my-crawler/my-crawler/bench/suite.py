@@ -0,0 +1,59 @@
+"""
+Run the offline benchmarks and save the results for comparison between commits.
+
+Run with: poetry run python -m my-crawler.bench.suite [--pages N] [--skip-crawl] [--output FILE]
+
+Results go to storage/bench/<commit>.json by default, next to earlier runs.
+"""
+from typing import Any, Dict, Optional
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+
+from ..storage_utils import storage_path
+from . import crawl, micro
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(pages: int = 150, skip_crawl: bool = False, output: Optional[str] = None) -> Dict[str, Any]:
+    commit = git_commit()
+    results: Dict[str, Any] = {
+        'commit': commit,
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'pages': pages,
+        'micro': micro.main(pages),
+    }
+    if not skip_crawl:
+        results['crawl'] = crawl.main(pages)
+
+    output = output or storage_path('bench', f'{commit or int(results["timestamp"])}.json')
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f'Results written to {output}')
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Offline crawler benchmarks.')
+    parser.add_argument('--pages', type=int, default=150)
+    parser.add_argument('--skip-crawl', action='store_true', help='Micro-benchmarks only, no browser')
+    parser.add_argument('--output')
+    args = parser.parse_args()
+    main(args.pages, args.skip_crawl, args.output)
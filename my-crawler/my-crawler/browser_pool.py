@@ -0,0 +1,210 @@
+from crawlee import ConcurrencySettings
+from crawlee.browsers import BrowserPool, PlaywrightBrowserPlugin
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+import logging
+import time
+
+try:
+    import psutil
+except ImportError:  # optional, only needed for the memory ceiling
+    psutil = None
+
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Process names of the browsers Playwright launches
+BROWSER_PROCESS_NAMES = ('chrome', 'chromium', 'headless_shell', 'firefox', 'webkit')
+
+
+@dataclass
+class BrowserPoolSettings:
+    """
+    How many browsers a crawl may run and when they are replaced.
+
+    crawlee gives every browser a single context, so `browsers` also caps
+    the contexts, and recycling a browser starts its context afresh.
+    """
+    browsers: int = 2
+    # Open pages per browser; the pool never has more than browsers * pages_per_browser in use
+    pages_per_browser: int = 8
+    # Replace a browser after it has served this many pages...
+    recycle_after_pages: int = 500
+    # ...or when all browsers together use more memory than this (needs psutil)
+    max_rss_bytes: Optional[int] = 2 * 1024 ** 3
+    rss_check_interval: float = 10.0
+    browser_type: str = 'chromium'
+    headless: bool = True
+
+    @property
+    def max_pages(self) -> int:
+        return self.browsers * self.pages_per_browser
+
+
+def browser_concurrency(settings: BrowserPoolSettings,
+                        concurrency_settings: Optional[ConcurrencySettings] = None) -> ConcurrencySettings:
+    """Concurrency for a browser crawler that stays within the pool's page limit."""
+    desired = concurrency_settings.desired_concurrency if concurrency_settings else settings.max_pages
+    return ConcurrencySettings(
+        desired_concurrency=min(desired, settings.max_pages),
+        max_concurrency=settings.max_pages
+    )
+
+
+def browser_rss() -> Optional[int]:
+    """Resident memory of the browser processes under this one, or None without psutil."""
+    if psutil is None:
+        return None
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            if any(name in child.name().lower() for name in BROWSER_PROCESS_NAMES):
+                total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+@dataclass
+class _BrowserUsage:
+    served: int = 0
+    open_pages: int = 0
+    launched: float = field(default_factory=time.monotonic)
+    # Blank pages that fill a retired browser up to its page limit
+    placeholders: List[Any] = field(default_factory=list)
+
+
+class ManagedBrowserPool(BrowserPool):
+    """
+    A BrowserPool that keeps the crawler's memory flat over long runs.
+
+    - At most `settings.max_pages` pages are in use at once; further
+      requests wait for a page rather than launching more browsers.
+    - A browser that has served `recycle_after_pages` pages, or the
+      busiest one when browser RSS passes `max_rss_bytes`, is retired: its
+      free page slots are filled with blank pages so the pool gives it no
+      new work and launches a fresh browser when needed. Once crawlee has
+      marked it inactive the blank pages are closed, and crawlee closes the
+      browser as soon as its last real page is done.
+
+    Pages are not reused: PlaywrightCrawler closes every page after its
+    request, and a fresh page in a long-lived context is cheap.
+    """
+
+    def __init__(self, settings: Optional[BrowserPoolSettings] = None, **pool_options):
+        self.settings = settings or BrowserPoolSettings()
+        plugin = PlaywrightBrowserPlugin(
+            browser_type=self.settings.browser_type,
+            browser_options={'headless': self.settings.headless},
+            max_open_pages_per_browser=self.settings.pages_per_browser,
+        )
+        super().__init__(plugins=[plugin], **pool_options)
+
+        self._usage: Dict[Any, _BrowserUsage] = {}
+        self._retired: Set[Any] = set()
+        self._in_use = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._last_rss_check = time.monotonic()
+        self.recycled = {'pages': 0, 'rss': 0}
+
+    def _controller_of(self, page):
+        return next((controller for controller in self.active_browsers if page in controller.pages), None)
+
+    def _page_closed(self, usage: Optional[_BrowserUsage]) -> None:
+        self._in_use -= 1
+        self._slots.release()
+        if usage is not None:
+            usage.open_pages -= 1
+
+    async def new_page(self, *args, **kwargs):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.settings.max_pages)
+        await self._slots.acquire()
+        try:
+            await self._sweep()
+            await self._check_rss()
+            crawlee_page = await super().new_page(*args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        METRICS.count('browser_pages', source='new')
+
+        controller = self._controller_of(crawlee_page.page)
+        usage = self._usage.setdefault(controller, _BrowserUsage()) if controller is not None else None
+        self._in_use += 1
+        if usage is not None:
+            usage.served += 1
+            usage.open_pages += 1
+        # The crawler closes the page when its request is done
+        crawlee_page.page.once('close', lambda _: self._page_closed(usage))
+
+        if usage is not None and usage.served >= self.settings.recycle_after_pages:
+            await self._retire(controller, 'pages')
+        return crawlee_page
+
+    async def _check_rss(self) -> None:
+        if self.settings.max_rss_bytes is None:
+            return
+        now = time.monotonic()
+        if now - self._last_rss_check < self.settings.rss_check_interval:
+            return
+        self._last_rss_check = now
+
+        rss = await asyncio.to_thread(browser_rss)
+        if rss is None or rss <= self.settings.max_rss_bytes:
+            return
+        # The browser that has served the most pages has likely grown the most
+        candidates = [controller for controller in self._usage if controller not in self._retired]
+        if candidates:
+            logger.info(f"Browsers use {rss / 1024 ** 2:.0f} MB, over the "
+                        f"{self.settings.max_rss_bytes / 1024 ** 2:.0f} MB ceiling")
+            await self._retire(max(candidates, key=lambda controller: self._usage[controller].served), 'rss')
+
+    async def _retire(self, controller, reason: str) -> None:
+        """Stop the pool giving the browser new pages; crawlee closes it once it is idle."""
+        if controller in self._retired:
+            return
+        self._retired.add(controller)
+        self.recycled[reason] += 1
+        METRICS.count('browsers_recycled', reason=reason)
+
+        usage = self._usage[controller]
+        logger.info(f"Recycling a browser after {usage.served} pages "
+                    f"and {time.monotonic() - usage.launched:.0f}s ({reason})")
+        # The pool picks any active browser with a free page slot
+        try:
+            while controller.has_free_capacity:
+                usage.placeholders.append(await controller.new_page())
+        except Exception as e:
+            logger.debug(f"Could not fill a retired browser: {str(e)}")
+
+    async def _sweep(self) -> None:
+        """Let go of retired browsers crawlee has stopped using."""
+        inactive = self.inactive_browsers
+        for controller in list(self._retired):
+            if controller not in inactive:
+                continue
+            # Inactive browsers get no new pages, so the blank ones can go
+            self._retired.discard(controller)
+            for page in self._usage[controller].placeholders:
+                try:
+                    await page.close()
+                except Exception as e:
+                    logger.debug(f"Error closing page: {str(e)}")
+            self._usage[controller].placeholders.clear()
+
+        live = set(self.active_browsers) | set(inactive)
+        for controller in [controller for controller in self._usage if controller not in live]:
+            del self._usage[controller]
+
+    def stats(self) -> Dict[str, Any]:
+        """Pages in use, live browsers and recycling counts."""
+        return {
+            'in_use': self._in_use,
+            'browsers': len(self._usage) - len(self._retired),
+            'retiring': len(self._retired),
+            'recycled': dict(self.recycled),
+            'browser_rss_bytes': browser_rss(),
+        }
@@ -0,0 +1,278 @@
+from typing import Any, Dict, Iterable, List, Optional
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+
+from .storage_utils import storage_path
+
+logger = logging.getLogger(__name__)
+
+
+def _fsync_dir(path: str) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_json(path: str, data: Any) -> None:
+    """Write JSON so readers see either the old file or the complete new one."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(path))
+
+
+class CrawlCheckpoint:
+    """
+    Periodic, crash-safe snapshots of crawl progress under storage/checkpoint.
+
+    Three pieces, each written incrementally:
+
+    - frontier.bloom: the UrlFilter's seen-set, memory-mapped, so a flush
+      only writes the pages that changed
+    - journal.jsonl: an append-only log of domain budget changes and new
+      dedup fingerprints since the previous checkpoint, rewritten as one
+      compact snapshot once it passes `compact_after` lines
+    - state.json: seeds, the adaptive crawler's phase and escalations and
+      small counters, replaced atomically
+
+    The request queue itself is left to crawlee's on-disk storage; requests
+    whose extraction had not finished are still pending there and are
+    fetched again on resume.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 interval: float = 30.0,
+                 compact_after: int = 100_000):
+        self.path = path or storage_path('checkpoint')
+        self.interval = interval
+        self.compact_after = compact_after
+        self.state_path = os.path.join(self.path, 'state.json')
+        self.journal_path = os.path.join(self.path, 'journal.jsonl')
+        self.bloom_path = os.path.join(self.path, 'frontier.bloom')
+
+        self.seeds: List[str] = []
+        self.url_filter = None
+        self.dedup_index = None
+        self.adaptive_crawler = None
+        self.flushables: List[Any] = []
+
+        self.saves = 0
+        self.last_save_seconds = 0.0
+        self._journal_lines = 0
+        self._task: Optional[asyncio.Task] = None
+        self._writing: Optional[asyncio.Future] = None
+
+        os.makedirs(self.path, exist_ok=True)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.state_path)
+
+    def clear(self) -> None:
+        """Forget any earlier checkpoint, before a fresh crawl or after a finished one."""
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
+        self._journal_lines = 0
+
+    def attach(self, url_filter=None, dedup_index=None, adaptive_crawler=None,
+               flushables: Iterable[Any] = ()) -> 'CrawlCheckpoint':
+        """
+        Track these components.
+
+        `flushables` are stores with their own durability (result sink,
+        listing index, ...) that are synced at every checkpoint; each needs a
+        `sync()` or `commit()` method.
+        """
+        self.url_filter = url_filter
+        self.dedup_index = dedup_index
+        self.adaptive_crawler = adaptive_crawler
+        self.flushables = list(flushables)
+        if dedup_index is not None and dedup_index.journal is None:
+            dedup_index.journal = []
+        return self
+
+    def _journal_entries(self) -> List[Dict]:
+        entries: List[Dict] = []
+        if self.url_filter is not None:
+            entries += [
+                {'domain': domain, 'pages': pages}
+                for domain, pages in self.url_filter.drain_changed_domains().items()
+            ]
+        if self.dedup_index is not None:
+            entries += self.dedup_index.drain_journal()
+        return entries
+
+    def _append_journal(self, entries: List[Dict]) -> None:
+        if not entries:
+            return
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(entry) + '\n' for entry in entries))
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_lines += len(entries)
+
+    def _compact_journal(self, entries: List[Dict]) -> None:
+        """Replace the journal with one entry per domain and fingerprint."""
+        tmp_path = self.journal_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(entry) + '\n' for entry in entries))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+        _fsync_dir(self.path)
+        self._journal_lines = len(entries)
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """Everything a checkpoint writes, taken on the event loop so the crawl cannot change it mid-write."""
+        snapshot: Dict[str, Any] = {'started': time.perf_counter(), 'journal': self._journal_entries()}
+
+        if self._journal_lines + len(snapshot['journal']) > self.compact_after:
+            compacted: List[Dict] = []
+            if self.url_filter is not None:
+                compacted += [
+                    {'domain': domain, 'pages': pages}
+                    for domain, pages in self.url_filter.domain_page_counts.items()
+                ]
+            if self.dedup_index is not None:
+                compacted += list(self.dedup_index.entries())
+            snapshot['compacted'] = compacted
+
+        snapshot['sync'] = []
+        for store in self.flushables:
+            if hasattr(store, 'flush'):
+                store.flush()
+            if hasattr(store, 'sync'):
+                snapshot['sync'].append(store)
+            else:
+                # SQLite connections may only be used on the thread that opened them
+                store.commit()
+
+        state: Dict[str, Any] = {
+            'version': 1,
+            'saved_at': time.time(),
+            'seeds': list(self.seeds),
+        }
+        if self.url_filter is not None:
+            state['seen_count'] = self.url_filter.seen.count
+        if self.adaptive_crawler is not None:
+            state['adaptive'] = {
+                'http_done': self.adaptive_crawler.http_done,
+                'http_served': self.adaptive_crawler.http_served,
+                'escalated': list(self.adaptive_crawler.escalated)
+            }
+        snapshot['state'] = state
+        return snapshot
+
+    def _write(self, snapshot: Dict[str, Any]) -> None:
+        """The file I/O and fsyncs of a checkpoint; safe to run on a worker thread."""
+        # Only what changed since the last checkpoint is written
+        if 'compacted' in snapshot:
+            self._compact_journal(snapshot['compacted'])
+        else:
+            self._append_journal(snapshot['journal'])
+
+        if self.url_filter is not None:
+            self.url_filter.seen.flush()
+        for store in snapshot['sync']:
+            store.sync()
+        atomic_write_json(self.state_path, snapshot['state'])
+
+        self.saves += 1
+        self.last_save_seconds = time.perf_counter() - snapshot['started']
+        logger.debug(f"Checkpoint saved in {self.last_save_seconds:.3f}s")
+
+    def save(self) -> None:
+        """Take a checkpoint, blocking until it is on disk."""
+        self._write(self._snapshot())
+
+    async def save_async(self) -> None:
+        """Take a checkpoint with the file I/O and fsyncs on a worker thread."""
+        if self._writing is not None:
+            # Journal entries must reach the file in the order they were drained
+            await asyncio.wait([self._writing])
+        snapshot = self._snapshot()
+        self._writing = asyncio.ensure_future(asyncio.to_thread(self._write, snapshot))
+        # Shielded, so cancelling the periodic task never abandons a half-done write
+        await asyncio.shield(self._writing)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """The last checkpoint's state, with the journal folded in, or None."""
+        if not self.exists():
+            return None
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+
+        domains: Dict[str, int] = {}
+        dedup: List[Dict] = []
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r+b') as f:
+                good_bytes = 0
+                for line in f:
+                    try:
+                        # A line without its newline was cut short, even if it parses
+                        if not line.endswith(b'\n'):
+                            raise ValueError('no trailing newline')
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn final line from a crash mid-append; cut it off
+                        # so later appends start on a clean line
+                        f.truncate(good_bytes)
+                        break
+                    good_bytes += len(line)
+                    if 'domain' in entry:
+                        domains[entry['domain']] = entry['pages']
+                    else:
+                        dedup.append(entry)
+                    self._journal_lines += 1
+        state['domains'] = domains
+        state['dedup'] = dedup
+        return state
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Put the attached components back where the checkpoint left them."""
+        self.seeds = state.get('seeds', [])
+        if self.url_filter is not None:
+            self.url_filter.restore_counts(state['domains'])
+            self.url_filter.seen.count = state.get('seen_count', 0)
+        if self.dedup_index is not None:
+            for entry in state['dedup']:
+                self.dedup_index.restore(entry)
+        if self.adaptive_crawler is not None and 'adaptive' in state:
+            self.adaptive_crawler.http_done = state['adaptive']['http_done']
+            self.adaptive_crawler.http_served = state['adaptive'].get('http_served', 0)
+            self.adaptive_crawler.escalated = list(state['adaptive']['escalated'])
+        logger.info(
+            f"Resuming from checkpoint of {time.ctime(state['saved_at'])}: "
+            f"{len(state['domains'])} domains, {len(state['dedup'])} fingerprints"
+        )
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.save_async()
+            except Exception as e:
+                logger.error(f"Checkpoint failed: {str(e)}")
+
+    def start(self) -> 'CrawlCheckpoint':
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def stop(self) -> None:
+        """Stop the periodic task and take a final checkpoint."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.save_async()
@@ -0,0 +1,268 @@
+from crawlee import ConcurrencySettings
+from crawlee.configuration import Configuration
+from crawlee.playwright_crawler import PlaywrightCrawler
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+
+from .routes import router
+from .storage_utils import storage_path
+from .extraction_pool import configure_extraction_executor
+from .nlp_batcher import NlpBatcher
+from .adaptive_fetch import AdaptiveCrawler, DomainFetchPolicy
+from .load_profile import LoadProfile, make_browser_pool
+from .browser_pool import BrowserPoolSettings, browser_concurrency
+from .url_filter import configure_url_filter
+from .url_dedup import canonicalize_url
+from .politeness import PolitenessScheduler, interleave_by_domain
+from .page_state import configure_page_state
+from .result_store import configure_result_sink, iter_results
+from .listing_index import configure_listing_index
+from .metrics import JsonSnapshotWriter, start_profiler_from_env
+from .frontier_queue import FrontierQueue, SqliteFrontierQueue, ShardRequestProvider
+
+logger = logging.getLogger(__name__)
+
+
+def shard_dir(shard: int, *parts: str) -> str:
+    """A worker's private state: crawlee storage, page state, fetch policy, metrics."""
+    return storage_path('distributed', f'shard-{shard:02d}', *parts)
+
+
+async def worker_main(shard: int,
+                      queue_path: Optional[str] = None,
+                      fetch_mode: str = 'adaptive',
+                      prewarm: bool = True,
+                      extraction_workers: Optional[int] = None,
+                      max_pages_per_domain: int = 2,
+                      resume: bool = False) -> None:
+    """
+    Crawl one shard of the frontier with the regular router until every shard is done.
+
+    Each domain belongs to one shard, so this worker's PolitenessScheduler
+    sees all of the traffic to its domains and the per-domain limits hold
+    across the whole crawl. Records go to storage/results/shard-NN.
+    """
+    # Set before crawlee builds its global configuration, so workers never share a queue
+    os.environ['CRAWLEE_STORAGE_DIR'] = shard_dir(shard, 'crawlee')
+
+    queue = SqliteFrontierQueue(queue_path)
+    provider = ShardRequestProvider(queue, shard)
+
+    profiler = start_profiler_from_env()
+    metrics_writer = JsonSnapshotWriter(shard_dir(shard, 'metrics.json'), interval=10).start()
+
+    extraction_executor = configure_extraction_executor(
+        mode='process', max_workers=extraction_workers, prewarm=prewarm, nlp_batcher=NlpBatcher(batch_size=8)
+    )
+
+    scheduler = PolitenessScheduler(rate=1.0, max_concurrency_per_domain=2)
+    concurrency_settings = ConcurrencySettings(desired_concurrency=8, max_concurrency=32)
+    configuration = Configuration(purge_on_start=not resume)
+    pool_settings = BrowserPoolSettings(browsers=2, pages_per_browser=8)
+
+    # The frontier enforces the crawl's request budget, so the crawlers get none
+    if fetch_mode == 'adaptive':
+        crawler = AdaptiveCrawler(
+            max_requests_per_crawl=None,
+            policy=DomainFetchPolicy(path=shard_dir(shard, 'fetch_policy.json')).load(),
+            load_profile=LoadProfile(),
+            scheduler=scheduler,
+            concurrency_settings=concurrency_settings,
+            configuration=configuration,
+            request_provider=provider,
+            pool_settings=pool_settings,
+        )
+    else:
+        crawler = PlaywrightCrawler(
+            request_handler=router,
+            request_provider=scheduler.wrap(provider),
+            browser_pool=make_browser_pool(pool_settings),
+            concurrency_settings=browser_concurrency(pool_settings, concurrency_settings),
+            configuration=configuration,
+        )
+        LoadProfile().attach(crawler)
+        scheduler.attach(crawler)
+
+    # SQLite stores are per worker; a domain always lands on the same shard
+    page_state = configure_page_state(
+        max_entries=1_000_000, max_age_days=30, path=shard_dir(shard, 'page_state.sqlite')
+    )
+    url_filter = configure_url_filter(max_pages_per_domain=max_pages_per_domain)
+    result_sink = configure_result_sink(
+        path=storage_path('results', f'shard-{shard:02d}'), flush_every=100, fsync_every=10
+    )
+
+    try:
+        if prewarm:
+            await extraction_executor.start()
+        await crawler.run([])
+    finally:
+        provider.close()
+        extraction_executor.shutdown()
+        page_state.close()
+        result_sink.close()
+        queue.close()
+        metrics_writer.stop()
+        if profiler is not None:
+            profiler.stop()
+
+    logger.info(f'Shard {shard}: {await provider.get_handled_count()} requests handled')
+    logger.info(f'Shard {shard} URL frontier: {url_filter.stats()}')
+    logger.info(f'Shard {shard} per-domain politeness: {scheduler.metrics()}')
+    logger.info(f'Shard {shard} results written: {result_sink.records_written} to {result_sink.path}')
+
+
+def run_worker(shard: int, options: Dict[str, Any]) -> None:
+    """Process entry point for one worker."""
+    asyncio.run(worker_main(shard, **options))
+
+
+class Coordinator:
+    """
+    Runs a crawl sharded by domain over worker processes.
+
+    Seeds go into the shared frontier and one worker per shard crawls its
+    part. Workers that die are restarted up to `max_restarts` times with
+    their claims handed back; after that their shard is abandoned so the
+    others can finish. Extraction processes are split between the workers
+    so they do not oversubscribe the CPUs.
+    """
+
+    def __init__(self,
+                 shards: int = 4,
+                 queue: Optional[FrontierQueue] = None,
+                 queue_path: Optional[str] = None,
+                 fetch_mode: str = 'adaptive',
+                 max_requests: Optional[int] = None,
+                 max_pages_per_domain: int = 2,
+                 prewarm: bool = True,
+                 max_restarts: int = 2,
+                 resume: bool = False):
+        self.shards = shards
+        if queue is None and not resume:
+            # A fresh crawl starts from an empty file, so the shard count may change
+            path = queue_path or storage_path('distributed', 'frontier.sqlite')
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+        self.queue = queue or SqliteFrontierQueue(
+            queue_path, shards=shards, max_requests=max_requests, max_pages_per_domain=max_pages_per_domain
+        )
+        self.max_restarts = max_restarts
+        self.resume = resume
+        self.worker_options = {
+            'queue_path': getattr(self.queue, 'path', queue_path),
+            'fetch_mode': fetch_mode,
+            'prewarm': prewarm,
+            'extraction_workers': max(1, (os.cpu_count() or 1) // shards),
+            'max_pages_per_domain': max_pages_per_domain,
+            'resume': resume,
+        }
+        if resume:
+            # Nobody is running yet, so every claim is left over from the crash
+            self.queue.requeue_claimed()
+        else:
+            self.queue.reset()
+
+    def seed(self, urls: Iterable[str]) -> int:
+        """Canonicalise the seeds and file them under their shards."""
+        canonical = []
+        for url in urls:
+            try:
+                canonical.append(canonicalize_url(url))
+            except ValueError:
+                continue
+        added = self.queue.put(interleave_by_domain(list(dict.fromkeys(canonical))))
+        logger.info(f'Seeded {added} URLs across {self.shards} shards')
+        return added
+
+    def _start(self, context, shard: int):
+        process = context.Process(
+            target=run_worker, args=(shard, self.worker_options), name=f'crawl-shard-{shard:02d}'
+        )
+        process.start()
+        return process
+
+    async def run(self, poll_interval: float = 2.0) -> Dict[int, Dict[str, int]]:
+        """Run a worker per shard until the frontier is drained; returns per-shard counts."""
+        # Spawned, not forked: workers must not inherit this process's event loop or crawlee state
+        context = multiprocessing.get_context('spawn')
+        workers = {shard: self._start(context, shard) for shard in range(self.shards)}
+        restarts: Counter = Counter()
+
+        while workers:
+            await asyncio.sleep(poll_interval)
+            for shard, process in list(workers.items()):
+                if process.is_alive():
+                    continue
+                del workers[shard]
+                if process.exitcode == 0:
+                    continue
+
+                returned = self.queue.requeue_claimed(shard)
+                if restarts[shard] < self.max_restarts:
+                    restarts[shard] += 1
+                    logger.warning(
+                        f'Shard {shard} worker exited with {process.exitcode}; '
+                        f'restarting with {returned} requests handed back'
+                    )
+                    workers[shard] = self._start(context, shard)
+                else:
+                    logger.error(f'Shard {shard} failed {restarts[shard] + 1} times; '
+                                 f'abandoning {self.queue.abandon(shard)} requests')
+
+        counts = self.queue.counts()
+        logger.info(f'Distributed crawl finished: {counts}')
+        return counts
+
+    def index_results(self) -> int:
+        """Add every shard's records to the listing index in one pass."""
+        listing_index = configure_listing_index()
+        try:
+            added = 0
+            for shard in range(self.shards):
+                added += listing_index.add_many(iter_results(path=storage_path('results', f'shard-{shard:02d}')))
+            logger.info(f'Listing index: {listing_index.count()} records in {listing_index.path}')
+            return added
+        finally:
+            listing_index.close()
+
+    def close(self) -> None:
+        self.queue.close()
+
+
+if __name__ == '__main__':
+    # A worker started by hand against an existing frontier, e.g. with
+    # --reopen for a shard the coordinator gave up on
+    parser = argparse.ArgumentParser(description='Run one worker of a distributed crawl.')
+    parser.add_argument('--shard', type=int, required=True)
+    parser.add_argument('--queue', help='Frontier database; storage/distributed/frontier.sqlite by default')
+    parser.add_argument('--fetch-mode', choices=('adaptive', 'browser'), default='adaptive')
+    parser.add_argument('--extraction-workers', type=int)
+    parser.add_argument('--max-pages-per-domain', type=int, default=2)
+    parser.add_argument('--no-prewarm', dest='prewarm', action='store_false')
+    parser.add_argument('--resume', action='store_true')
+    parser.add_argument('--reopen', action='store_true',
+                        help="Hand an abandoned shard's requests back to pending before crawling it")
+    args = parser.parse_args()
+
+    if args.reopen:
+        frontier = SqliteFrontierQueue(args.queue)
+        try:
+            logger.info(f'Shard {args.shard}: reopened {frontier.reopen(args.shard)} abandoned requests')
+        finally:
+            frontier.close()
+
+    run_worker(args.shard, {
+        'queue_path': args.queue,
+        'fetch_mode': args.fetch_mode,
+        'prewarm': args.prewarm,
+        'extraction_workers': args.extraction_workers,
+        'max_pages_per_domain': args.max_pages_per_domain,
+        'resume': args.resume,
+    })
@@ -0,0 +1,198 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import argparse
+import csv
+import json
+import logging
+import os
+
+from .result_store import iter_results
+from .storage_utils import iter_storage_data
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional, only needed for Parquet export
+    pyarrow = None
+
+try:
+    import openpyxl
+except ImportError:  # optional, only needed for XLSX export
+    openpyxl = None
+
+logger = logging.getLogger(__name__)
+
+# One column per field SmartExtractor can produce, in a fixed order so every
+# export has the same schema whichever pages happened to be crawled
+EXPORT_COLUMNS = [
+    'url',
+    'title',
+    'duplicate_of',
+    'structured',
+    'extracted_title',
+    'description',
+    'main_content',
+    'company',
+    'location',
+    'salary',
+    'price',
+    'employment_type',
+    'date_posted',
+    'publish_date',
+    'authors',
+    'summary',
+    'keywords',
+    'prices',
+    'dates',
+    'named_entities',
+    'key_phrases',
+]
+
+# Excel rejects longer cell values
+XLSX_MAX_CELL = 32767
+
+
+def _cell(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list) and all(isinstance(v, str) for v in value):
+        return '; '.join(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=str, ensure_ascii=False)
+    return str(value)
+
+
+def flatten_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a stored record onto EXPORT_COLUMNS, one scalar per column."""
+    extracted = record.get('extracted_data') or {}
+    row = {
+        'url': record.get('url'),
+        'title': record.get('title'),
+        'duplicate_of': record.get('duplicate_of'),
+        'structured': bool(extracted.get('structured', False)),
+        'extracted_title': extracted.get('title'),
+    }
+    for column in EXPORT_COLUMNS:
+        if column not in row:
+            row[column] = extracted.get(column)
+    return {
+        column: row[column] if column == 'structured' else _cell(row[column])
+        for column in EXPORT_COLUMNS
+    }
+
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _export_csv(rows: Iterable[Dict[str, Any]], path: str) -> int:
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _export_jsonl(records: Iterable[Dict[str, Any]], path: str) -> int:
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, default=str, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def _export_parquet(rows: Iterable[Dict[str, Any]], path: str, batch_size: int) -> int:
+    if pyarrow is None:
+        raise RuntimeError("Parquet export needs the 'pyarrow' package")
+    schema = pyarrow.schema([
+        (column, pyarrow.bool_() if column == 'structured' else pyarrow.string())
+        for column in EXPORT_COLUMNS
+    ])
+    count = 0
+    # One row group per batch keeps memory flat however large the export
+    with pyarrow.parquet.ParquetWriter(path, schema, compression='zstd') as writer:
+        for batch in _batches(rows, batch_size):
+            writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+
+def _export_xlsx(rows: Iterable[Dict[str, Any]], path: str) -> int:
+    if openpyxl is None:
+        raise RuntimeError("XLSX export needs the 'openpyxl' package")
+    # Write-only workbooks stream rows to disk instead of holding the sheet
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('results')
+    sheet.append(EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        sheet.append([
+            value[:XLSX_MAX_CELL] if isinstance(value, str) else value
+            for value in (row[column] for column in EXPORT_COLUMNS)
+        ])
+        count += 1
+    workbook.save(path)
+    return count
+
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet', 'xlsx')
+
+
+def export_results(records: Iterable[Dict[str, Any]],
+                   path: str,
+                   fmt: Optional[str] = None,
+                   batch_size: int = 10_000) -> int:
+    """
+    Stream records into a single export file.
+
+    Args:
+        records: Stored records, e.g. from iter_results or iter_storage_data
+        path: Output file
+        fmt: One of EXPORT_FORMATS; taken from the file extension if omitted
+        batch_size: Rows per Parquet row group
+
+    JSONL keeps the records as stored; the other formats are flattened to
+    EXPORT_COLUMNS. Returns the number of records written.
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {EXPORT_FORMATS}")
+
+    if fmt == 'jsonl':
+        return _export_jsonl(records, path)
+
+    rows = (flatten_record(record) for record in records)
+    if fmt == 'csv':
+        return _export_csv(rows, path)
+    if fmt == 'parquet':
+        return _export_parquet(rows, path, batch_size)
+    return _export_xlsx(rows, path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export crawl results.')
+    parser.add_argument('output', help='Output file; the format follows its extension')
+    parser.add_argument('--format', choices=EXPORT_FORMATS)
+    parser.add_argument('--source', choices=('results', 'dataset'), default='results',
+                        help='Segmented result store or the crawlee dataset')
+    parser.add_argument('--dataset', default='default')
+    args = parser.parse_args()
+
+    if args.source == 'results':
+        records = iter_results()
+    else:
+        records = iter_storage_data(dataset=args.dataset)
+    written = export_results(records, args.output, args.format)
+    print(f'Exported {written} records to {args.output}')
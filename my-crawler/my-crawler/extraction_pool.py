@@ -0,0 +1,274 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Set, Tuple
+import asyncio
+import logging
+import multiprocessing
+import os
+
+from .smart_extractor import SmartExtractor, ContentType, PIPELINE_STATS, EXTRACTOR_BACKENDS
+from .lazy_imports import load_all
+from .model_registry import get_model_registry
+from .nlp_batcher import NlpBatcher
+from .metrics import METRICS, start_profiler_from_env
+
+logger = logging.getLogger(__name__)
+
+# Pages longer than this are cut before extraction; a few runaway pages
+# would otherwise dominate worker memory and parse time
+MAX_HTML_CHARS = 3_000_000
+
+# Event loop owned by a pool worker; SmartExtractor's API is async
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+# A pool worker's NlpBatcher, built on its first batch of pages
+_worker_batcher: Optional[NlpBatcher] = None
+
+
+def warm_extraction_backends() -> Dict[str, float]:
+    """Import the extractor backends and load the models; returns import seconds per backend."""
+    import_times = load_all(*EXTRACTOR_BACKENDS)
+    registry = get_model_registry()
+    registry.nlp()
+    registry.keyword_extractor()
+    return import_times
+
+
+def _init_worker() -> None:
+    """Load the models once when a pool worker starts; a no-op for prewarmed workers."""
+    global _worker_loop
+    _worker_loop = asyncio.new_event_loop()
+    start_profiler_from_env()
+    warm_extraction_backends()
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def _extract_in_worker(html: str, url: str, content_type: str) -> Tuple[Dict[str, Any], str, Dict[str, Any]]:
+    """Run a full extraction inside a pool worker."""
+    extractor = SmartExtractor(ContentType(content_type))
+    extracted_data = _worker_loop.run_until_complete(extractor.extract_content(html=html, url=url))
+    # Stats live in the parent, so send the outcome and stage timings back with the data
+    return extracted_data, extractor.outcome(extracted_data), METRICS.drain()
+
+
+def _extract_batch_in_worker(pages: List[Tuple[str, str, str]],
+                             batcher_options: Dict[str, Any]) -> Tuple[List[Tuple[Dict[str, Any], str]], Dict[str, Any]]:
+    """Extract several pages concurrently in a pool worker, batching their NLP."""
+    global _worker_batcher
+    if _worker_batcher is None:
+        # Every page of a batch is already here, so flush as soon as they have all queued
+        _worker_batcher = NlpBatcher(**dict(batcher_options, max_latency=0.0))
+
+    async def extract(html: str, url: str, content_type: str) -> Tuple[Dict[str, Any], str]:
+        extractor = SmartExtractor(ContentType(content_type), nlp_batcher=_worker_batcher)
+        extracted_data = await extractor.extract_content(html=html, url=url)
+        return extracted_data, extractor.outcome(extracted_data)
+
+    async def extract_all() -> List[Tuple[Dict[str, Any], str]]:
+        return list(await asyncio.gather(*(extract(*page) for page in pages)))
+
+    return _worker_loop.run_until_complete(extract_all()), METRICS.drain()
+
+
+class ExtractionExecutor:
+    """
+    Runs SmartExtractor either inline on the event loop or in a process pool.
+
+    In 'process' mode the HTML is shipped to a ProcessPoolExecutor whose
+    workers keep their models loaded, so the CPU-bound parsing and NLP no
+    longer stall other Playwright pages. At most `max_pending` pages are
+    in flight; further callers wait, which keeps the crawler from queueing
+    more HTML than the pool can work through.
+
+    With an `nlp_batcher`, spaCy runs over batches of pages. Inline, the
+    batcher collects main content from concurrent pages itself. In a
+    process pool, pages that arrive while every worker is busy are queued,
+    and a worker that frees up takes up to `batch_size` of them at once
+    and runs them through its own batcher with the same settings, so
+    batches only form under load and idle workers never wait for one.
+
+    With `prewarm`, workers are forked from a fork server that has already
+    imported the backends and loaded the models, so each new or respawned
+    worker starts warm instead of loading everything itself.
+
+    HTML beyond `max_html_chars` is dropped before it reaches SmartExtractor.
+    The head, with the title and JSON-LD, comes first, so what is kept is
+    usually enough.
+    """
+
+    MODES = ('inline', 'process')
+
+    def __init__(self,
+                 mode: str = 'inline',
+                 max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None,
+                 nlp_batcher: Optional[NlpBatcher] = None,
+                 prewarm: bool = False,
+                 max_html_chars: Optional[int] = MAX_HTML_CHARS):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown extraction mode: {mode}")
+
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.nlp_batcher = nlp_batcher
+        # Enough pages in flight for every worker to have a batch running
+        # and a full one queued behind it
+        per_worker = 2 * nlp_batcher.batch_size if nlp_batcher is not None and mode == 'process' else 2
+        self.max_pending = max_pending or self.max_workers * per_worker
+        self.prewarm = prewarm
+        self.max_html_chars = max_html_chars
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Pages waiting for a worker, and the batches being extracted
+        self._queued: List[Tuple[Tuple[str, str, str], asyncio.Future]] = []
+        self._batches: Set[asyncio.Task] = set()
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            logger.info(f"Starting extraction pool with {self.max_workers} workers")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self._mp_context(),
+                initializer=_init_worker
+            )
+        return self._pool
+
+    def _mp_context(self):
+        if not self.prewarm:
+            return None
+        if 'forkserver' not in multiprocessing.get_all_start_methods():
+            logger.warning("No fork server on this platform; workers will load models themselves")
+            return None
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([f'{__package__}.prewarm'])
+        return context
+
+    async def start(self) -> None:
+        """Start every pool worker now rather than on the first pages."""
+        if self.mode != 'process':
+            warm_extraction_backends()
+            return
+        loop = asyncio.get_running_loop()
+        pool = self._ensure_pool()
+        pids = await asyncio.gather(*(
+            loop.run_in_executor(pool, _ready) for _ in range(self.max_workers)
+        ))
+        logger.info(f"Extraction pool ready: {len(set(pids))} workers")
+
+    async def extract(self, html: str, url: str, content_type: ContentType) -> Dict[str, Any]:
+        """Extract content from a page, returning SmartExtractor's output dict."""
+        if self.max_html_chars is not None and len(html) > self.max_html_chars:
+            logger.info(f"Truncating {url} from {len(html)} to {self.max_html_chars} characters")
+            METRICS.count('html_truncated', content_type=content_type.value)
+            html = html[:self.max_html_chars]
+
+        if self.mode == 'inline':
+            smart_extractor = SmartExtractor(nlp_batcher=self.nlp_batcher)
+            smart_extractor.set_content_type(content_type)
+            with METRICS.span('extract', content_type=content_type.value):
+                extracted_data = await smart_extractor.extract_content(html=html, url=url)
+            self._record(content_type, smart_extractor.outcome(extracted_data))
+            return extracted_data
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        # Includes time queued for a slot and a worker
+        with METRICS.span('extract', content_type=content_type.value):
+            async with self._slots:
+                if self.nlp_batcher is not None:
+                    extracted_data, outcome = await self._extract_batched(html, url, content_type.value)
+                else:
+                    loop = asyncio.get_running_loop()
+                    extracted_data, outcome, worker_metrics = await loop.run_in_executor(
+                        self._ensure_pool(),
+                        _extract_in_worker,
+                        html,
+                        url,
+                        content_type.value
+                    )
+                    METRICS.merge(worker_metrics)
+        self._record(content_type, outcome)
+        return extracted_data
+
+    async def _extract_batched(self, html: str, url: str, content_type: str) -> Tuple[Dict[str, Any], str]:
+        future = asyncio.get_running_loop().create_future()
+        self._queued.append(((html, url, content_type), future))
+        self._dispatch()
+        return await future
+
+    def _dispatch(self) -> None:
+        """Hand queued pages to free workers, up to a batch each."""
+        while self._queued and len(self._batches) < self.max_workers:
+            batch_size = self.nlp_batcher.batch_size
+            batch, self._queued = self._queued[:batch_size], self._queued[batch_size:]
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            # Kept until done, so the task is not garbage-collected mid-flight
+            self._batches.add(task)
+            task.add_done_callback(self._batch_done)
+
+    def _batch_done(self, task: asyncio.Task) -> None:
+        self._batches.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Extraction batch failed: {str(task.exception())}")
+        self._dispatch()
+
+    async def _run_batch(self, batch: List[Tuple[Tuple[str, str, str], asyncio.Future]]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            results, worker_metrics = await loop.run_in_executor(
+                self._ensure_pool(),
+                _extract_batch_in_worker,
+                [page for page, _ in batch],
+                self.nlp_batcher.options()
+            )
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            raise
+        METRICS.merge(worker_metrics)
+
+    def _record(self, content_type: ContentType, outcome: str) -> None:
+        PIPELINE_STATS.record(outcome)
+        # Structured hits, profile rejections by stage and empty results per type
+        METRICS.count('pages', content_type=content_type.value, outcome=outcome)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self.nlp_batcher is not None:
+            self.nlp_batcher.shutdown()
+
+
+_executor: Optional[ExtractionExecutor] = None
+
+
+def configure_extraction_executor(mode: str = 'inline',
+                                  max_workers: Optional[int] = None,
+                                  max_pending: Optional[int] = None,
+                                  nlp_batcher: Optional[NlpBatcher] = None,
+                                  prewarm: bool = False,
+                                  max_html_chars: Optional[int] = MAX_HTML_CHARS) -> ExtractionExecutor:
+    """Replace the executor used by the request handler."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+    _executor = ExtractionExecutor(mode, max_workers, max_pending, nlp_batcher, prewarm, max_html_chars)
+    return _executor
+
+
+def get_extraction_executor() -> ExtractionExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ExtractionExecutor()
+    return _executor
@@ -0,0 +1,433 @@
+from abc import ABC, abstractmethod
+from crawlee import Request
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterable, List, Optional, Union
+from urllib.parse import urlparse
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+
+from .storage_utils import storage_path
+
+logger = logging.getLogger(__name__)
+
+# Request states in the frontier
+PENDING, CLAIMED, HANDLED, ABANDONED = range(4)
+STATE_NAMES = ('pending', 'claimed', 'handled', 'abandoned')
+
+# Lanes split a shard's work between passes: an adaptive worker fetches the
+# default lane over HTTP, then renders what it escalated to the browser lane
+DEFAULT_LANE = 'default'
+BROWSER_LANE = 'browser'
+
+SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS requests ('
+    ' id INTEGER PRIMARY KEY, unique_key TEXT UNIQUE, shard INTEGER, domain TEXT,'
+    ' lane TEXT, state INTEGER, request TEXT, claimed_at REAL)',
+    'CREATE INDEX IF NOT EXISTS requests_claim ON requests (shard, lane, state, id)',
+    'CREATE TABLE IF NOT EXISTS domains (domain TEXT PRIMARY KEY, admitted INTEGER)',
+    'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)',
+    'CREATE TABLE IF NOT EXISTS abandoned_shards (shard INTEGER PRIMARY KEY)',
+]
+
+
+def shard_for(url: str, shards: int) -> int:
+    """The shard owning the URL's domain, the same in every process and on every host."""
+    domain = urlparse(url).netloc.lower()
+    # hash() is salted per process, so it cannot be shared between workers
+    digest = hashlib.blake2b(domain.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % shards
+
+
+class FrontierQueue(ABC):
+    """
+    The shared frontier of a distributed crawl.
+
+    Requests are filed under the shard their domain hashes to, so every
+    domain is crawled by exactly one worker. A worker claims a few requests
+    at a time from its shard and reports each one handled or hands it back
+    for a retry; claims not reported within the lease go back to pending,
+    so a crashed worker loses nothing. Within a shard, requests sit in a
+    lane (DEFAULT_LANE unless escalated), and claims and completions only
+    touch their own lane. Subclass this for another backend.
+    """
+
+    shards: int
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget every request, for a fresh crawl."""
+
+    @abstractmethod
+    def put(self, requests: Iterable[Union[str, Request]], lane: str = DEFAULT_LANE) -> int:
+        """File new requests under their shards; returns how many were new and within budget."""
+
+    @abstractmethod
+    def claim(self, shard: int, limit: int, completed: Iterable[str] = (),
+              lane: str = DEFAULT_LANE) -> List[Request]:
+        """Claim up to `limit` pending requests, marking `completed` handled in the same write."""
+
+    @abstractmethod
+    def complete(self, unique_keys: Iterable[str], lane: str = DEFAULT_LANE) -> None:
+        """Mark requests handled in their lane."""
+
+    @abstractmethod
+    def escalate(self, unique_keys: Iterable[str], lane: str = BROWSER_LANE) -> None:
+        """Move requests to another lane as pending, without using more of the budget."""
+
+    @abstractmethod
+    def reclaim(self, request: Request) -> None:
+        """Return a failed request, with its updated retry count, for another attempt."""
+
+    @abstractmethod
+    def release(self, unique_keys: Iterable[str]) -> None:
+        """Return claimed requests that were never started."""
+
+    @abstractmethod
+    def requeue_claimed(self, shard: Optional[int] = None) -> int:
+        """Return every claim, e.g. of a worker known to be dead, without waiting out the lease."""
+
+    @abstractmethod
+    def abandon(self, shard: int) -> int:
+        """
+        Give up on a shard's remaining requests so the other workers can finish.
+
+        Requests put for the shard afterwards are dropped, or nobody would
+        ever handle them and the crawl would never end.
+        """
+
+    @abstractmethod
+    def reopen(self, shard: int) -> int:
+        """Undo `abandon`: the shard's abandoned requests go back to pending and it takes new ones again."""
+
+    @abstractmethod
+    def unfinished(self, shard: Optional[int] = None, lane: Optional[str] = None) -> int:
+        """Requests pending or claimed, in one shard or all of them, and one lane or all of them."""
+
+    @abstractmethod
+    def counts(self) -> Dict[int, Dict[str, int]]:
+        """Requests per shard and state."""
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteFrontierQueue(FrontierQueue):
+    """
+    FrontierQueue in one SQLite file, shared by worker processes on a host.
+
+    WAL mode lets workers read while one writes, and every write is a short
+    IMMEDIATE transaction, so claims never race. Duplicate requests are
+    dropped by unique key across all shards, and the per-domain and total
+    budgets are enforced here, where every worker's links meet. Keep the
+    file on a local disk; SQLite locking is not safe over network shares.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 shards: Optional[int] = None,
+                 max_requests: Optional[int] = None,
+                 max_pages_per_domain: Optional[int] = None,
+                 lease_seconds: float = 600.0):
+        self.path = path or storage_path('distributed', 'frontier.sqlite')
+        self.lease_seconds = lease_seconds
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        for statement in SCHEMA:
+            self._db.execute(statement)
+
+        # The coordinator fixes the settings; workers read them back
+        settings = dict(self._db.execute('SELECT key, value FROM meta').fetchall())
+        if shards is not None and 'shards' in settings and int(settings['shards']) != shards:
+            raise ValueError(
+                f"{self.path} is sharded {settings['shards']} ways, not {shards}; "
+                f"reset it to change the shard count"
+            )
+        self.shards = shards or int(settings.get('shards', 1))
+        self.max_requests = max_requests if max_requests is not None else _optional_int(settings.get('max_requests'))
+        self.max_pages_per_domain = (
+            max_pages_per_domain if max_pages_per_domain is not None
+            else _optional_int(settings.get('max_pages_per_domain'))
+        )
+        if shards is not None:
+            with self._write() as db:
+                db.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', [
+                    ('shards', str(self.shards)),
+                    ('max_requests', None if self.max_requests is None else str(self.max_requests)),
+                    ('max_pages_per_domain',
+                     None if self.max_pages_per_domain is None else str(self.max_pages_per_domain)),
+                ])
+
+    @contextmanager
+    def _write(self):
+        # IMMEDIATE takes the write lock up front, so two claims cannot pick the same rows
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+        self._db.execute('COMMIT')
+
+    def reset(self) -> None:
+        """Forget every request, for a fresh crawl."""
+        with self._write() as db:
+            db.execute('DELETE FROM requests')
+            db.execute('DELETE FROM domains')
+            db.execute('DELETE FROM abandoned_shards')
+
+    def put(self, requests: Iterable[Union[str, Request]], lane: str = DEFAULT_LANE) -> int:
+        rows = []
+        for request in requests:
+            if isinstance(request, str):
+                request = Request.from_url(request)
+            rows.append((request, urlparse(request.url).netloc.lower()))
+        if not rows:
+            return 0
+
+        added = 0
+        with self._write() as db:
+            total = None
+            if self.max_requests is not None:
+                total = db.execute('SELECT COUNT(*) FROM requests').fetchone()[0]
+            abandoned = {shard for shard, in db.execute('SELECT shard FROM abandoned_shards')}
+            for request, domain in rows:
+                if total is not None and total >= self.max_requests:
+                    break
+                shard = shard_for(request.url, self.shards)
+                if shard in abandoned:
+                    continue
+                if self.max_pages_per_domain is not None:
+                    admitted = db.execute('SELECT admitted FROM domains WHERE domain = ?', (domain,)).fetchone()
+                    if admitted is not None and admitted[0] >= self.max_pages_per_domain:
+                        continue
+                cursor = db.execute(
+                    'INSERT OR IGNORE INTO requests (unique_key, shard, domain, lane, state, request) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (request.unique_key, shard, domain, lane, PENDING,
+                     request.model_dump_json(by_alias=True))
+                )
+                if cursor.rowcount:
+                    added += 1
+                    if total is not None:
+                        total += 1
+                    db.execute(
+                        'INSERT INTO domains VALUES (?, 1) '
+                        'ON CONFLICT(domain) DO UPDATE SET admitted = admitted + 1', (domain,)
+                    )
+        return added
+
+    def claim(self, shard: int, limit: int, completed: Iterable[str] = (),
+              lane: str = DEFAULT_LANE) -> List[Request]:
+        now = time.time()
+        with self._write() as db:
+            self._complete(db, completed, lane)
+            # Claims from a worker that died are fair game again
+            db.execute(
+                'UPDATE requests SET state = ?, claimed_at = NULL '
+                'WHERE shard = ? AND state = ? AND claimed_at < ?',
+                (PENDING, shard, CLAIMED, now - self.lease_seconds)
+            )
+            rows = db.execute(
+                'SELECT id, request FROM requests WHERE shard = ? AND lane = ? AND state = ? ORDER BY id LIMIT ?',
+                (shard, lane, PENDING, limit)
+            ).fetchall()
+            db.executemany(
+                'UPDATE requests SET state = ?, claimed_at = ? WHERE id = ?',
+                [(CLAIMED, now, row_id) for row_id, _ in rows]
+            )
+        return [Request.model_validate_json(raw) for _, raw in rows]
+
+    @staticmethod
+    def _complete(db: sqlite3.Connection, unique_keys: Iterable[str], lane: str) -> None:
+        # A request escalated to another lane is not done when its first pass is
+        db.executemany(
+            'UPDATE requests SET state = ? WHERE unique_key = ? AND lane = ?',
+            [(HANDLED, key, lane) for key in unique_keys]
+        )
+
+    def complete(self, unique_keys: Iterable[str], lane: str = DEFAULT_LANE) -> None:
+        with self._write() as db:
+            self._complete(db, unique_keys, lane)
+
+    def escalate(self, unique_keys: Iterable[str], lane: str = BROWSER_LANE) -> None:
+        with self._write() as db:
+            db.executemany(
+                'UPDATE requests SET lane = ?, state = ?, claimed_at = NULL WHERE unique_key = ? AND state != ?',
+                [(lane, PENDING, key, ABANDONED) for key in unique_keys]
+            )
+
+    def reclaim(self, request: Request) -> None:
+        with self._write() as db:
+            db.execute(
+                'UPDATE requests SET state = ?, claimed_at = NULL, request = ? WHERE unique_key = ?',
+                (PENDING, request.model_dump_json(by_alias=True), request.unique_key)
+            )
+
+    def release(self, unique_keys: Iterable[str]) -> None:
+        with self._write() as db:
+            db.executemany(
+                'UPDATE requests SET state = ?, claimed_at = NULL WHERE unique_key = ? AND state = ?',
+                [(PENDING, key, CLAIMED) for key in unique_keys]
+            )
+
+    def requeue_claimed(self, shard: Optional[int] = None) -> int:
+        with self._write() as db:
+            if shard is None:
+                cursor = db.execute(
+                    'UPDATE requests SET state = ?, claimed_at = NULL WHERE state = ?', (PENDING, CLAIMED)
+                )
+            else:
+                cursor = db.execute(
+                    'UPDATE requests SET state = ?, claimed_at = NULL WHERE shard = ? AND state = ?',
+                    (PENDING, shard, CLAIMED)
+                )
+            return cursor.rowcount
+
+    def abandon(self, shard: int) -> int:
+        with self._write() as db:
+            db.execute('INSERT OR IGNORE INTO abandoned_shards VALUES (?)', (shard,))
+            return db.execute(
+                'UPDATE requests SET state = ? WHERE shard = ? AND state IN (?, ?)',
+                (ABANDONED, shard, PENDING, CLAIMED)
+            ).rowcount
+
+    def reopen(self, shard: int) -> int:
+        with self._write() as db:
+            db.execute('DELETE FROM abandoned_shards WHERE shard = ?', (shard,))
+            return db.execute(
+                'UPDATE requests SET state = ?, claimed_at = NULL WHERE shard = ? AND state = ?',
+                (PENDING, shard, ABANDONED)
+            ).rowcount
+
+    def unfinished(self, shard: Optional[int] = None, lane: Optional[str] = None) -> int:
+        query = 'SELECT COUNT(*) FROM requests WHERE state IN (?, ?)'
+        params: List[Any] = [PENDING, CLAIMED]
+        if shard is not None:
+            query += ' AND shard = ?'
+            params.append(shard)
+        if lane is not None:
+            query += ' AND lane = ?'
+            params.append(lane)
+        return self._db.execute(query, params).fetchone()[0]
+
+    def counts(self) -> Dict[int, Dict[str, int]]:
+        counts = {shard: dict.fromkeys(STATE_NAMES, 0) for shard in range(self.shards)}
+        for shard, state, count in self._db.execute(
+            'SELECT shard, state, COUNT(*) FROM requests GROUP BY shard, state'
+        ):
+            counts.setdefault(shard, dict.fromkeys(STATE_NAMES, 0))[STATE_NAMES[state]] = count
+        return counts
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def _optional_int(value: Optional[str]) -> Optional[int]:
+    return None if value is None else int(value)
+
+
+class ShardRequestProvider:
+    """
+    crawlee request provider over one shard of a FrontierQueue.
+
+    Passed to a crawler as `request_provider`, it replaces the local request
+    queue: the crawler claims its shard's requests a batch at a time and
+    links it enqueues go to whichever shard owns them. The crawl only counts
+    as finished once no shard has work left in the provider's lane, since
+    any worker may still add requests for this one.
+
+    Handled requests are reported with the next claim, in one write; a
+    crash before then only means those pages are fetched again.
+    """
+
+    def __init__(self,
+                 queue: FrontierQueue,
+                 shard: int,
+                 lane: str = DEFAULT_LANE,
+                 batch_size: int = 8,
+                 poll_interval: float = 1.0):
+        self.queue = queue
+        self.shard = shard
+        self.lane = lane
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._buffer: Deque[Request] = deque()
+        self._completed: List[str] = []
+        self._last_poll = 0.0
+        self._handled = 0
+
+    @property
+    def name(self) -> str:
+        return f'shard-{self.shard:02d}' if self.lane == DEFAULT_LANE else f'shard-{self.shard:02d}-{self.lane}'
+
+    def for_lane(self, lane: str) -> 'ShardRequestProvider':
+        """A provider over another lane of the same shard."""
+        return ShardRequestProvider(self.queue, self.shard, lane, self.batch_size, self.poll_interval)
+
+    def escalate(self, request: Request, lane: str = BROWSER_LANE) -> None:
+        """Hand the request on to another lane rather than marking it handled here."""
+        self.queue.escalate([request.unique_key], lane)
+
+    def _refill(self, force: bool = False) -> None:
+        # The crawler asks far more often than an idle shard gets new work
+        now = time.monotonic()
+        if self._buffer or (not force and now - self._last_poll < self.poll_interval):
+            return
+        self._last_poll = now
+        completed, self._completed = self._completed, []
+        self._buffer.extend(self.queue.claim(self.shard, self.batch_size, completed, self.lane))
+
+    def _flush_completed(self) -> None:
+        if self._completed:
+            completed, self._completed = self._completed, []
+            self.queue.complete(completed, self.lane)
+
+    async def fetch_next_request(self) -> Optional[Request]:
+        self._refill(force=True)
+        return self._buffer.popleft() if self._buffer else None
+
+    async def is_empty(self) -> bool:
+        self._refill()
+        return not self._buffer
+
+    async def is_finished(self) -> bool:
+        if self._buffer:
+            return False
+        self._flush_completed()
+        return self.queue.unfinished(lane=self.lane) == 0
+
+    async def mark_request_as_handled(self, request: Request) -> None:
+        self._completed.append(request.unique_key)
+        self._handled += 1
+
+    async def reclaim_request(self, request: Request, *, forefront: bool = False) -> None:
+        self.queue.reclaim(request)
+
+    async def add_request(self, request: Union[str, Request], *, forefront: bool = False) -> None:
+        self.queue.put([request], self.lane)
+
+    async def add_requests_batched(self, requests: Iterable[Union[str, Request]], **options: Any) -> None:
+        self.queue.put(requests, self.lane)
+
+    async def get_handled_count(self) -> int:
+        return self._handled
+
+    async def get_total_count(self) -> int:
+        return sum(self.queue.counts().get(self.shard, {}).values())
+
+    async def drop(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Report what was handled and hand back requests claimed but not started."""
+        self._flush_completed()
+        if self._buffer:
+            self.queue.release(request.unique_key for request in self._buffer)
+            self._buffer.clear()
@@ -0,0 +1,49 @@
+from types import ModuleType
+from typing import Dict
+import importlib
+import threading
+import time
+
+# Seconds each lazily imported module took to load, in load order
+IMPORT_TIMES: Dict[str, float] = {}
+
+_lock = threading.Lock()
+
+
+class LazyModule(ModuleType):
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    Lets heavy extractor backends be named at module level as usual while
+    only processes that actually extract pay for loading them.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module = None
+
+    def _load(self) -> ModuleType:
+        with _lock:
+            if self._module is None:
+                started = time.perf_counter()
+                self._module = importlib.import_module(self.__name__)
+                IMPORT_TIMES[self.__name__] = time.perf_counter() - started
+        return self._module
+
+    def __getattr__(self, attr: str):
+        # Only called for attributes not set on the proxy itself
+        return getattr(self._module or self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def load_all(*modules: LazyModule) -> Dict[str, float]:
+    """Import the given lazy modules now, e.g. before forking workers."""
+    for module in modules:
+        module._load()
+    return dict(IMPORT_TIMES)
@@ -0,0 +1,311 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import argparse
+import json
+import logging
+import os
+import sqlite3
+
+from .storage_utils import storage_path
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS docs ('
+    ' id INTEGER PRIMARY KEY, url TEXT UNIQUE, title TEXT,'
+    ' main_content TEXT, key_phrases TEXT, record TEXT)',
+    # Full text over the docs table without storing the text twice
+    'CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5('
+    ' title, main_content, key_phrases, content=docs, content_rowid=id)',
+    'CREATE TABLE IF NOT EXISTS prices (doc_id INTEGER, amount REAL, currency TEXT)',
+    'CREATE INDEX IF NOT EXISTS prices_amount ON prices (amount, doc_id)',
+    'CREATE INDEX IF NOT EXISTS prices_doc ON prices (doc_id)',
+    'CREATE TABLE IF NOT EXISTS dates (doc_id INTEGER, date TEXT)',
+    'CREATE INDEX IF NOT EXISTS dates_date ON dates (date, doc_id)',
+    'CREATE INDEX IF NOT EXISTS dates_doc ON dates (doc_id)',
+    'CREATE TABLE IF NOT EXISTS entities (doc_id INTEGER, label TEXT, text TEXT)',
+    'CREATE INDEX IF NOT EXISTS entities_label ON entities (label, text, doc_id)',
+    'CREATE INDEX IF NOT EXISTS entities_doc ON entities (doc_id)',
+]
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.replace(',', ''))
+        except ValueError:
+            return None
+    return None
+
+
+def _prices(extracted: Dict[str, Any]) -> List[Tuple[float, Optional[str]]]:
+    prices = [
+        (price['amount'], price.get('currency'))
+        for price in extracted.get('prices') or []
+        if isinstance(price, dict) and price.get('amount') is not None
+    ]
+    # Structured data carries the salary or rent as a single value
+    for key in ('salary', 'price'):
+        amount = _number(extracted.get(key))
+        if amount is not None:
+            prices.append((amount, None))
+    return prices
+
+
+def _dates(extracted: Dict[str, Any]) -> List[str]:
+    dates = [date for date in extracted.get('dates') or [] if isinstance(date, str)]
+    for key in ('date_posted', 'publish_date'):
+        if isinstance(extracted.get(key), str):
+            dates.append(extracted[key])
+    return dates
+
+
+class ListingIndex:
+    """
+    On-disk index over crawled records, kept up to date as they are pushed.
+
+    Full-text search (SQLite FTS5) over title, main_content and
+    key_phrases; B-tree range indexes over the extracted prices and dates;
+    and (label, text) rows for named-entity facets. Every filter is served
+    from an index, so queries stay fast however many records there are.
+    Writes are committed every `commit_every` records.
+    """
+
+    def __init__(self, path: Optional[str] = None, commit_every: int = 200):
+        self.path = path or storage_path('listing_index.sqlite')
+        self.commit_every = commit_every
+        self._pending = 0
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        for statement in SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+
+    def _remove(self, url: str) -> None:
+        row = self._db.execute(
+            'SELECT id, title, main_content, key_phrases FROM docs WHERE url = ?', (url,)
+        ).fetchone()
+        if row is None:
+            return
+        doc_id = row[0]
+        # External-content FTS tables need the old values to drop their terms
+        self._db.execute(
+            "INSERT INTO docs_fts (docs_fts, rowid, title, main_content, key_phrases) "
+            "VALUES ('delete', ?, ?, ?, ?)", row
+        )
+        for table in ('prices', 'dates', 'entities'):
+            self._db.execute(f'DELETE FROM {table} WHERE doc_id = ?', (doc_id,))
+        self._db.execute('DELETE FROM docs WHERE id = ?', (doc_id,))
+
+    def add(self, record: Dict[str, Any]) -> bool:
+        """Index a stored record, replacing any earlier one for the URL; False if it has no extraction."""
+        extracted = record.get('extracted_data')
+        url = record.get('url')
+        if not extracted or not url:
+            return False
+
+        self._remove(url)
+        title = extracted.get('title') or record.get('title')
+        key_phrases = ' | '.join(extracted.get('key_phrases') or [])
+        cursor = self._db.execute(
+            'INSERT INTO docs (url, title, main_content, key_phrases, record) VALUES (?, ?, ?, ?, ?)',
+            (url, title, extracted.get('main_content'), key_phrases, json.dumps(record, default=str))
+        )
+        doc_id = cursor.lastrowid
+        self._db.execute(
+            'INSERT INTO docs_fts (rowid, title, main_content, key_phrases) VALUES (?, ?, ?, ?)',
+            (doc_id, title, extracted.get('main_content'), key_phrases)
+        )
+        self._db.executemany(
+            'INSERT INTO prices VALUES (?, ?, ?)',
+            [(doc_id, amount, currency) for amount, currency in _prices(extracted)]
+        )
+        self._db.executemany(
+            'INSERT INTO dates VALUES (?, ?)',
+            [(doc_id, date) for date in _dates(extracted)]
+        )
+        self._db.executemany(
+            'INSERT INTO entities VALUES (?, ?, ?)',
+            [
+                (doc_id, label, text)
+                for label, texts in (extracted.get('named_entities') or {}).items()
+                for text in dict.fromkeys(texts)
+            ]
+        )
+
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+        return True
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        added = sum(1 for record in records if self.add(record))
+        self.commit()
+        return added
+
+    def _where(self,
+               text: Optional[str],
+               min_price: Optional[float],
+               max_price: Optional[float],
+               currency: Optional[str],
+               date_from: Optional[str],
+               date_to: Optional[str],
+               entities: Optional[Dict[str, str]]) -> Tuple[List[str], List[Any]]:
+        clauses, params = [], []
+        if text:
+            clauses.append('docs.id IN (SELECT rowid FROM docs_fts WHERE docs_fts MATCH ?)')
+            params.append(text)
+        if min_price is not None or max_price is not None or currency:
+            price_clauses = ['prices.doc_id = docs.id']
+            if min_price is not None:
+                price_clauses.append('prices.amount >= ?')
+                params.append(min_price)
+            if max_price is not None:
+                price_clauses.append('prices.amount <= ?')
+                params.append(max_price)
+            if currency:
+                price_clauses.append('prices.currency = ?')
+                params.append(currency)
+            clauses.append(f"EXISTS (SELECT 1 FROM prices WHERE {' AND '.join(price_clauses)})")
+        if date_from or date_to:
+            date_clauses = ['dates.doc_id = docs.id']
+            if date_from:
+                date_clauses.append('dates.date >= ?')
+                params.append(date_from)
+            if date_to:
+                # Dates are ISO strings, so a bare day covers its whole day
+                date_clauses.append('dates.date <= ?')
+                params.append(date_to if 'T' in date_to else date_to + 'T23:59:59')
+            clauses.append(f"EXISTS (SELECT 1 FROM dates WHERE {' AND '.join(date_clauses)})")
+        for label, value in (entities or {}).items():
+            clauses.append(
+                'EXISTS (SELECT 1 FROM entities WHERE entities.doc_id = docs.id '
+                'AND entities.label = ? AND entities.text = ?)'
+            )
+            params.extend([label, value])
+        return clauses, params
+
+    def search(self,
+               text: Optional[str] = None,
+               min_price: Optional[float] = None,
+               max_price: Optional[float] = None,
+               currency: Optional[str] = None,
+               date_from: Optional[str] = None,
+               date_to: Optional[str] = None,
+               entities: Optional[Dict[str, str]] = None,
+               limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Records matching every given filter.
+
+        Args:
+            text: FTS5 query over title, main_content and key_phrases,
+                e.g. 'graduate AND adelaide'; results are ranked by relevance
+            min_price, max_price, currency: Any extracted price in range
+            date_from, date_to: Any extracted date in range (ISO format)
+            entities: Required named entities as {label: text}, e.g. {'GPE': 'Adelaide'}
+            limit: Maximum records returned
+        """
+        clauses, params = self._where(None, min_price, max_price, currency, date_from, date_to, entities)
+        if text:
+            # Join the FTS rows directly so results can be ranked by bm25
+            clauses = ['docs_fts MATCH ?'] + clauses
+            params = [text] + params
+            query = (
+                'SELECT docs.record FROM docs_fts JOIN docs ON docs.id = docs_fts.rowid '
+                f"WHERE {' AND '.join(clauses)} ORDER BY bm25(docs_fts) LIMIT ?"
+            )
+        else:
+            where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+            query = f'SELECT docs.record FROM docs{where} ORDER BY docs.id DESC LIMIT ?'
+        params = params + [limit]
+        return [json.loads(row[0]) for row in self._db.execute(query, params)]
+
+    def facets(self, label: str, limit: int = 20, **filters) -> List[Tuple[str, int]]:
+        """Most common entity texts under `label` among records matching `filters`."""
+        clauses, params = self._where(
+            filters.get('text'), filters.get('min_price'), filters.get('max_price'),
+            filters.get('currency'), filters.get('date_from'), filters.get('date_to'),
+            filters.get('entities')
+        )
+        query = (
+            'SELECT entities.text, COUNT(*) FROM entities WHERE entities.label = ? '
+            f"AND entities.doc_id IN (SELECT docs.id FROM docs WHERE {' AND '.join(clauses) or '1'}) "
+            'GROUP BY entities.text ORDER BY COUNT(*) DESC LIMIT ?'
+        )
+        return [tuple(row) for row in self._db.execute(query, [label] + params + [limit])]
+
+    def count(self) -> int:
+        return self._db.execute('SELECT COUNT(*) FROM docs').fetchone()[0]
+
+    def commit(self) -> None:
+        self._db.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self._db.close()
+
+
+_listing_index: Optional[ListingIndex] = None
+
+
+def configure_listing_index(path: Optional[str] = None, commit_every: int = 200) -> ListingIndex:
+    """Index records as they are pushed during a crawl."""
+    global _listing_index
+    if _listing_index is not None:
+        _listing_index.close()
+    _listing_index = ListingIndex(path, commit_every)
+    return _listing_index
+
+
+def get_listing_index() -> Optional[ListingIndex]:
+    return _listing_index
+
+
+if __name__ == '__main__':
+    from .result_store import iter_results
+    from .storage_utils import iter_storage_data
+
+    parser = argparse.ArgumentParser(description='Build or query the listing index.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='Index every stored record')
+    build.add_argument('--source', choices=('results', 'dataset'), default='results')
+    build.add_argument('--dataset', default='default')
+
+    query = commands.add_parser('query', help='Search the index')
+    query.add_argument('text', nargs='?', help='Full-text query')
+    query.add_argument('--min-price', type=float)
+    query.add_argument('--max-price', type=float)
+    query.add_argument('--currency')
+    query.add_argument('--date-from')
+    query.add_argument('--date-to')
+    query.add_argument('--entity', action='append', default=[], metavar='LABEL=TEXT')
+    query.add_argument('--facet', metavar='LABEL', help='Show entity counts instead of records')
+    query.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    index = ListingIndex()
+    if args.command == 'build':
+        records = iter_results() if args.source == 'results' else iter_storage_data(dataset=args.dataset)
+        print(f'Indexed {index.add_many(records)} records ({index.count()} in index)')
+    else:
+        filters = dict(
+            text=args.text,
+            min_price=args.min_price,
+            max_price=args.max_price,
+            currency=args.currency,
+            date_from=args.date_from,
+            date_to=args.date_to,
+            entities=dict(entity.split('=', 1) for entity in args.entity)
+        )
+        if args.facet:
+            for value, count in index.facets(args.facet, limit=args.limit, **filters):
+                print(f'{count:>8}  {value}')
+        else:
+            for record in index.search(limit=args.limit, **filters):
+                print(f"{record['url']} - {record.get('title')}")
+    index.close()
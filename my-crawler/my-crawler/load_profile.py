@@ -0,0 +1,131 @@
+from crawlee.browsers import BrowserPool
+from crawlee.playwright_crawler import PlaywrightCrawler, PlaywrightPreNavigationContext
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from weakref import WeakKeyDictionary
+import logging
+import time
+
+from .browser_pool import BrowserPoolSettings, ManagedBrowserPool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PageLoadStats:
+    started: float = field(default_factory=time.perf_counter)
+    bytes_transferred: int = 0
+    blocked_requests: int = 0
+    time_to_content: Optional[float] = None
+    wait_until: str = 'load'
+
+    def restart(self) -> None:
+        """Start counting afresh for the page's next navigation."""
+        self.started = time.perf_counter()
+        self.bytes_transferred = 0
+        self.blocked_requests = 0
+        self.time_to_content = None
+
+
+# crawlee navigates with the default wait for the load event; stopping the
+# page's remaining subresource loads once its document is parsed makes that
+# event fire at DOMContentLoaded instead
+STOP_AT_DOMCONTENTLOADED = (
+    "if (window === window.top) {"
+    " document.addEventListener('DOMContentLoaded', () => window.stop(), { once: true }); }"
+)
+
+# Stats of every open page, filled in by the load profile's hook
+_page_stats: 'WeakKeyDictionary' = WeakKeyDictionary()
+
+
+def page_load_stats(page) -> Optional[PageLoadStats]:
+    """Stats recorded for a Playwright page, if a load profile is attached."""
+    return _page_stats.get(page)
+
+
+@dataclass
+class LoadProfile:
+    """
+    How lean a Playwright page load should be.
+
+    Requests for the listed resource types, or to hosts containing one of
+    the listed patterns, are aborted before they leave the browser, and
+    the page is captured at `wait_until` instead of the full load event.
+    Attach it to a PlaywrightCrawler; it works as a pre-navigation hook.
+    """
+    blocked_resource_types: List[str] = field(default_factory=lambda: [
+        'image', 'font', 'media', 'imageset'
+    ])
+    blocked_host_patterns: List[str] = field(default_factory=lambda: [
+        'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+        'googlesyndication.com', 'facebook.net', 'hotjar.com',
+        'segment.io', 'newrelic.com', 'adservice.'
+    ])
+    # 'domcontentloaded' is enough for server-rendered pages; use 'load' or
+    # 'networkidle' for sites that render their listings with JS
+    wait_until: str = 'domcontentloaded'
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.blocked_resource_types:
+            return True
+        host = urlparse(url).netloc
+        return any(pattern in host for pattern in self.blocked_host_patterns)
+
+    def attach(self, crawler: PlaywrightCrawler) -> PlaywrightCrawler:
+        """Apply the profile to every navigation the crawler makes."""
+        crawler.pre_navigation_hook(self._before_navigation)
+        return crawler
+
+    async def _before_navigation(self, context: PlaywrightPreNavigationContext) -> None:
+        page = context.page
+        stats = _page_stats.get(page)
+        if stats is None:
+            # First navigation of this page: set up blocking and counting once
+            stats = PageLoadStats(wait_until=self.wait_until)
+            _page_stats[page] = stats
+            await page.route('**/*', lambda route: self._route(route, stats))
+            page.on('response', lambda response: self._count_response(response, stats))
+            if self.wait_until == 'domcontentloaded':
+                await page.add_init_script(STOP_AT_DOMCONTENTLOADED)
+        stats.restart()
+
+    async def _route(self, route, stats: PageLoadStats) -> None:
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            stats.blocked_requests += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @staticmethod
+    def _count_response(response, stats: PageLoadStats) -> None:
+        # Content-Length is missing for chunked responses, so this is a
+        # lower bound, but it costs nothing to read
+        length = response.headers.get('content-length')
+        if length and length.isdigit():
+            stats.bytes_transferred += int(length)
+
+
+async def capture_html(page) -> str:
+    """Serialise the page once and record its time-to-content."""
+    stats = page_load_stats(page)
+    if stats is not None and stats.wait_until == 'networkidle':
+        await page.wait_for_load_state('networkidle')
+    html = await page.content()
+    if stats is not None:
+        stats.time_to_content = time.perf_counter() - stats.started
+    return html
+
+
+def make_browser_pool(settings: Optional[BrowserPoolSettings] = None, **pool_options) -> BrowserPool:
+    """
+    A browser pool for a PlaywrightCrawler; attach the load profile to the crawler.
+
+    With `settings`, a ManagedBrowserPool that caps pages and recycles
+    browsers.
+    """
+    if settings is None:
+        return BrowserPool.with_default_plugin(**pool_options)
+    return ManagedBrowserPool(settings, **pool_options)
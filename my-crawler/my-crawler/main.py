@@ -1,25 +1,40 @@
+from crawlee import ConcurrencySettings
+from crawlee.configuration import Configuration
 from crawlee.playwright_crawler import PlaywrightCrawler, PlaywrightCrawlingContext
+from crawlee.storages import RequestQueue
 from .routes import router
-from .storage_utils import read_storage_data
-from .smart_extractor import SmartExtractor
-from typing import List
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.tag import pos_tag
-from googlesearch import search
-import re
+from .storage_utils import read_storage_data, storage_path
+from .extraction_pool import configure_extraction_executor
+from .nlp_batcher import NlpBatcher
+from .model_registry import get_model_registry
+from .smart_extractor import PIPELINE_STATS
+from .adaptive_fetch import AdaptiveCrawler
+from .load_profile import LoadProfile, make_browser_pool
+from .browser_pool import BrowserPoolSettings, browser_concurrency
+from .url_filter import configure_url_filter
+from .politeness import PolitenessScheduler, interleave_by_domain
+from .near_dedup import get_dedup_index
+from .page_state import configure_page_state
+from .result_store import configure_result_sink
+from .listing_index import configure_listing_index
+from .metrics import METRICS, JsonSnapshotWriter, serve_prometheus, start_profiler_from_env
+from .checkpoint import CrawlCheckpoint
+from .distributed import Coordinator
+from .seeding import SearchSeeder, extract_keywords, DEFAULT_BLACKLISTED_DOMAINS
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
 
 def search_with_nlp_query(query: str, 
                           num_results: int = 10, 
-                          blacklisted_domains: List[str] = [
-                            'youtube.com', 
-                            'facebook.com',
-                            'twitter.com'
-                        ]
+                          blacklisted_domains: List[str] = DEFAULT_BLACKLISTED_DOMAINS
 ) -> List[str]:
     """
     Extract keywords from natural language query and perform internet search.
+
+    Blocking, single-query version; crawls seed through SearchSeeder, which
+    caches and runs query variants concurrently.
     
     Args:
         query: Natural language query string
@@ -28,20 +43,10 @@ def search_with_nlp_query(query: str,
     Returns:
         List of URLs
     """
-    # Tokenize and remove stopwords
-    stop_words = set(stopwords.words('english'))
-    word_tokens = word_tokenize(query.lower())
-    filtered_tokens = [w for w in word_tokens if w not in stop_words and w.isalnum()]
-
-    # Extract nouns and important words using POS tagging
-    tagged = pos_tag(filtered_tokens)
-    keywords = [
-        word for word, tag in tagged 
-        if tag.startswith(('NN', 'JJ', 'VB'))  # Nouns, adjectives, verbs
-    ]
+    from googlesearch import search
 
     # Construct search query
-    search_query = ' '.join(keywords)
+    search_query = ' '.join(extract_keywords(query))
     
     try:
         # Perform Google search
@@ -59,25 +64,173 @@ def search_with_nlp_query(query: str,
         return filtered_urls
 
     except Exception as e:
-        print(f"Search error: {e}")
+        logger.warning(f"Search error for {search_query!r}: {str(e)}")
         return []
 
 
-async def main() -> None:
-    """The crawler entry point."""
-    crawler = PlaywrightCrawler(
-        request_handler=router,
-        max_requests_per_crawl=50,
+async def main(fetch_mode: str = 'adaptive',
+               metrics_port: Optional[int] = None,
+               prewarm: bool = True,
+               resume: bool = False,
+               shards: int = 0) -> None:
+    """
+    The crawler entry point.
+
+    Args:
+        fetch_mode: 'adaptive' tries a plain HTTP fetch first and renders
+            only the pages that need it; 'browser' renders every page
+        metrics_port: Also serve Prometheus metrics on this port
+        prewarm: Fork extraction workers from a process that has already
+            loaded the models, and start them before the crawl
+        resume: Continue from the last checkpoint instead of starting over
+        shards: Split the crawl by domain over this many worker processes
+
+    Stage timings and counters are written to storage/metrics.json while
+    the crawl runs. Set CRAWLER_PROFILE to a file path to sample stacks too.
+    Progress is checkpointed to storage/checkpoint every 30 seconds.
+    """
+    if shards > 1:
+        await main_distributed(shards, fetch_mode, prewarm, resume)
+        return
+
+    checkpoint = CrawlCheckpoint(interval=30)
+    state = checkpoint.load() if resume else None
+    if resume and state is None:
+        logger.warning('No checkpoint to resume from; starting a fresh crawl')
+    if state is None:
+        checkpoint.clear()
+    # Keep crawlee's request queues on resume: they hold the pending frontier
+    configuration = Configuration(purge_on_start=state is None)
+
+    profiler = start_profiler_from_env()
+    metrics_writer = JsonSnapshotWriter(storage_path('metrics.json'), interval=10).start()
+    if metrics_port:
+        serve_prometheus(metrics_port)
+
+    # Extraction is CPU-bound; run it in worker processes so the event loop
+    # stays free for the browser pages. Under load a worker takes several
+    # pages at once and runs spaCy over them as one batch
+    extraction_executor = configure_extraction_executor(
+        mode='process', prewarm=prewarm, nlp_batcher=NlpBatcher(batch_size=8)
     )
 
-    urls = search_with_nlp_query("jobs for Computer Science graduates in Adelaide", 50)
-    # print(urls)
+    # Per-domain rate limits; global concurrency can then stay high
+    scheduler = PolitenessScheduler(rate=1.0, max_concurrency_per_domain=2)
+    concurrency_settings = ConcurrencySettings(desired_concurrency=8, max_concurrency=32)
+    # Browsers are capped and replaced before they bloat
+    pool_settings = BrowserPoolSettings(browsers=2, pages_per_browser=8)
+
+    if fetch_mode == 'adaptive':
+        crawler = AdaptiveCrawler(
+            max_requests_per_crawl=50,
+            load_profile=LoadProfile(),
+            scheduler=scheduler,
+            concurrency_settings=concurrency_settings,
+            configuration=configuration,
+            pool_settings=pool_settings,
+        )
+    else:
+        crawler = PlaywrightCrawler(
+            request_handler=router,
+            request_provider=scheduler.wrap(await RequestQueue.open(configuration=configuration)),
+            browser_pool=make_browser_pool(pool_settings),
+            max_requests_per_crawl=50,
+            concurrency_settings=browser_concurrency(pool_settings, concurrency_settings),
+            configuration=configuration,
+        )
+        LoadProfile().attach(crawler)
+        scheduler.attach(crawler)
+
+    seeder = SearchSeeder()
+
+    # What earlier crawls learned, for conditional requests and cache reuse
+    page_state = configure_page_state(max_entries=1_000_000, max_age_days=30)
+
+    # The seen-set lives in the checkpoint directory so it survives a crash
+    url_filter = configure_url_filter(max_pages_per_domain=2, path=checkpoint.bloom_path)
 
-    await crawler.run(
-        urls
+    # Records are batched into compressed segments rather than one file per page
+    result_sink = configure_result_sink(flush_every=100, fsync_every=10)
+    listing_index = configure_listing_index()
+
+    checkpoint.attach(
+        url_filter=url_filter,
+        dedup_index=get_dedup_index(),
+        adaptive_crawler=crawler if isinstance(crawler, AdaptiveCrawler) else None,
+        flushables=[result_sink, listing_index]
     )
+    if state is not None:
+        checkpoint.restore(state)
+        # Already filtered; crawlee skips the ones it has handled
+        urls = checkpoint.seeds
+    else:
+        urls = await seeder.seed("jobs for Computer Science graduates in Adelaide", 50)
+        # print(urls)
+
+        # Seeds go through the same frontier policy as discovered links
+        urls = interleave_by_domain(url_filter.filter_urls(urls))
+        checkpoint.seeds = urls
+        checkpoint.save()
+    checkpoint.start()
+
+    try:
+        if prewarm:
+            await extraction_executor.start()
+        await crawler.run(
+            urls
+        )
+    finally:
+        await checkpoint.stop()
+        url_filter.seen.close()
+        extraction_executor.shutdown()
+        page_state.close()
+        result_sink.close()
+        listing_index.close()
+        metrics_writer.stop()
+        if profiler is not None:
+            profiler.stop()
+
+    # Finished cleanly, so there is nothing left to resume
+    checkpoint.clear()
+
+    logger.info(f'Model registry: {get_model_registry().report()}')
+    logger.info(f'Extraction outcomes: {PIPELINE_STATS.snapshot()}')
+    logger.info(f'URL frontier: {url_filter.stats()}')
+    logger.info(f'Per-domain politeness: {scheduler.metrics()}')
+    logger.info(f'Duplicate pages: {get_dedup_index().counts}')
+    logger.info(f'Recrawl cache: {page_state.hits}')
+    logger.info(f'Seed cache: {seeder.cache.hits} hits, {seeder.cache.misses} misses')
+    logger.info(f'Results written: {result_sink.records_written} to {result_sink.path}')
+    logger.info(f'Listing index: {listing_index.count()} records in {listing_index.path}')
 
     # storage_data = read_storage_data()
 
     # for item in storage_data:
     #     print(f"{item['url']} - {item['title']}")
+
+
+async def main_distributed(shards: int, fetch_mode: str, prewarm: bool, resume: bool) -> None:
+    """
+    The crawl split by domain over worker processes sharing one frontier.
+
+    The frontier file is itself the checkpoint: a resumed run picks up the
+    requests still pending there instead of seeding again.
+    """
+    coordinator = Coordinator(
+        shards,
+        fetch_mode=fetch_mode,
+        # The single-process crawl's budget, for the whole crawl; the frontier
+        # counts requests admitted, so failed ones still use it up
+        max_requests=50,
+        max_pages_per_domain=2,
+        prewarm=prewarm,
+        resume=resume
+    )
+    try:
+        if not resume or coordinator.queue.unfinished() == 0:
+            seeder = SearchSeeder()
+            coordinator.seed(await seeder.seed("jobs for Computer Science graduates in Adelaide", 50))
+        await coordinator.run()
+        coordinator.index_results()
+    finally:
+        coordinator.close()
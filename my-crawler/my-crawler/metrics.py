@@ -0,0 +1,256 @@
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the stage duration histogram buckets
+SPAN_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> LabelKey:
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _labels(key: LabelKey) -> str:
+    return ','.join(f'{label}="{value}"' for label, value in key[1])
+
+
+class Metrics:
+    """
+    Counters and stage timings for the crawl.
+
+    `count` bumps a labelled counter and `span` times a block into a
+    histogram labelled by stage. Extraction workers keep their own instance
+    and ship it back with each result via `drain`, so the parent's numbers
+    cover the whole process tree.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Counter = Counter()
+        # (count, total seconds, per-bucket counts)
+        self.spans: Dict[LabelKey, list] = {}
+
+    def count(self, name: str, value: int = 1, **labels) -> None:
+        with self._lock:
+            self.counters[_key(name, labels)] += value
+
+    def observe(self, stage: str, seconds: float, **labels) -> None:
+        key = _key('stage_seconds', dict(labels, stage=stage))
+        with self._lock:
+            span = self.spans.get(key)
+            if span is None:
+                span = self.spans[key] = [0, 0.0, [0] * len(SPAN_BUCKETS)]
+            span[0] += 1
+            span[1] += seconds
+            for i, bound in enumerate(SPAN_BUCKETS):
+                if seconds <= bound:
+                    span[2][i] += 1
+                    break
+
+    @contextmanager
+    def span(self, stage: str, **labels):
+        """Time the enclosed block as `stage`, including any awaits inside it."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, **labels)
+
+    def drain(self) -> Dict[str, Any]:
+        """Take everything recorded so far, leaving this instance empty."""
+        with self._lock:
+            drained = {'counters': list(self.counters.items()), 'spans': list(self.spans.items())}
+            self.counters = Counter()
+            self.spans = {}
+        return drained
+
+    def merge(self, drained: Dict[str, Any]) -> None:
+        with self._lock:
+            for key, value in drained['counters']:
+                self.counters[key] += value
+            for key, (count, total, buckets) in drained['spans']:
+                span = self.spans.setdefault(key, [0, 0.0, [0] * len(SPAN_BUCKETS)])
+                span[0] += count
+                span[1] += total
+                span[2] = [a + b for a, b in zip(span[2], buckets)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters and per-stage count/total/mean seconds as plain JSON."""
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+            spans = [
+                {
+                    'labels': dict(labels),
+                    'count': count,
+                    'seconds': total,
+                    'mean_seconds': total / count if count else 0.0
+                }
+                for (_, labels), (count, total, _) in sorted(self.spans.items())
+            ]
+        return {'timestamp': time.time(), 'counters': counters, 'stages': spans}
+
+    def prometheus_text(self) -> str:
+        """The Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in sorted({key[0] for key in self.counters}):
+                lines.append(f'# TYPE crawler_{name} counter')
+                for key, value in sorted(self.counters.items()):
+                    if key[0] == name:
+                        lines.append(f'crawler_{name}{{{_labels(key)}}} {value}')
+
+            lines.append('# TYPE crawler_stage_seconds histogram')
+            for key, (count, total, buckets) in sorted(self.spans.items()):
+                labels = _labels(key)
+                cumulative = 0
+                for bound, bucket in zip(SPAN_BUCKETS, buckets):
+                    cumulative += bucket
+                    lines.append(f'crawler_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'crawler_stage_seconds_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f'crawler_stage_seconds_sum{{{labels}}} {total}')
+                lines.append(f'crawler_stage_seconds_count{{{labels}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = Metrics()
+
+
+def serve_prometheus(port: int, metrics: Metrics = METRICS) -> ThreadingHTTPServer:
+    """Expose the metrics at http://127.0.0.1:<port>/metrics from a background thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Serving metrics on http://127.0.0.1:{port}/metrics")
+    return server
+
+
+class JsonSnapshotWriter:
+    """Rewrites a JSON snapshot of the metrics every `interval` seconds while the crawl runs."""
+
+    def __init__(self, path: str, interval: float = 10.0, metrics: Metrics = METRICS):
+        self.path = path
+        self.interval = interval
+        self.metrics = metrics
+        self._task: Optional[asyncio.Task] = None
+
+    def write(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.metrics.snapshot(), f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.write()
+
+    def start(self) -> 'JsonSnapshotWriter':
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.write()
+
+
+class SamplingProfiler:
+    """
+    Samples the main thread's stack every `interval` seconds.
+
+    Stacks are written as collapsed lines ('frame;frame;frame count'), the
+    input format of flamegraph.pl and speedscope, and rewritten every
+    `flush_every` seconds so a killed worker still leaves its profile.
+    """
+
+    def __init__(self, path: str, interval: float = 0.005, flush_every: float = 5.0):
+        self.path = path
+        self.interval = interval
+        self.flush_every = flush_every
+        self.stacks: Counter = Counter()
+        self._thread_id = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None:
+            return
+        stack = ';'.join(
+            f'{entry.name} ({os.path.basename(entry.filename)}:{entry.lineno})'
+            for entry in traceback.extract_stack(frame)
+        )
+        self.stacks[stack] += 1
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while not self._stop.wait(self.interval):
+            self._sample()
+            if time.monotonic() - last_flush >= self.flush_every:
+                self.write()
+                last_flush = time.monotonic()
+
+    def write(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+
+    def start(self) -> 'SamplingProfiler':
+        self._thread = threading.Thread(target=self._run, daemon=True, name='sampling-profiler')
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
+
+
+# Set to a file path to profile one run, e.g. CRAWLER_PROFILE=storage/profile.txt
+PROFILE_ENV = 'CRAWLER_PROFILE'
+
+
+def start_profiler_from_env() -> Optional[SamplingProfiler]:
+    """Start a SamplingProfiler if CRAWLER_PROFILE is set; each process gets its own file."""
+    path = os.environ.get(PROFILE_ENV)
+    if not path:
+        return None
+    root, ext = os.path.splitext(path)
+    profiler = SamplingProfiler(f'{root}.{os.getpid()}{ext or ".txt"}').start()
+    logger.info(f"Sampling profiler writing to {profiler.path}")
+    return profiler
@@ -0,0 +1,104 @@
+from typing import Dict, Any, Iterable, Optional, Tuple
+import threading
+import time
+import logging
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss() -> int:
+    """Resident memory of the current process in bytes."""
+    return psutil.Process().memory_info().rss
+
+
+class ModelRegistry:
+    """
+    Per-process cache of the heavy NLP models used by SmartExtractor.
+
+    The spaCy pipeline and the YAKE keyword extractor are loaded the first
+    time they are asked for and then shared by every extractor in the
+    process. Load time and the resident memory delta are recorded for each
+    model so the saving can be checked with `report()`.
+    """
+
+    def __init__(self, spacy_model: str = 'en_core_web_sm'):
+        self.spacy_model = spacy_model
+        self._models: Dict[Tuple, Any] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def nlp(self, disable: Iterable[str] = ()):
+        """
+        Return the shared spaCy pipeline.
+
+        Components named in `disable` (e.g. 'parser', 'lemmatizer' for
+        entity-only runs) are left out; each distinct set is loaded once.
+        """
+        disable = tuple(sorted(disable))
+        key = ('spacy', self.spacy_model) + disable
+        return self._get(key, lambda: self._load_spacy(disable))
+
+    def keyword_extractor(self):
+        """Return the shared YAKE keyword extractor."""
+        return self._get(('yake',), self._load_yake)
+
+    def _get(self, key: Tuple, loader):
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # Another thread may have loaded it while we waited
+            model = self._models.get(key)
+            if model is None:
+                rss_before = current_rss()
+                started = time.perf_counter()
+                model = loader()
+                elapsed = time.perf_counter() - started
+                rss_delta = current_rss() - rss_before
+
+                self._models[key] = model
+                self._stats[':'.join(key)] = {
+                    'load_seconds': elapsed,
+                    'rss_delta_bytes': rss_delta
+                }
+                logger.info(
+                    f"Loaded {':'.join(key)} in {elapsed:.2f}s "
+                    f"(+{rss_delta / 1024 / 1024:.1f} MB RSS)"
+                )
+        return model
+
+    def _load_spacy(self, disable: Tuple[str, ...] = ()):
+        import spacy
+        # Load spaCy model - use 'python -m spacy download en_core_web_sm' first
+        return spacy.load(self.spacy_model, disable=list(disable))
+
+    def _load_yake(self):
+        import yake
+        return yake.KeywordExtractor(
+            lan="en",
+            n=2,  # ngram size
+            dedupLim=0.3,
+            top=10,
+            features=None
+        )
+
+    def report(self) -> Dict[str, Any]:
+        """Load time and memory cost of every model loaded so far."""
+        return {
+            'models': dict(self._stats),
+            'rss_bytes': current_rss()
+        }
+
+
+_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the registry for this process, creating it on first use."""
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+    return _registry
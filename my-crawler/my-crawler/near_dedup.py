@@ -0,0 +1,191 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import re
+
+# Markup that never contributes visible text, then any remaining tag
+_INVISIBLE_MARKUP = re.compile(
+    r'<(script|style|noscript|template|svg)\b.*?</\1\s*>|<!--.*?-->|<[^>]+>',
+    re.IGNORECASE | re.DOTALL
+)
+_WORD = re.compile(r'\w+')
+
+SIMHASH_BITS = 64
+
+
+def rough_visible_text(html: str) -> str:
+    """
+    Visible text approximated with regexes.
+
+    Much cheaper than a DOM parse and good enough for fingerprinting, so
+    duplicates can be caught on the event loop before extraction starts.
+    """
+    return ' '.join(_INVISIBLE_MARKUP.sub(' ', html).split())
+
+
+def _hash64(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash over word shingles of the text."""
+    words = _WORD.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = [' '.join(words)] if words else []
+    else:
+        shingles = [' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+
+    if not shingles:
+        return 0
+
+    # Column-wise vote over the binary strings; index 0 is the top bit
+    columns = zip(*(format(_hash64(shingle), '064b') for shingle in shingles))
+    half = len(shingles) / 2
+    fingerprint = 0
+    for column in columns:
+        fingerprint = fingerprint << 1 | (column.count('1') > half)
+    return fingerprint
+
+
+def content_hash(text: str) -> bytes:
+    """Exact fingerprint of whitespace-normalised text."""
+    return hashlib.blake2b(' '.join(text.split()).encode('utf-8'), digest_size=16).digest()
+
+
+@dataclass
+class PageFingerprint:
+    digest: bytes
+    simhash: Optional[int] = None
+
+
+@dataclass
+class DuplicateMatch:
+    kind: str  # 'exact' or 'near'
+    canonical_url: str
+    distance: int = 0
+
+
+class SimHashIndex:
+    """
+    Hamming-distance lookup over millions of SimHashes.
+
+    Each fingerprint is split into `max_distance + 1` blocks and filed under
+    every block value. Two fingerprints within `max_distance` bits must
+    agree on at least one whole block, so a lookup only compares against
+    the few fingerprints sharing a block instead of the whole index.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self.blocks = max_distance + 1
+        self.block_bits = SIMHASH_BITS // self.blocks
+        self._tables: List[Dict[int, List[Tuple[int, str]]]] = [{} for _ in range(self.blocks)]
+
+    def _keys(self, fingerprint: int):
+        mask = (1 << self.block_bits) - 1
+        for i in range(self.blocks):
+            # The last block takes any bits left over
+            if i == self.blocks - 1:
+                yield i, fingerprint >> (i * self.block_bits)
+            else:
+                yield i, (fingerprint >> (i * self.block_bits)) & mask
+
+    def find(self, fingerprint: int, exclude: Optional[str] = None) -> Optional[Tuple[str, int]]:
+        """Closest indexed record within max_distance other than `exclude`, as (id, distance)."""
+        best = None
+        for i, key in self._keys(fingerprint):
+            for other, record_id in self._tables[i].get(key, ()):
+                if record_id == exclude:
+                    continue
+                distance = bin(fingerprint ^ other).count('1')
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (record_id, distance)
+        return best
+
+    def add(self, fingerprint: int, record_id: str) -> None:
+        for i, key in self._keys(fingerprint):
+            self._tables[i].setdefault(key, []).append((fingerprint, record_id))
+
+
+class DedupIndex:
+    """
+    Exact and near-duplicate detection for page text.
+
+    Pages are looked up with `find` before extraction and only indexed with
+    `add` once their record is stored, so a retried or re-rendered page
+    never matches itself and a failed extraction leaves no fingerprint.
+    """
+
+    def __init__(self, max_distance: int = 3, min_words: int = 30):
+        self.exact: Dict[bytes, str] = {}
+        self.near = SimHashIndex(max_distance)
+        # Very short texts collide too easily to call near-duplicates
+        self.min_words = min_words
+        self.counts = {'exact': 0, 'near': 0, 'unique': 0}
+        # New entries since the last checkpoint, when checkpointing is on
+        self.journal: Optional[List[Dict]] = None
+
+    def fingerprint(self, text: str) -> PageFingerprint:
+        """The page's exact hash and, for texts long enough to compare, its SimHash."""
+        return PageFingerprint(
+            content_hash(text),
+            simhash(text) if len(text.split()) >= self.min_words else None
+        )
+
+    def find(self, url: str, fingerprint: PageFingerprint) -> Optional[DuplicateMatch]:
+        """The record this page duplicates, if any other than the page's own earlier copy."""
+        canonical = self.exact.get(fingerprint.digest)
+        if canonical is not None and canonical != url:
+            self.counts['exact'] += 1
+            return DuplicateMatch('exact', canonical)
+
+        if fingerprint.simhash is not None:
+            found = self.near.find(fingerprint.simhash, exclude=url)
+            if found is not None:
+                self.counts['near'] += 1
+                return DuplicateMatch('near', found[0], found[1])
+        return None
+
+    def add(self, url: str, fingerprint: PageFingerprint) -> None:
+        """Index a stored page, so later copies are matched against it."""
+        if fingerprint.digest in self.exact:
+            return
+        self.exact[fingerprint.digest] = url
+        self._log({'exact': fingerprint.digest.hex(), 'url': url})
+        if fingerprint.simhash is not None:
+            self.near.add(fingerprint.simhash, url)
+            self._log({'simhash': fingerprint.simhash, 'url': url})
+        self.counts['unique'] += 1
+
+    def _log(self, entry: Dict) -> None:
+        if self.journal is not None:
+            self.journal.append(entry)
+
+    def drain_journal(self) -> List[Dict]:
+        entries, self.journal = self.journal or [], []
+        return entries
+
+    def entries(self):
+        """Every indexed fingerprint as journal entries, for compacting a checkpoint."""
+        for digest, url in self.exact.items():
+            yield {'exact': digest.hex(), 'url': url}
+        # Each fingerprint is filed under every block; one table lists each once
+        for bucket in self.near._tables[0].values():
+            for fingerprint, url in bucket:
+                yield {'simhash': fingerprint, 'url': url}
+
+    def restore(self, entry: Dict) -> None:
+        if 'exact' in entry:
+            self.exact[bytes.fromhex(entry['exact'])] = entry['url']
+        elif 'simhash' in entry:
+            self.near.add(entry['simhash'], entry['url'])
+
+
+_dedup_index: Optional[DedupIndex] = None
+
+
+def get_dedup_index() -> DedupIndex:
+    global _dedup_index
+    if _dedup_index is None:
+        _dedup_index = DedupIndex()
+    return _dedup_index
@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+import asyncio
+import logging
+
+from .model_registry import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+
+def nlp_fields(doc, keywords: List[Tuple[str, float]]) -> Dict[str, Any]:
+    """Build the named_entities / key_phrases fields from spaCy and YAKE output."""
+    # Extract named entities
+    entities = {}
+    for ent in doc.ents:
+        if ent.label_ not in entities:
+            entities[ent.label_] = []
+        entities[ent.label_].append(ent.text)
+
+    return {
+        'named_entities': entities,
+        'key_phrases': [kw[0] for kw in keywords]
+    }
+
+
+class NlpBatcher:
+    """
+    Collects main_content from concurrent pages and runs spaCy in batches.
+
+    Texts queue up until `batch_size` are waiting or `max_latency` seconds
+    have passed since the first one arrived, then the whole batch goes
+    through `nlp.pipe` on a dedicated thread and each waiting request gets
+    its own named_entities and key_phrases back.
+
+    In an extraction pool the parent hands each worker several pages at
+    once and the worker runs them through its own batcher, built from
+    `options()`.
+    """
+
+    def __init__(self,
+                 batch_size: int = 32,
+                 max_latency: float = 0.05,
+                 n_process: int = 1,
+                 disable: Iterable[str] = ()):
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.n_process = n_process
+        self.disable = tuple(disable)
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Running batches, kept so they are not garbage-collected mid-flight
+        self._tasks: Set[asyncio.Task] = set()
+        # One thread, so batches never share the pipeline concurrently
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix='nlp-batch')
+
+    async def process(self, text: str) -> Dict[str, Any]:
+        """Queue a text and wait for its entities and key phrases."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_latency, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"NLP batch task failed: {str(task.exception())}")
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self._thread, self._analyse, [text for text, _ in batch]
+            )
+        except Exception as e:
+            logger.error(f"Error in NLP batch: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _analyse(self, texts: List[str]) -> List[Dict[str, Any]]:
+        registry = get_model_registry()
+        nlp = registry.nlp(self.disable)
+        kw_extractor = registry.keyword_extractor()
+
+        docs = nlp.pipe(texts, batch_size=self.batch_size, n_process=self.n_process)
+        return [
+            nlp_fields(doc, kw_extractor.extract_keywords(text))
+            for text, doc in zip(texts, docs)
+        ]
+
+    def options(self) -> Dict[str, Any]:
+        """Settings for an equivalent batcher in another process."""
+        return {
+            'batch_size': self.batch_size,
+            'max_latency': self.max_latency,
+            'n_process': self.n_process,
+            'disable': self.disable,
+        }
+
+    def shutdown(self) -> None:
+        self._thread.shutdown(wait=False)
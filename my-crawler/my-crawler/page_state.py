@@ -0,0 +1,204 @@
+from crawlee import Request
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Union
+import json
+import logging
+import os
+import sqlite3
+import time
+
+from .storage_utils import storage_path
+
+logger = logging.getLogger(__name__)
+
+# URLs per SELECT when looking up validators; SQLite caps the bound parameters
+LOOKUP_BATCH = 500
+
+
+@dataclass
+class PageState:
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: Optional[str]
+    extracted_data: Optional[Dict[str, Any]]
+    fetched_at: float
+
+
+class PageStateStore:
+    """
+    What we knew about each page at its last crawl, keyed by canonical URL.
+
+    Holds the validators for conditional requests (ETag, Last-Modified),
+    the hash of the page's visible text and the extraction result, so a
+    recrawl can skip re-extracting pages that have not changed. Entries
+    older than `max_age_days` are evicted, and the store is trimmed to the
+    `max_entries` most recently fetched pages.
+
+    Writes are committed every `commit_every` pages or `commit_interval`
+    seconds, whichever comes first, rather than once per page; a crash
+    only loses what the last few pages taught us, so they are re-extracted.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 max_entries: int = 1_000_000,
+                 max_age_days: float = 30,
+                 commit_every: int = 200,
+                 commit_interval: float = 5.0):
+        self.path = path or storage_path('page_state.sqlite')
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.hits = {'not_modified': 0, 'unchanged': 0, 'changed': 0}
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS page_state ('
+            ' url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,'
+            ' content_hash TEXT, extracted_data TEXT, fetched_at REAL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS page_state_fetched ON page_state (fetched_at)')
+        self.evict()
+
+    def get(self, url: str) -> Optional[PageState]:
+        row = self._db.execute(
+            'SELECT url, etag, last_modified, content_hash, extracted_data, fetched_at '
+            'FROM page_state WHERE url = ?', (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        return PageState(
+            url=row[0],
+            etag=row[1],
+            last_modified=row[2],
+            content_hash=row[3],
+            extracted_data=json.loads(row[4]) if row[4] is not None else None,
+            fetched_at=row[5]
+        )
+
+    def save(self, url: str,
+             content_hash: Optional[str],
+             extracted_data: Optional[Dict[str, Any]],
+             headers: Optional[Dict[str, str]] = None) -> None:
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        self._db.execute(
+            'INSERT OR REPLACE INTO page_state VALUES (?, ?, ?, ?, ?, ?)',
+            (
+                url,
+                headers.get('etag'),
+                headers.get('last-modified'),
+                content_hash,
+                json.dumps(extracted_data, default=str) if extracted_data is not None else None,
+                time.time()
+            )
+        )
+        self._written()
+
+    def touch(self, url: str) -> None:
+        """Mark a page as fetched now without changing what we know about it."""
+        self._db.execute('UPDATE page_state SET fetched_at = ? WHERE url = ?', (time.time(), url))
+        self._written()
+
+    def _written(self) -> None:
+        self._pending += 1
+        if self._pending >= self.commit_every or time.monotonic() - self._last_commit >= self.commit_interval:
+            self.commit()
+
+    def commit(self) -> None:
+        self._db.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def unchanged(self, url: str, content_hash: str) -> Optional[PageState]:
+        """The stored state if the page's text hash is the same as last time."""
+        state = self.get(url)
+        if state is not None and state.content_hash == content_hash and state.extracted_data is not None:
+            self.hits['unchanged'] += 1
+            self.touch(url)
+            return state
+        self.hits['changed'] += 1
+        return None
+
+    def not_modified(self, url: str) -> Optional[PageState]:
+        """The stored state for a page the server answered with 304."""
+        state = self.get(url)
+        if state is not None and state.extracted_data is not None:
+            self.hits['not_modified'] += 1
+            self.touch(url)
+            return state
+        return None
+
+    def conditional_request(self, url: str) -> Union[Request, str]:
+        """A request carrying the page's validators, or the bare URL if we have none."""
+        return self.conditional_requests([url])[0]
+
+    def conditional_requests(self, urls: Iterable[str]) -> List[Union[Request, str]]:
+        """`conditional_request` for many URLs, looked up a few hundred at a time."""
+        urls = list(urls)
+        validators = {}
+        for start in range(0, len(urls), LOOKUP_BATCH):
+            batch = urls[start:start + LOOKUP_BATCH]
+            validators.update(
+                (url, (etag, last_modified)) for url, etag, last_modified in self._db.execute(
+                    f'SELECT url, etag, last_modified FROM page_state '
+                    f'WHERE url IN ({", ".join("?" * len(batch))}) '
+                    f'AND (etag IS NOT NULL OR last_modified IS NOT NULL)', batch
+                )
+            )
+
+        requests: List[Union[Request, str]] = []
+        for url in urls:
+            if url not in validators:
+                requests.append(url)
+                continue
+            etag, last_modified = validators[url]
+            headers = {}
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+            requests.append(Request.from_url(url, headers=headers))
+        return requests
+
+    def evict(self) -> None:
+        """Drop entries past max_age_days, then the oldest beyond max_entries."""
+        cutoff = time.time() - self.max_age_days * 86400
+        self._db.execute('DELETE FROM page_state WHERE fetched_at < ?', (cutoff,))
+        self._db.execute(
+            'DELETE FROM page_state WHERE url IN ('
+            ' SELECT url FROM page_state ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+        self.commit()
+
+    def close(self) -> None:
+        self.evict()
+        self._db.close()
+
+
+_page_state: Optional[PageStateStore] = None
+
+
+def configure_page_state(max_entries: int = 1_000_000,
+                         max_age_days: float = 30,
+                         path: Optional[str] = None) -> PageStateStore:
+    """Open the page-state store for a crawl."""
+    global _page_state
+    if _page_state is not None:
+        _page_state.close()
+    _page_state = PageStateStore(path, max_entries=max_entries, max_age_days=max_age_days)
+    return _page_state
+
+
+def get_page_state() -> PageStateStore:
+    global _page_state
+    if _page_state is None:
+        _page_state = PageStateStore()
+    return _page_state
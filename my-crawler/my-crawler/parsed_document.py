@@ -0,0 +1,88 @@
+from typing import List, Optional, Union
+import copy
+import re
+import logging
+
+import lxml.html
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+# Elements whose text is never shown to the reader
+INVISIBLE_TAGS = ['script', 'style', 'noscript', 'template', 'head', 'svg']
+
+VISIBLE_TEXT_XPATH = etree.XPath(
+    '//text()[not(%s)]' % ' or '.join(f'ancestor::{tag}' for tag in INVISIBLE_TAGS)
+)
+
+
+class ParsedDocument:
+    """
+    A page parsed once and shared by every extraction stage.
+
+    The lxml tree and the visible text are built on first access and cached,
+    so stages that never need them cost nothing.
+    """
+
+    def __init__(self, html: str):
+        self.html = html
+        self._tree: Optional[lxml.html.HtmlElement] = None
+        self._visible_text: Optional[str] = None
+
+    @property
+    def tree(self) -> lxml.html.HtmlElement:
+        if self._tree is None:
+            self._tree = self._parse(self.html)
+        return self._tree
+
+    @staticmethod
+    def _parse(html: str) -> lxml.html.HtmlElement:
+        if not html or not html.strip():
+            return lxml.html.document_fromstring('<html></html>')
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # lxml refuses str input carrying an XML encoding declaration
+            return lxml.html.document_fromstring(html.encode('utf-8'))
+        except etree.ParserError as e:
+            logger.debug(f"Failed to parse document: {str(e)}")
+            return lxml.html.document_fromstring('<html></html>')
+
+    def copy_tree(self) -> lxml.html.HtmlElement:
+        """A private copy of the tree for consumers that prune it in place."""
+        return copy.deepcopy(self.tree)
+
+    @property
+    def visible_text(self) -> str:
+        """Whitespace-normalised text of the elements a reader would see."""
+        if self._visible_text is None:
+            parts = VISIBLE_TEXT_XPATH(self.tree)
+            self._visible_text = re.sub(r'\s+', ' ', ' '.join(parts)).strip()
+        return self._visible_text
+
+    def meta_content(self, prop: str) -> Optional[str]:
+        """Content of the first <meta> tag with the given property."""
+        values = self.tree.xpath('//meta[@property=$prop]/@content', prop=prop)
+        return values[0] if values else None
+
+    def first_text(self, tag: str) -> Optional[str]:
+        """Stripped text of the first element with the given tag."""
+        elements = self.tree.xpath(f'//{tag}')
+        if not elements:
+            return None
+        return elements[0].text_content().strip()
+
+    def json_ld_blocks(self) -> List[str]:
+        """Raw contents of every JSON-LD script, in document order."""
+        return [
+            script.text
+            for script in self.tree.xpath('//script[@type="application/ld+json"]')
+            if script.text
+        ]
+
+
+def as_document(page: Union[str, ParsedDocument]) -> ParsedDocument:
+    """Accept either raw HTML or an already parsed document."""
+    if isinstance(page, ParsedDocument):
+        return page
+    return ParsedDocument(page)
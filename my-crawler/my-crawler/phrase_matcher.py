@@ -0,0 +1,52 @@
+from typing import Dict, Hashable, Iterable, Set, Tuple
+from collections import Counter
+
+import ahocorasick
+
+# Characters lower-cased at a time, so a page is never copied whole
+CHUNK_CHARS = 64 * 1024
+
+
+class PhraseMatcher:
+    """
+    Case-insensitive multi-phrase matcher, compiled once from a phrase table.
+
+    The phrases are built into an Aho-Corasick automaton, so one pass over
+    the text finds every phrase however many there are. The text is
+    lower-cased a chunk at a time; chunks overlap by the longest phrase, so
+    a phrase across a chunk boundary is still found. Each phrase carries
+    one or more tags (a ContentType, a profile field, ...) and `hits`
+    reports how many distinct phrases were seen per tag.
+    """
+
+    def __init__(self, phrases: Iterable[Tuple[str, Hashable]]):
+        self._tags: Dict[str, Set[Hashable]] = {}
+        for phrase, tag in phrases:
+            if phrase:
+                self._tags.setdefault(phrase.lower(), set()).add(tag)
+
+        self._automaton = ahocorasick.Automaton()
+        for phrase in self._tags:
+            self._automaton.add_word(phrase, phrase)
+        if self._tags:
+            self._automaton.make_automaton()
+        self._overlap = max(map(len, self._tags), default=1) - 1
+
+    def find(self, text: str) -> Set[str]:
+        """Distinct phrases (lower-cased) that occur in the text."""
+        if not text or not self._tags:
+            return set()
+
+        found: Set[str] = set()
+        for start in range(0, len(text), CHUNK_CHARS):
+            chunk = text[start:start + CHUNK_CHARS + self._overlap].lower()
+            found.update(phrase for _, phrase in self._automaton.iter(chunk))
+        return found
+
+    def hits(self, text: str) -> Counter:
+        """Number of distinct phrases found in the text, per tag."""
+        counts: Counter = Counter()
+        for phrase in self.find(text):
+            for tag in self._tags.get(phrase, ()):
+                counts[tag] += 1
+        return counts
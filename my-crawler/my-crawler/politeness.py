@@ -0,0 +1,299 @@
+from crawlee.http_clients import HttpxHttpClient
+from crawlee.playwright_crawler import PlaywrightCrawler, PlaywrightPreNavigationContext
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+from urllib.parse import urlparse
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean the host wants us to slow down
+THROTTLE_STATUSES = {429, 503}
+
+
+@dataclass
+class DomainState:
+    rate: float
+    tokens: float
+    updated: float = field(default_factory=time.monotonic)
+    backoff_until: float = 0.0
+    backoff: float = 0.0
+    queued: int = 0
+    active: int = 0
+    requests: int = 0
+    throttled: int = 0
+    latency: Optional[float] = None
+    baseline_latency: Optional[float] = None
+
+
+class PolitenessScheduler:
+    """
+    Per-domain token buckets and concurrency caps with adaptive backoff.
+
+    A fetch may start once its domain has a free concurrency slot and a
+    token in its bucket, refilled at the domain's current rate. A 429/503
+    halves the rate and pauses the domain (honouring Retry-After); latency
+    rising well above the domain's baseline also slows it down, and healthy
+    responses let the rate creep back up to `max_rate`.
+
+    The scheduler never waits itself: `wrap` a crawler's request provider
+    so requests for a domain that is not ready are held back before they
+    take one of the crawler's task slots, and `attach` it to a
+    PlaywrightCrawler (or fetch through PoliteHttpClient) so it sees how
+    each fetch went.
+    """
+
+    def __init__(self,
+                 rate: float = 1.0,
+                 max_rate: float = 4.0,
+                 min_rate: float = 0.05,
+                 burst: float = 2.0,
+                 max_concurrency_per_domain: int = 2,
+                 max_backoff: float = 120.0,
+                 latency_factor: float = 2.0):
+        self.initial_rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.max_concurrency_per_domain = max_concurrency_per_domain
+        self.max_backoff = max_backoff
+        self.latency_factor = latency_factor
+        self.domains: Dict[str, DomainState] = {}
+
+    def _state(self, url: str) -> DomainState:
+        domain = urlparse(url).netloc
+        state = self.domains.get(domain)
+        if state is None:
+            state = DomainState(rate=self.initial_rate, tokens=self.burst)
+            self.domains[domain] = state
+        return state
+
+    def _refill(self, state: DomainState, now: float) -> None:
+        state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+        state.updated = now
+
+    def ready_in(self, url: str) -> float:
+        """Seconds until the URL's domain may be fetched; inf while its slots are all taken."""
+        state = self._state(url)
+        if state.active >= self.max_concurrency_per_domain:
+            return math.inf
+        now = time.monotonic()
+        if now < state.backoff_until:
+            return state.backoff_until - now
+        self._refill(state, now)
+        return 0.0 if state.tokens >= 1 else (1 - state.tokens) / state.rate
+
+    def try_acquire(self, url: str) -> bool:
+        """Take a slot and a token for the URL's domain if it may be fetched right now."""
+        if self.ready_in(url) > 0:
+            return False
+        state = self._state(url)
+        state.tokens -= 1
+        state.active += 1
+        return True
+
+    def release(self, url: str) -> None:
+        """Free the domain slot taken by `try_acquire`."""
+        self._state(url).active -= 1
+
+    def observe(self, url: str, latency: float,
+                status: Optional[int] = None,
+                retry_after: Optional[str] = None) -> None:
+        """Adapt the domain's rate to how a fetch went."""
+        state = self._state(url)
+        state.requests += 1
+
+        if status in THROTTLE_STATUSES:
+            state.throttled += 1
+            state.rate = max(self.min_rate, state.rate / 2)
+            state.backoff = min(self.max_backoff, max(1.0, state.backoff * 2))
+            if retry_after and retry_after.isdigit():
+                state.backoff = min(self.max_backoff, max(state.backoff, float(retry_after)))
+            state.backoff_until = time.monotonic() + state.backoff
+            logger.info(f"{urlparse(url).netloc} returned {status}; backing off {state.backoff:.0f}s")
+            return
+
+        state.backoff = 0.0
+        state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+        if state.baseline_latency is None or latency < state.baseline_latency:
+            state.baseline_latency = latency
+
+        if state.latency > self.latency_factor * state.baseline_latency:
+            state.rate = max(self.min_rate, state.rate * 0.75)
+        else:
+            state.rate = min(self.max_rate, state.rate + 0.1 * self.initial_rate)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, in-flight requests, rate and latency per domain."""
+        return {
+            domain: {
+                'queued': state.queued,
+                'active': state.active,
+                'requests': state.requests,
+                'throttled': state.throttled,
+                'rate': round(state.rate, 3),
+                'latency': state.latency
+            }
+            for domain, state in self.domains.items()
+        }
+
+    def wrap(self, request_provider) -> 'PoliteRequestProvider':
+        """Hand the crawler only requests whose domain may be fetched now."""
+        return PoliteRequestProvider(request_provider, self)
+
+    def attach(self, crawler: PlaywrightCrawler) -> PlaywrightCrawler:
+        """Feed the status and latency of every browser navigation back into the rates."""
+        crawler.pre_navigation_hook(self._before_navigation)
+        return crawler
+
+    async def _before_navigation(self, context: PlaywrightPreNavigationContext) -> None:
+        page = context.page
+        url = context.request.url
+        started = time.monotonic()
+
+        def on_response(response) -> None:
+            # The first response to the main frame's navigation, redirect or not
+            if response.frame != page.main_frame or not response.request.is_navigation_request():
+                return
+            page.remove_listener('response', on_response)
+            self.observe(url, time.monotonic() - started, response.status, response.headers.get('retry-after'))
+
+        page.on('response', on_response)
+
+
+class PoliteRequestProvider:
+    """
+    A crawlee request provider that holds back requests for busy domains.
+
+    Requests whose domain has no free slot or token are parked here rather
+    than handed to the crawler, so they never sit in a task slot waiting;
+    the crawler gets the next request of a domain that is ready instead,
+    which interleaves domains however the links were queued. At most
+    `max_parked` requests are held, after which the crawler waits for a
+    parked domain to become ready. The domain slot is freed when crawlee
+    marks the request handled or reclaims it.
+    """
+
+    def __init__(self, inner, scheduler: PolitenessScheduler, max_parked: int = 100):
+        self.inner = inner
+        self.scheduler = scheduler
+        self.max_parked = max_parked
+        self._parked: Dict[str, Deque] = {}
+        self._parked_count = 0
+        self._leased: Dict[str, str] = {}
+
+    def _park(self, request) -> None:
+        domain = urlparse(request.url).netloc
+        self._parked.setdefault(domain, deque()).append(request)
+        self._parked_count += 1
+        self.scheduler.domains[domain].queued += 1
+
+    def _take_parked(self):
+        for domain, parked in list(self._parked.items()):
+            if not self.scheduler.try_acquire(parked[0].url):
+                continue
+            request = parked.popleft()
+            # Ready domains take turns
+            del self._parked[domain]
+            if parked:
+                self._parked[domain] = parked
+            self._parked_count -= 1
+            self.scheduler.domains[domain].queued -= 1
+            return request
+        return None
+
+    def _lease(self, request):
+        self._leased[request.unique_key] = request.url
+        return request
+
+    def _end_lease(self, request) -> None:
+        url = self._leased.pop(request.unique_key, None)
+        if url is not None:
+            self.scheduler.release(url)
+
+    def __getattr__(self, name: str):
+        return getattr(self.inner, name)
+
+    async def fetch_next_request(self):
+        request = self._take_parked()
+        if request is not None:
+            return self._lease(request)
+        while self._parked_count < self.max_parked:
+            request = await self.inner.fetch_next_request()
+            if request is None:
+                return None
+            if self.scheduler.try_acquire(request.url):
+                return self._lease(request)
+            self._park(request)
+        return None
+
+    def _parked_ready(self) -> bool:
+        return any(self.scheduler.ready_in(parked[0].url) == 0 for parked in self._parked.values())
+
+    async def is_empty(self) -> bool:
+        if self._parked_ready():
+            return False
+        return self._parked_count >= self.max_parked or await self.inner.is_empty()
+
+    async def is_finished(self) -> bool:
+        return not self._parked and await self.inner.is_finished()
+
+    async def mark_request_as_handled(self, request):
+        self._end_lease(request)
+        return await self.inner.mark_request_as_handled(request)
+
+    async def reclaim_request(self, request, *, forefront: bool = False):
+        self._end_lease(request)
+        return await self.inner.reclaim_request(request, forefront=forefront)
+
+    async def add_request(self, request, *, forefront: bool = False):
+        return await self.inner.add_request(request, forefront=forefront)
+
+    async def add_requests_batched(self, requests, **options):
+        return await self.inner.add_requests_batched(requests, **options)
+
+    async def get_handled_count(self) -> int:
+        return await self.inner.get_handled_count()
+
+    async def get_total_count(self) -> int:
+        return await self.inner.get_total_count()
+
+
+class PoliteHttpClient(HttpxHttpClient):
+    """HTTP client for the HTTP-first path that reports each fetch to the scheduler."""
+
+    def __init__(self, scheduler: PolitenessScheduler, **kwargs):
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+
+    async def crawl(self, request, **kwargs):
+        started = time.monotonic()
+        status = retry_after = None
+        try:
+            result = await super().crawl(request, **kwargs)
+            status = result.http_response.status_code
+            retry_after = result.http_response.headers.get('retry-after')
+            return result
+        except Exception as e:
+            status = getattr(e, 'status_code', None)
+            raise
+        finally:
+            self.scheduler.observe(request.url, time.monotonic() - started, status, retry_after)
+
+
+def interleave_by_domain(urls: List[str]) -> List[str]:
+    """Round-robin URLs across domains so no host gets a burst of seeds."""
+    by_domain: Dict[str, deque] = {}
+    for url in urls:
+        by_domain.setdefault(urlparse(url).netloc, deque()).append(url)
+
+    interleaved = []
+    queues = list(by_domain.values())
+    while queues:
+        for queue in queues:
+            interleaved.append(queue.popleft())
+        queues = [queue for queue in queues if queue]
+    return interleaved
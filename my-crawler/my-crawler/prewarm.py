@@ -0,0 +1,9 @@
+"""
+Preloaded by the extraction fork server.
+
+Importing this module loads the extractor backends and NLP models, so the
+fork server holds them once and every worker it forks starts warm.
+"""
+from .extraction_pool import warm_extraction_backends
+
+warm_extraction_backends()
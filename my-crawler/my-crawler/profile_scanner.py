@@ -0,0 +1,73 @@
+from typing import Dict, List, Optional, Pattern, Tuple
+from dataclasses import dataclass, field
+import re
+
+# Currency amounts reported in the 'prices' field for every content type
+GENERIC_PRICE_PATTERNS = [
+    r'\$\d+(?:\.\d{2})?',
+    r'USD\s*\d+(?:\.\d{2})?',
+    r'€\d+(?:\.\d{2})?',
+    r'£\d+(?:\.\d{2})?'
+]
+
+# Common date formats reported in the 'dates' field for every content type
+GENERIC_DATE_PATTERNS = [
+    r'\d{4}-\d{2}-\d{2}',
+    r'\d{2}/\d{2}/\d{4}',
+    r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}\b'
+]
+
+
+@dataclass
+class ScanResult:
+    prices: List[str] = field(default_factory=list)
+    dates: List[str] = field(default_factory=list)
+
+
+# Compiled once for every scanner
+_PRICE_PATTERNS = [re.compile(pattern) for pattern in GENERIC_PRICE_PATTERNS]
+_DATE_PATTERNS = [re.compile(pattern) for pattern in GENERIC_DATE_PATTERNS]
+
+
+class ProfileScanner:
+    """
+    Precompiled scanner for an extraction profile.
+
+    The generic price and date patterns are compiled at import and one
+    "attribute: value" pattern per key attribute when the profile is
+    created, each with its own flags. They run one after another: sre scans
+    a simple pattern far faster than a combined alternation tried at every
+    position.
+    """
+
+    def __init__(self, profile=None):
+        self._attributes: List[Tuple[str, Pattern]] = []
+        if profile is not None:
+            # Look for patterns like "job type: full time" or "location: Adelaide"
+            self._attributes = [
+                (attr, re.compile(rf'{re.escape(attr)}\s*:?\s*([^.\n]+)', re.IGNORECASE))
+                for attr in profile.key_attributes
+            ]
+
+    def attributes(self, text: Optional[str]) -> Dict[str, str]:
+        """The first value given for each key attribute in the text."""
+        attributes = {}
+        if not text:
+            return attributes
+        for attr, pattern in self._attributes:
+            match = pattern.search(text)
+            if match:
+                attributes[attr] = match.group(1).strip()
+        return attributes
+
+    def scan(self, text: Optional[str]) -> ScanResult:
+        """Find the generic prices and dates in the text."""
+        result = ScanResult()
+        if not text:
+            return result
+
+        for pattern in _PRICE_PATTERNS:
+            result.prices.extend(match.group() for match in pattern.finditer(text))
+        for pattern in _DATE_PATTERNS:
+            result.dates.extend(match.group() for match in pattern.finditer(text))
+        return result
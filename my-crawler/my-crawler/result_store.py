@@ -0,0 +1,200 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+
+from .storage_utils import storage_path, project
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is used without it
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PATTERN = re.compile(r'^segment-(\d+)\.jsonl\.(zst|gz)$')
+# Per-worker stores of a distributed crawl, e.g. results/shard-03
+SHARD_PATTERN = re.compile(r'^shard-\d+$')
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == 'zst':
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress_stream(f, codec: str):
+    if codec == 'zst':
+        # The zstd reader has no readline; buffering it gives line iteration
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True))
+    return gzip.GzipFile(fileobj=f)
+
+
+# What a frame cut short by a crash looks like to the decompressors
+TORN_FRAME_ERRORS = (EOFError, zlib.error, gzip.BadGzipFile) + (
+    (zstandard.ZstdError,) if zstandard is not None else ()
+)
+
+
+def _segment_lines(path: str, name: str, codec: str) -> Iterator[bytes]:
+    """Decompressed lines of a segment, up to a torn final frame."""
+    with open(os.path.join(path, name), 'rb') as f:
+        lines = iter(_decompress_stream(f, codec))
+        while True:
+            try:
+                line = next(lines)
+            except StopIteration:
+                return
+            except TORN_FRAME_ERRORS as e:
+                logger.warning(f"{name} ends in a torn frame, left by an unclean shutdown; "
+                               f"stopped reading it there ({str(e)})")
+                return
+            yield line
+
+
+class SegmentedResultStore:
+    """
+    Append-only result sink writing compressed JSONL segments.
+
+    Records are buffered and written `flush_every` at a time as one
+    compressed frame appended to the current segment (zstd and gzip both
+    allow concatenated frames), and the file is fsynced every
+    `fsync_every` flushes rather than on every write. A new segment is
+    started after `segment_records` records. Nothing is ever rewritten, so
+    a crash loses at most the unsynced tail. `sync` may be called from
+    another thread, e.g. by a checkpoint, while the crawl keeps pushing.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 flush_every: int = 100,
+                 fsync_every: int = 10,
+                 segment_records: int = 50_000,
+                 codec: Optional[str] = None):
+        self.path = path or storage_path('results')
+        self.flush_every = flush_every
+        self.fsync_every = fsync_every
+        self.segment_records = segment_records
+        self.codec = codec or ('zst' if zstandard is not None else 'gz')
+        if self.codec == 'zst' and zstandard is None:
+            raise ValueError("zstd segments need the 'zstandard' package")
+
+        os.makedirs(self.path, exist_ok=True)
+        self._buffer: List[Dict[str, Any]] = []
+        self._file = None
+        # Held while the segment file is written, synced or swapped
+        self._lock = threading.RLock()
+        self._segment_count = 0
+        self._unsynced_flushes = 0
+        self.records_written = 0
+
+        existing = [int(match.group(1)) for match in map(SEGMENT_PATTERN.match, os.listdir(self.path)) if match]
+        self._segment_index = max(existing, default=0)
+
+    def push(self, record: Dict[str, Any]) -> None:
+        self._buffer.append(record)
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def _open_segment(self) -> None:
+        # Always start a fresh segment; earlier ones are never appended to
+        self._segment_index += 1
+        name = f'segment-{self._segment_index:06d}.jsonl.{self.codec}'
+        self._file = open(os.path.join(self.path, name), 'ab')
+        self._segment_count = 0
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        records, self._buffer = self._buffer, []
+        lines = b''.join(
+            json.dumps(record, default=str, ensure_ascii=False).encode('utf-8') + b'\n'
+            for record in records
+        )
+        frame = _compress(lines, self.codec)
+
+        with self._lock:
+            if self._file is None or self._segment_count >= self.segment_records:
+                self._close_segment()
+                self._open_segment()
+            self._file.write(frame)
+            self._file.flush()
+            self._segment_count += len(records)
+            self.records_written += len(records)
+
+            self._unsynced_flushes += 1
+            if self._unsynced_flushes >= self.fsync_every:
+                self.sync()
+
+    def sync(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                os.fsync(self._file.fileno())
+            self._unsynced_flushes = 0
+
+    def _close_segment(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self.sync()
+                self._file.close()
+                self._file = None
+
+    def close(self) -> None:
+        self.flush()
+        self._close_segment()
+
+
+def iter_results(fields: Optional[Sequence[str]] = None,
+                 where: Optional[Callable[[Dict], bool]] = None,
+                 path: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Stream records from every segment, oldest first, with optional projection and filtering.
+
+    Shard stores written by distributed workers are read after the
+    top-level segments, one shard at a time.
+    """
+    path = path or storage_path('results')
+    if not os.path.isdir(path):
+        return
+
+    segments = sorted(
+        (int(match.group(1)), match.group(0), match.group(2))
+        for match in map(SEGMENT_PATTERN.match, os.listdir(path)) if match
+    )
+    for _, name, codec in segments:
+        for line in _segment_lines(path, name, codec):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Torn write at the end of a segment after a crash
+                logger.debug(f"Skipping unreadable line in {name}")
+                continue
+            if where is None or where(record):
+                yield project(record, fields)
+
+    for name in sorted(filter(SHARD_PATTERN.match, os.listdir(path))):
+        yield from iter_results(fields, where, os.path.join(path, name))
+
+
+_result_sink: Optional[SegmentedResultStore] = None
+
+
+def configure_result_sink(**options) -> SegmentedResultStore:
+    """Send records to a segmented store instead of one file per page."""
+    global _result_sink
+    if _result_sink is not None:
+        _result_sink.close()
+    _result_sink = SegmentedResultStore(**options)
+    return _result_sink
+
+
+def get_result_sink() -> Optional[SegmentedResultStore]:
+    return _result_sink
@@ -1,92 +1,201 @@
 from crawlee.playwright_crawler import PlaywrightCrawlingContext
 from crawlee.router import Router
-from .smart_extractor import SmartExtractor
-from .url_filter import UrlFilter
+from .extraction_pool import get_extraction_executor
+from .url_filter import get_url_filter
 from .smart_extractor import ContentType
+from .phrase_matcher import PhraseMatcher
+from .load_profile import capture_html, page_load_stats
+from .near_dedup import PageFingerprint, get_dedup_index, rough_visible_text, content_hash
+from .page_state import get_page_state
+from .result_store import get_result_sink
+from .listing_index import get_listing_index
+from .metrics import METRICS
+from urllib.parse import urljoin
+from typing import Optional
 import logging
 router = Router[PlaywrightCrawlingContext]()
 
+# URL-based patterns
+URL_PATTERNS = {
+    ContentType.JOB: [
+        '/job', '/career', '/position', '/vacancy', 
+        'jobs.', 'careers.', 'seek.com', 'indeed.com'
+    ],
+    ContentType.RENTAL: [
+        '/rent', '/property', '/apartment', 
+        'realestate.', 'domain.com', 'zillow.com'
+    ]
+}
+
+# HTML-based patterns (check meta tags, headings, etc.)
+HTML_PATTERNS = {
+    ContentType.JOB: [
+        'job description', 'requirements:', 'qualifications:',
+        'salary:', 'experience required', 'apply now'
+    ],
+    ContentType.RENTAL: [
+        'bedroom', 'bathroom', 'square feet', 'sq ft',
+        'lease', 'rent per', 'available from'
+    ]
+}
+
+# Compiled once; each returns per-ContentType hit counts in a single scan
+URL_MATCHER = PhraseMatcher(
+    (pattern, content_type)
+    for content_type, patterns in URL_PATTERNS.items()
+    for pattern in patterns
+)
+HTML_MATCHER = PhraseMatcher(
+    (pattern, content_type)
+    for content_type, patterns in HTML_PATTERNS.items()
+    for pattern in patterns
+)
+
 @router.default_handler
 async def request_handler(context: PlaywrightCrawlingContext) -> None:
-    logger = logging.getLogger(__name__)
     url = context.request.url
-    content_type = detect_content_type(url, await context.page.content())
+    # Serialise the DOM once and share it between detection and extraction
+    with METRICS.span('page_content'):
+        html = await capture_html(context.page)
+    with METRICS.span('detect_content_type'):
+        content_type = detect_content_type(url, html)
     
     context.log.info(f'Processing {url} as {content_type}')
+    stats = page_load_stats(context.page)
+    if stats is not None:
+        context.log.info(
+            f'Loaded {url}: {stats.bytes_transferred} bytes, '
+            f'{stats.blocked_requests} requests blocked, '
+            f'{stats.time_to_content:.2f}s to content'
+        )
     title = await context.page.query_selector('title')
     data_dict = {
         'url': context.request.url,
         'title': await title.inner_text() if title else None
     }
 
-    smart_extractor = SmartExtractor()
-    smart_extractor.set_content_type(content_type)
+    with METRICS.span('fingerprint'):
+        text = rough_visible_text(html)
+        text_hash = content_hash(text).hex()
 
-    extracted_data: dict = await smart_extractor.extract_content(
-        html=await context.page.content(),
-        url=context.request.url
-    )
+    # Unchanged since the last crawl: reuse that extraction
+    state = get_page_state().unchanged(url, text_hash)
+    if state is not None:
+        context.log.info(f'{url} unchanged since last crawl')
+        METRICS.count('pages', content_type=content_type.value, outcome='unchanged')
+        await store_page(context, data_dict, state.extracted_data)
+        return
 
-    if (not UrlFilter().should_crawl_url(context.request.url) or extracted_data == {}):
+    fingerprint = get_dedup_index().fingerprint(text)
+    if await skip_duplicate(context, data_dict, fingerprint):
+        METRICS.count('pages', content_type=content_type.value, outcome='duplicate')
         return
 
+    extracted_data: dict = await get_extraction_executor().extract(
+        html=html,
+        url=context.request.url,
+        content_type=content_type
+    )
+
+    response = getattr(context, 'response', None)
+    remember_page(context, text_hash, extracted_data, response.headers if response else {})
+    with METRICS.span('store'):
+        await store_page(context, data_dict, extracted_data, fingerprint)
+
+def remember_page(context, text_hash: str, extracted_data: dict, headers: dict) -> None:
+    """Keep the page's validators, text hash and extraction for the next crawl."""
+    if not extracted_data.get('error'):
+        get_page_state().save(context.request.url, text_hash, extracted_data, headers)
+
+async def skip_duplicate(context, data_dict: dict, fingerprint: PageFingerprint) -> bool:
+    """
+    Catch syndicated copies before extraction.
+
+    Exact copies are dropped. Near-duplicates are stored as a link to the
+    canonical record and their links are still followed, since paginated
+    variants differ in exactly that. Returns True if extraction should be
+    skipped.
+    """
+    match = get_dedup_index().find(context.request.url, fingerprint)
+    if match is None:
+        return False
+
+    context.log.info(f'{context.request.url} is an {match.kind} duplicate of {match.canonical_url}')
+    if match.kind == 'near':
+        data_dict['duplicate_of'] = match.canonical_url
+        await push_result(context, data_dict)
+        await enqueue_filtered_links(context)
+    return True
+
+async def store_page(context, data_dict: dict, extracted_data: dict,
+                     fingerprint: Optional[PageFingerprint] = None) -> bool:
+    """
+    Push a page's record and follow its links; False if nothing was stored.
+
+    With the page's `fingerprint`, later copies of it are caught as duplicates.
+    """
+    logger = logging.getLogger(__name__)
+
+    if extracted_data == {}:
+        return False
+
     if extracted_data.get('error'):
         logger.debug(f"Error extracting data from {context.request.url}: {extracted_data['error']}")
-        return
+        return False
 
     data_dict['extracted_data'] = extracted_data
 
-    await context.push_data(data_dict)
+    await push_result(context, data_dict)
+    if fingerprint is not None:
+        get_dedup_index().add(context.request.url, fingerprint)
+
+    await enqueue_filtered_links(context)
+    return True
+
+async def push_result(context, data_dict: dict) -> None:
+    """Append to the segmented result store if one is configured, else the crawlee dataset."""
+    sink = get_result_sink()
+    if sink is not None:
+        sink.push(data_dict)
+    else:
+        await context.push_data(data_dict)
+
+    # Searchable as soon as it is stored
+    index = get_listing_index()
+    if index is not None:
+        index.add(data_dict)
 
-    await context.enqueue_links()
+async def enqueue_filtered_links(context) -> None:
+    """Queue the page's links that the crawl-wide UrlFilter admits."""
+    if hasattr(context, 'page'):
+        links = await context.page.eval_on_selector_all('a[href]', 'els => els.map(e => e.href)')
+    else:
+        base_url = context.request.loaded_url or context.request.url
+        links = [urljoin(base_url, a['href']) for a in context.soup.select('a[href]')]
+
+    # The filter canonicalises and deduplicates
+    allowed = get_url_filter().filter_urls(dict.fromkeys(links), same_host_as=context.request.url)
+    if allowed:
+        # Pages seen on an earlier crawl are requested conditionally
+        page_state = get_page_state()
+        await context.add_requests(page_state.conditional_requests(allowed))
 
 def detect_content_type(url: str, html: str) -> ContentType:
     """Detect content type based on URL patterns and key phrases in HTML."""
-    url = url.lower()
-    html = html.lower()
-    
-    # URL-based patterns
-    url_patterns = {
-        ContentType.JOB: [
-            '/job', '/career', '/position', '/vacancy', 
-            'jobs.', 'careers.', 'seek.com', 'indeed.com'
-        ],
-        ContentType.RENTAL: [
-            '/rent', '/property', '/apartment', 
-            'realestate.', 'domain.com', 'zillow.com'
-        ]
-    }
-    
-    # HTML-based patterns (check meta tags, headings, etc.)
-    html_patterns = {
-        ContentType.JOB: [
-            'job description', 'requirements:', 'qualifications:',
-            'salary:', 'experience required', 'apply now'
-        ],
-        ContentType.RENTAL: [
-            'bedroom', 'bathroom', 'square feet', 'sq ft',
-            'lease', 'rent per', 'available from'
-        ]
-    }
-    
     # Score each content type
     scores = {content_type: 0 for content_type in ContentType}
     
     # Check URL patterns (weighted more heavily)
-    for content_type, patterns in url_patterns.items():
-        for pattern in patterns:
-            if pattern in url:
-                scores[content_type] += 2  # URL matches are worth more
+    for content_type, count in URL_MATCHER.hits(url).items():
+        scores[content_type] += 2 * count  # URL matches are worth more
                 
-    # Check HTML patterns
-    for content_type, patterns in html_patterns.items():
-        for pattern in patterns:
-            if pattern in html:
-                scores[content_type] += 1
+    # Check HTML patterns, one pass over the page for every content type
+    for content_type, count in HTML_MATCHER.hits(html).items():
+        scores[content_type] += count
                 
     # Get the content type with highest score
     max_score = max(scores.values())
     if max_score > 0:
         return max(scores.items(), key=lambda x: x[1])[0]
         
-    return ContentType.GENERIC  # Default if no strong matches
\ No newline at end of file
+    return ContentType.GENERIC  # Default if no strong matches
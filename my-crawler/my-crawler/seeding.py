@@ -0,0 +1,206 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import asyncio
+import json
+import logging
+import os
+import time
+
+from .storage_utils import storage_path
+from .url_dedup import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLACKLISTED_DOMAINS = ['youtube.com', 'facebook.com', 'twitter.com']
+
+_stop_words: Optional[frozenset] = None
+
+
+def _stopwords() -> frozenset:
+    """The NLTK English stopword set, built once per process."""
+    global _stop_words
+    if _stop_words is None:
+        from nltk.corpus import stopwords
+        _stop_words = frozenset(stopwords.words('english'))
+    return _stop_words
+
+
+def extract_keywords(query: str) -> List[str]:
+    """Nouns, adjectives and verbs of a natural language query, stopwords removed."""
+    from nltk.tag import pos_tag
+    from nltk.tokenize import word_tokenize
+
+    stop_words = _stopwords()
+    filtered_tokens = [w for w in word_tokenize(query.lower()) if w not in stop_words and w.isalnum()]
+    tagged = pos_tag(filtered_tokens)
+    return [
+        word for word, tag in tagged
+        if tag.startswith(('NN', 'JJ', 'VB'))  # Nouns, adjectives, verbs
+    ]
+
+
+class TTLCache:
+    """
+    Small key/value cache whose entries expire after `ttl` seconds.
+
+    Saved as JSON between runs, so repeated short crawls for the same query
+    skip keyword extraction and the search round-trips entirely.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 24 * 3600):
+        self.path = path or storage_path('seed_cache.json')
+        self.ttl = ttl
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self) -> 'TTLCache':
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                logger.debug(f"Failed to load seed cache: {str(e)}")
+        self._expire()
+        return self
+
+    def save(self) -> None:
+        self._expire()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+    def _expire(self) -> None:
+        now = time.time()
+        self.entries = {key: entry for key, entry in self.entries.items() if entry['expires'] > now}
+
+    def get(self, key: str) -> Any:
+        entry = self.entries.get(key)
+        if entry is None or entry['expires'] <= time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry['value']
+
+    def set(self, key: str, value: Any) -> None:
+        self.entries[key] = {'value': value, 'expires': time.time() + self.ttl}
+
+
+class SearchProvider(ABC):
+    """Source of seed URLs for a search query."""
+
+    name = 'provider'
+
+    @abstractmethod
+    async def search(self, query: str, num_results: int) -> List[str]:
+        """Up to `num_results` result URLs, best first."""
+
+
+class GoogleSearchProvider(SearchProvider):
+    """googlesearch-python, run on a thread so the event loop stays free."""
+
+    name = 'google'
+
+    async def search(self, query: str, num_results: int) -> List[str]:
+        from googlesearch import search
+        return await asyncio.to_thread(lambda: list(search(query, num_results=num_results)))
+
+
+class FixtureSearchProvider(SearchProvider):
+    """
+    Canned results for offline runs and tests.
+
+    Args:
+        results: Query to URLs; a '*' entry answers any other query
+        path: JSON file with the same mapping, used if `results` is omitted
+    """
+
+    name = 'fixture'
+
+    def __init__(self, results: Optional[Dict[str, List[str]]] = None, path: Optional[str] = None):
+        if results is None:
+            with open(path or storage_path('seed_fixture.json'), 'r', encoding='utf-8') as f:
+                results = json.load(f)
+        self.results = results
+
+    async def search(self, query: str, num_results: int) -> List[str]:
+        return list(self.results.get(query, self.results.get('*', [])))[:num_results]
+
+
+def query_variants(query: str, keywords: Sequence[str]) -> List[str]:
+    """Search strings to fan out for one natural language query."""
+    variants = [' '.join(keywords), query]
+    if len(keywords) > 2:
+        # The leading terms alone often match listing pages the full set misses
+        variants.append(' '.join(keywords[:2]))
+    return [variant for variant in dict.fromkeys(variants) if variant]
+
+
+class SearchSeeder:
+    """
+    Turns a natural language query into crawl seeds.
+
+    Keywords are extracted once per query and cached; every query variant is
+    then sent to every provider concurrently, each (provider, variant)
+    result list is cached for `cache.ttl` seconds, and the results are
+    merged round-robin so each variant contributes its top hits first,
+    deduplicated by canonical URL.
+    """
+
+    def __init__(self,
+                 providers: Optional[Iterable[SearchProvider]] = None,
+                 cache: Optional[TTLCache] = None,
+                 max_concurrency: int = 4):
+        self.providers = list(providers) if providers is not None else [GoogleSearchProvider()]
+        self.cache = cache if cache is not None else TTLCache().load()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def keywords(self, query: str) -> List[str]:
+        key = f'keywords:{query}'
+        keywords = self.cache.get(key)
+        if keywords is None:
+            keywords = await asyncio.to_thread(extract_keywords, query)
+            self.cache.set(key, keywords)
+        return keywords
+
+    async def _search(self, provider: SearchProvider, variant: str, num_results: int) -> List[str]:
+        key = f'search:{provider.name}:{num_results}:{variant}'
+        urls = self.cache.get(key)
+        if urls is not None:
+            return urls
+
+        async with self._semaphore:
+            try:
+                urls = await provider.search(variant, num_results)
+            except Exception as e:
+                logger.warning(f"Search error from {provider.name} for {variant!r}: {str(e)}")
+                return []
+        self.cache.set(key, urls)
+        return urls
+
+    async def seed(self,
+                   query: str,
+                   num_results: int = 10,
+                   blacklisted_domains: Sequence[str] = DEFAULT_BLACKLISTED_DOMAINS) -> List[str]:
+        """Up to `num_results` distinct seed URLs for the query."""
+        variants = query_variants(query, await self.keywords(query))
+        result_lists = await asyncio.gather(*(
+            self._search(provider, variant, num_results)
+            for variant in variants
+            for provider in self.providers
+        ))
+
+        seeds: Dict[str, str] = {}
+        for rank in range(max((len(urls) for urls in result_lists), default=0)):
+            for urls in result_lists:
+                if rank >= len(urls):
+                    continue
+                url = urls[rank]
+                if any(domain in url for domain in blacklisted_domains):
+                    continue
+                seeds.setdefault(canonicalize_url(url), url)
+
+        self.cache.save()
+        return list(seeds.values())[:num_results]
@@ -1,19 +1,28 @@
-from typing import Dict, Any
-from bs4 import BeautifulSoup
-import trafilatura
-from newspaper import Article
-from readability.readability import Document
-import spacy
-import yake
-from price_parser import Price
-import re
+from typing import Dict, Any, Union
 from datetime import datetime
+from collections import Counter
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional
-import json
 import logging
 
+from .model_registry import get_model_registry
+from .parsed_document import ParsedDocument, as_document
+from .phrase_matcher import PhraseMatcher
+from .profile_scanner import ProfileScanner, ScanResult
+from .nlp_batcher import NlpBatcher, nlp_fields
+from .metrics import METRICS
+from .lazy_imports import lazy_import
+from .structured_data import find_mapping, iter_structured_items
+
+# Extractor backends load on first use, so importing this module stays cheap
+trafilatura = lazy_import('trafilatura')
+newspaper = lazy_import('newspaper')
+newspaper_parsers = lazy_import('newspaper.parsers')
+readability = lazy_import('readability.readability')
+price_parser = lazy_import('price_parser')
+EXTRACTOR_BACKENDS = (trafilatura, newspaper, newspaper_parsers, readability, price_parser)
+
 logger = logging.getLogger(__name__)
 
 class ContentType(Enum):
@@ -28,6 +37,21 @@ class ExtractionProfile:
     date_patterns: List[str]
     key_attributes: List[str]
     blacklist_phrases: List[str]
+    # Phrases that reject a page as soon as its title contains one, before
+    # trafilatura runs. Kept apart from blacklist_phrases, which are matched
+    # against main content: a title like 'Room 404' is no error page
+    title_blacklist_phrases: List[str] = field(default_factory=list)
+    # Compiled from the lists above when the profile is created
+    phrases: PhraseMatcher = field(init=False, repr=False, compare=False)
+    scanner: ProfileScanner = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.phrases = PhraseMatcher(
+            [(phrase, 'blacklist') for phrase in self.blacklist_phrases] +
+            [(phrase, 'title_blacklist') for phrase in self.title_blacklist_phrases] +
+            [(indicator, 'indicator') for indicator in self.content_indicators]
+        )
+        self.scanner = ProfileScanner(self)
 
 EXTRACTION_PROFILES: Dict[ContentType, ExtractionProfile] = {
     ContentType.JOB: ExtractionProfile(
@@ -62,6 +86,9 @@ EXTRACTION_PROFILES: Dict[ContentType, ExtractionProfile] = {
             "Try adjusting the filters",
             "Sign in",
             "Menu"
+        ],
+        title_blacklist_phrases=[
+            "No matching search results"
         ]
     ),
     
@@ -95,6 +122,9 @@ EXTRACTION_PROFILES: Dict[ContentType, ExtractionProfile] = {
             "No properties found",
             "Sign in",
             "Menu"
+        ],
+        title_blacklist_phrases=[
+            "No properties found"
         ]
     ),
     ContentType.GENERIC: ExtractionProfile(
@@ -122,10 +152,17 @@ EXTRACTION_PROFILES: Dict[ContentType, ExtractionProfile] = {
             "404",
             "Page not found",
             "Access denied"
+        ],
+        title_blacklist_phrases=[
+            "Page not found",
+            "Access denied"
         ]
     )
 }
 
+# Generic prices and dates for extractors without a profile
+DEFAULT_SCANNER = ProfileScanner()
+
 class ProfileMatcher:
     def __init__(self, profile: Optional[ExtractionProfile]):
         self.profile = profile
@@ -139,46 +176,21 @@ class ProfileMatcher:
         if self.profile is None:
             return True
 
-        main_content = data.get('main_content', '').lower()
+        main_content = data.get('main_content') or ''
         
+        # Blacklist and indicator phrases are found in one pass
+        hits = self.profile.phrases.hits(main_content)
+
         # Check for blacklisted phrases
-        if any(phrase.lower() in main_content for phrase in self.profile.blacklist_phrases):
+        if hits['blacklist']:
             return False
             
         # Check for required content indicators
-        has_indicators = any(
-            indicator.lower() in main_content 
-            for indicator in self.profile.content_indicators
-        )
-        if not has_indicators:
+        if not hits['indicator']:
             return False
-            
-        # Extract prices matching profile patterns
-        prices = []
-        for pattern in self.profile.price_patterns:
-            matches = re.finditer(pattern, main_content)
-            for match in matches:
-                price_text = match.group()
-                # Clean up price text (remove extra spaces, normalize format)
-                price_text = re.sub(r'\s+', ' ', price_text).strip()
-                prices.append(price_text)
-        
-        # Extract dates matching profile patterns
-        dates = []
-        for pattern in self.profile.date_patterns:
-            matches = re.finditer(pattern, main_content)
-            for match in matches:
-                date_text = match.group()
-                dates.append(date_text)
-        
-        # Extract key attributes
-        attributes = {}
-        for attr in self.profile.key_attributes:
-            # Look for patterns like "job type: full time" or "location: Adelaide"
-            pattern = rf"{attr}\s*:?\s*([^.\n]+)"
-            match = re.search(pattern, main_content, re.IGNORECASE)
-            if match:
-                attributes[attr] = match.group(1).strip()
+
+        # Key attributes with the profile's precompiled patterns
+        attributes = self.profile.scanner.attributes(main_content)
         
         # check if at least one of the key attributes is present
         if len(attributes) < strictness:
@@ -186,57 +198,124 @@ class ProfileMatcher:
 
         return True
 
+    def rejects_title(self, title: Optional[str]) -> bool:
+        """Whether the title contains one of the profile's title blacklist phrases."""
+        if self.profile is None or not title:
+            return False
+        return self.profile.phrases.hits(title)['title_blacklist'] > 0
+
+    def has_indicators(self, text: str) -> bool:
+        """Whether the text contains at least one content indicator."""
+        if self.profile is None:
+            return True
+        return self.profile.phrases.hits(text)['indicator'] > 0
+
+class PipelineStats:
+    """Counts how pages leave the extraction pipeline."""
+
+    def __init__(self):
+        self.outcomes: Counter = Counter()
+
+    def record(self, outcome: str) -> None:
+        """Record 'structured', 'accepted' or the name of the rejecting stage."""
+        self.outcomes[outcome] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return dict(self.outcomes)
+
+PIPELINE_STATS = PipelineStats()
+
+def _shared_tree_parser(doc: ParsedDocument) -> type:
+    """newspaper3k parser class that serves copies of an already parsed tree."""
+    class SharedTreeParser(newspaper_parsers.Parser):
+        @classmethod
+        def fromstring(cls, html):
+            cls.doc = doc.copy_tree()
+            return cls.doc
+
+    return SharedTreeParser
+
 class SmartExtractor:
-    def __init__(self, content_type: ContentType = ContentType.GENERIC):
+    def __init__(self,
+                 content_type: ContentType = ContentType.GENERIC,
+                 nlp_batcher: Optional[NlpBatcher] = None):
         self.content_type = content_type
         self.profile = EXTRACTION_PROFILES.get(content_type)
-        # Load spaCy model - use 'python -m spacy download en_core_web_sm' first
-        self.nlp = spacy.load('en_core_web_sm')
-        # Initialize keyword extractor
-        self.kw_extractor = yake.KeywordExtractor(
-            lan="en", 
-            n=2,  # ngram size
-            dedupLim=0.3,
-            top=10,
-            features=None
-        )
-        
+        # Models are loaded once per process and shared by every extractor
+        self.models = get_model_registry()
+        # Optional cross-page batching for spaCy and YAKE
+        self.nlp_batcher = nlp_batcher
+        # Pipeline stage that rejected the last page, if any
+        self.rejected_stage: Optional[str] = None
+
+    @property
+    def nlp(self):
+        return self.models.nlp()
+
+    @property
+    def kw_extractor(self):
+        return self.models.keyword_extractor()
+
+    def _span(self, stage: str):
+        return METRICS.span(stage, content_type=self.content_type.value)
+
+    def _reject(self, stage: str) -> Dict[str, Any]:
+        self.rejected_stage = stage
+        return {}
+
+    def outcome(self, extracted_data: Dict[str, Any]) -> str:
+        """How the last extraction left the pipeline, for PipelineStats."""
+        if self.rejected_stage:
+            return self.rejected_stage
+        if extracted_data.get('structured'):
+            return 'structured'
+        if not extracted_data or extracted_data.get('error'):
+            return 'failed'
+        return 'accepted'
+
     def set_content_type(self, content_type: ContentType):
         self.content_type = content_type
         self.profile = EXTRACTION_PROFILES.get(content_type)
     
     async def extract_content(self, html: str, url: str) -> Dict[str, Any]:
         """Extract content from HTML with structured data priority"""
+        self.rejected_stage = None
         try:
+            # Parse once; every stage below reads the same document
+            doc = ParsedDocument(html)
+
             # First try to get structured data
-            structured_data = await self.extract_structured_data(html)
-            if structured_data:
+            with self._span('structured_data'):
+                structured_data = await self.extract_structured_data(doc)
                 # Map structured data to our expected format
-                mapped_data = self.map_structured_data(structured_data)
-                if mapped_data:  # If we successfully mapped the data
-                    return mapped_data
+                mapped_data = self.map_structured_data(structured_data) if structured_data else None
+            if mapped_data:  # If we successfully mapped the data
+                return mapped_data
 
             # Fall back to regular extraction if no structured data
-            return await self.extract_unstructured_content(html, url)
+            return await self.extract_unstructured_content(doc, url)
             
         except Exception as e:
             logger.error(f"Error in extraction: {str(e)}")
             return {}
 
-    async def extract_structured_data(self, html: str) -> Optional[dict]:
-        """Extract structured data (JSON-LD, microdata) from the page"""
-        try:
-            # Look for JSON-LD
-            soup = BeautifulSoup(html, 'html.parser')
-            json_ld = soup.find('script', {'type': 'application/ld+json'})
-            
-            if json_ld:
-                return json.loads(json_ld.string)
+    async def extract_structured_data(self, page: Union[str, ParsedDocument]) -> Optional[dict]:
+        """
+        Extract structured data (JSON-LD, microdata, RDFa) from the page.
 
-            # Optionally look for other structured data formats
-            # microdata, RDFa, etc.
-            
-            return None
+        Returns the first schema.org entity the content type has a mapping
+        for, looking through every JSON-LD block, @graph and list, or else
+        the first entity found. JSON-LD is read without parsing the page;
+        microdata and RDFa are only looked for if it has none that map.
+        """
+        try:
+            first = None
+            for item in iter_structured_items(as_document(page)):
+                if find_mapping(item, self.content_type.value) is not None:
+                    return item
+                if first is None:
+                    first = item
+            return first
         except Exception as e:
             logger.debug(f"Failed to extract structured data: {str(e)}")
             return None
@@ -247,76 +326,85 @@ class SmartExtractor:
             return None
 
         try:
-            # Handle different schema types
-            schema_type = structured_data.get('@type', '').lower()
-            
-            if self.content_type == ContentType.JOB:
-                if schema_type in ['jobposting', 'job']:
-                    return {
-                        'title': structured_data.get('title'),
-                        'description': structured_data.get('description'),
-                        'salary': structured_data.get('baseSalary', {}).get('value'),
-                        'company': structured_data.get('hiringOrganization', {}).get('name'),
-                        'location': structured_data.get('jobLocation', {}).get('address', {}).get('addressLocality'),
-                        'date_posted': structured_data.get('datePosted'),
-                        'employment_type': structured_data.get('employmentType'),
-                        'structured': True  # Flag to indicate this came from structured data
-                    }
-            
-            elif self.content_type == ContentType.RENTAL:
-                if schema_type in ['apartment', 'house', 'rental']:
-                    return {
-                        'title': structured_data.get('name'),
-                        'description': structured_data.get('description'),
-                        'price': structured_data.get('price'),
-                        'location': structured_data.get('address', {}).get('addressLocality'),
-                        'structured': True
-                    }
-
-            # Add more content types as needed
-            
-            return None
+            # Per-ContentType tables in structured_data.STRUCTURED_MAPPINGS
+            mapping = find_mapping(structured_data, self.content_type.value)
+            if mapping is None:
+                return None
+            return mapping.apply(structured_data)
             
         except Exception as e:
             logger.debug(f"Failed to map structured data: {str(e)}")
             return None
 
-    async def extract_unstructured_content(self, html: str, url: str) -> Dict[str, Any]:
-        """Fall back to regular extraction methods"""
+    async def extract_unstructured_content(self, page: Union[str, ParsedDocument], url: str) -> Dict[str, Any]:
+        """
+        Fall back to regular extraction methods.
+
+        Cheap checks run first and the page is dropped at the first stage
+        that rejects it, so heavy libraries only see pages that can match.
+        The rejecting stage is left in `self.rejected_stage`.
+        """
         try:
             # Use multiple extraction methods and combine results
             extracted_data = {}
+            doc = as_document(page)
+            matcher = ProfileMatcher(self.profile)
             
-            # 1. Basic HTML parsing with BeautifulSoup
-            soup = BeautifulSoup(html, 'html.parser')
+            # 1. Main content is part of the visible text, so a page whose
+            # visible text has no indicator can never pass the profile
+            with self._span('visible_text'):
+                has_indicators = matcher.has_indicators(doc.visible_text)
+            if not has_indicators:
+                return self._reject('visible_text')
             
-            # Extract title
-            extracted_data['title'] = self._extract_title(soup, html)
+            # 2. Extract title from the shared tree; only the profile's title
+            # blacklist applies here, the full blacklist waits for main content
+            with self._span('title'):
+                extracted_data['title'] = self._extract_title(doc)
+                blacklisted = matcher.rejects_title(extracted_data['title'])
+            if blacklisted:
+                return self._reject('title')
             
-            # 2. Use trafilatura for main content extraction
-            main_text = trafilatura.extract(html, include_links=True, include_images=True)
+            # 3. Use trafilatura for main content extraction; it prunes the
+            # tree it is given, so hand it a copy rather than reparsing
+            with self._span('trafilatura'):
+                main_text = trafilatura.extract(doc.copy_tree(), include_links=True, include_images=True)
             extracted_data['main_content'] = main_text
             
-            # 3. Use newspaper3k for article parsing
-            article_data = self._extract_article_data(url, html)
-            extracted_data.update(article_data)
-            
-            # 4. profile specific extraction
-            if not ProfileMatcher(self.profile).match(extracted_data):
-                return {}
+            # profile specific extraction
+            with self._span('profile_match'):
+                matched = matcher.match(extracted_data)
+            if not matched:
+                return self._reject('main_content')
             
-            # 5. Extract prices
-            extracted_data['prices'] = self._extract_prices(html)
+            # 4. Use newspaper3k for article parsing
+            with self._span('newspaper'):
+                article_data = self._extract_article_data(url, doc)
+            extracted_data.update(article_data)
             
-            # 6. Extract dates
-            extracted_data['dates'] = self._extract_dates(html)
+            # Prices and dates come from one scan of the visible text, so
+            # script and style markup no longer produce false hits
+            with self._span('prices_dates'):
+                scan = (self.profile.scanner if self.profile else DEFAULT_SCANNER).scan(doc.visible_text)
+
+                # Extract prices
+                extracted_data['prices'] = self._extract_prices(scan)
+                
+                # Extract dates
+                extracted_data['dates'] = self._extract_dates(scan)
             
-            # 7. Extract key phrases and entities
+            # Extract key phrases and entities
             if main_text:
-                extracted_data.update(self._extract_nlp_data(main_text))
+                if self.nlp_batcher is not None:
+                    # Batched with main content from other pages in flight
+                    with self._span('nlp_batched'):
+                        extracted_data.update(await self.nlp_batcher.process(main_text))
+                else:
+                    extracted_data.update(self._extract_nlp_data(main_text))
             
-            # 8. Clean and validate the data
-            cleaned_data = self._clean_extracted_data(extracted_data)
+            # Clean and validate the data
+            with self._span('clean'):
+                cleaned_data = self._clean_extracted_data(extracted_data)
             
             return cleaned_data
             
@@ -324,32 +412,33 @@ class SmartExtractor:
             logger.error(f"Error in extraction: {str(e)}")
             return {"error": str(e)}
 
-    def _extract_title(self, soup: BeautifulSoup, html: str) -> str:
+    def _extract_title(self, doc: ParsedDocument) -> str:
         """Extract title using multiple methods."""
-        # Try multiple sources for title
+        # Try multiple sources for title, cheapest lookups first
         title_candidates = [
-            soup.find('meta', property='og:title'),
-            soup.find('meta', property='twitter:title'),
-            soup.find('h1'),
-            soup.find('title')
+            lambda: doc.meta_content('og:title'),
+            lambda: doc.meta_content('twitter:title'),
+            lambda: doc.first_text('h1'),
+            lambda: doc.first_text('title')
         ]
         
         for candidate in title_candidates:
-            if candidate:
-                if hasattr(candidate, 'content'):
-                    return candidate['content']
-                else:
-                    return candidate.text.strip()
+            title = candidate()
+            if title:
+                return title
                     
         # Fallback to readability
-        doc = Document(html)
-        return doc.title()
+        return readability.Document(doc.html).title()
 
-    def _extract_article_data(self, url: str, html: str) -> Dict[str, Any]:
+    def _extract_article_data(self, url: str, doc: ParsedDocument) -> Dict[str, Any]:
         """Extract article data using newspaper3k."""
         try:
-            article = Article(url)
-            article.download(input_html=html)
+            article = newspaper.Article(url)
+            # Hand newspaper3k a copy of the shared tree instead of letting
+            # Article.parse build its own
+            shared_parser = _shared_tree_parser(doc)
+            article.config.get_parser = lambda: shared_parser
+            article.download(input_html=doc.html)
             article.parse()
             article.nlp()
             
@@ -362,72 +451,43 @@ class SmartExtractor:
         except:
             return {}
 
-    def _extract_prices(self, html: str) -> list:
-        """Extract prices from HTML content."""
+    def _extract_prices(self, scan: ScanResult) -> list:
+        """Parse the currency amounts found by the profile scan."""
         prices = []
-        # Find price patterns
-        price_patterns = [
-            r'\$\d+(?:\.\d{2})?',
-            r'USD\s*\d+(?:\.\d{2})?',
-            r'€\d+(?:\.\d{2})?',
-            r'£\d+(?:\.\d{2})?'
-        ]
-        
-        for pattern in price_patterns:
-            matches = re.finditer(pattern, html)
-            for match in matches:
-                price_str = match.group()
-                parsed_price = Price.fromstring(price_str)
-                if parsed_price.amount is not None:
-                    prices.append({
-                        'amount': float(parsed_price.amount),
-                        'currency': parsed_price.currency
-                    })
+        for price_str in scan.prices:
+            parsed_price = price_parser.Price.fromstring(price_str)
+            if parsed_price.amount is not None:
+                prices.append({
+                    'amount': float(parsed_price.amount),
+                    'currency': parsed_price.currency
+                })
                     
         return prices
 
-    def _extract_dates(self, html: str) -> list:
-        """Extract dates from HTML content."""
+    def _extract_dates(self, scan: ScanResult) -> list:
+        """Normalise the dates found by the profile scan."""
         dates = []
-        # Common date patterns
-        date_patterns = [
-            r'\d{4}-\d{2}-\d{2}',
-            r'\d{2}/\d{2}/\d{4}',
-            r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}\b'
-        ]
-        
-        for pattern in date_patterns:
-            matches = re.finditer(pattern, html)
-            for match in matches:
-                try:
-                    # Convert to standard format
-                    date_str = match.group()
-                    parsed_date = datetime.strptime(date_str, '%Y-%m-%d')
-                    dates.append(parsed_date.isoformat())
-                except:
-                    continue
+        for date_str in scan.dates:
+            try:
+                # Convert to standard format
+                parsed_date = datetime.strptime(date_str, '%Y-%m-%d')
+                dates.append(parsed_date.isoformat())
+            except:
+                continue
                     
         return dates
 
     def _extract_nlp_data(self, text: str) -> Dict[str, Any]:
         """Extract named entities and key phrases using spaCy and YAKE."""
         # Process text with spaCy
-        doc = self.nlp(text)
-        
-        # Extract named entities
-        entities = {}
-        for ent in doc.ents:
-            if ent.label_ not in entities:
-                entities[ent.label_] = []
-            entities[ent.label_].append(ent.text)
+        with self._span('spacy'):
+            doc = self.nlp(text)
             
         # Extract keywords using YAKE
-        keywords = self.kw_extractor.extract_keywords(text)
+        with self._span('yake'):
+            keywords = self.kw_extractor.extract_keywords(text)
         
-        return {
-            'named_entities': entities,
-            'key_phrases': [kw[0] for kw in keywords]
-        }
+        return nlp_fields(doc, keywords)
 
     def _clean_extracted_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Clean and validate extracted data."""
@@ -1,39 +1,127 @@
 import json
 import os
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
 
-def read_storage_data() -> List[Dict]:
+try:
+    import orjson
+except ImportError:  # optional, only makes decoding faster
+    orjson = None
+
+def storage_path(*parts: str) -> str:
+    """Absolute path under the project's storage directory."""
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, 'storage', *parts)
+
+def _decode(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def get_field(record: Dict, path: str) -> Any:
+    """Value at a dotted path such as 'extracted_data.salary', or None."""
+    value: Any = record
+    for key in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+def project(record: Dict, fields: Optional[Sequence[str]]) -> Dict:
+    """Keep only the given dotted fields, keyed by their paths."""
+    if not fields:
+        return record
+    return {path: get_field(record, path) for path in fields}
+
+def _load_file(file_path: str,
+               fields: Optional[Sequence[str]],
+               where: Optional[Callable[[Dict], bool]]) -> Optional[Dict]:
+    try:
+        with open(file_path, 'rb') as f:
+            record = _decode(f.read())
+    except Exception as e:
+        print(f"Error reading {os.path.basename(file_path)}: {str(e)}")
+        return None
+
+    if where is not None and not where(record):
+        return None
+    return project(record, fields)
+
+def _load_chunk(file_paths: List[str],
+                fields: Optional[Sequence[str]],
+                where: Optional[Callable[[Dict], bool]]) -> List[Dict]:
+    records = []
+    for file_path in file_paths:
+        record = _load_file(file_path, fields, where)
+        if record is not None:
+            records.append(record)
+    return records
+
+def _dataset_files(full_path: str) -> Iterator[str]:
+    with os.scandir(full_path) as entries:
+        for entry in entries:
+            # Skip crawlee's __metadata__.json
+            if entry.name.endswith('.json') and not entry.name.startswith('__'):
+                yield entry.path
+
+def iter_storage_data(fields: Optional[Sequence[str]] = None,
+                      where: Optional[Callable[[Dict], bool]] = None,
+                      dataset: str = 'default',
+                      path: Optional[str] = None,
+                      workers: int = 0,
+                      chunk_size: int = 256) -> Iterator[Dict]:
     """
-    Read all JSON files from storage directory
-    
+    Lazily yield records from a storage dataset.
+
     Args:
-        storage_dir: Path to storage directory
-        
+        fields: Dotted paths to keep, e.g. ['url', 'title', 'extracted_data.salary'];
+            all fields if omitted
+        where: Predicate on the full record; only matching records are yielded
+        dataset: Dataset name under storage/datasets
+        path: Dataset directory, overriding `dataset`
+        workers: Decode in this many processes; `where` must then be picklable
+        chunk_size: Files per worker task
+
+    Memory stays constant: files are listed and decoded as they are consumed,
+    and in parallel mode at most two chunks per worker are in flight.
+    """
+    full_path = path or storage_path('datasets', dataset)
+    if not os.path.isdir(full_path):
+        return
+
+    files = _dataset_files(full_path)
+
+    if workers <= 0:
+        for file_path in files:
+            record = _load_file(file_path, fields, where)
+            if record is not None:
+                yield record
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        chunk: List[str] = []
+        for file_path in files:
+            chunk.append(file_path)
+            if len(chunk) >= chunk_size:
+                in_flight.append(executor.submit(_load_chunk, chunk, fields, where))
+                chunk = []
+                if len(in_flight) >= workers * 2:
+                    yield from in_flight.popleft().result()
+        if chunk:
+            in_flight.append(executor.submit(_load_chunk, chunk, fields, where))
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+def read_storage_data(dataset: str = 'default', path: Optional[str] = None) -> List[Dict]:
+    """
+    Read all JSON files from storage directory
+
+    Loads the whole dataset into memory; prefer iter_storage_data for
+    anything large.
+
     Returns:
         List of dictionaries containing crawled data
     """
-    data = []
-    
-    # Get absolute path
-    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    full_path = os.path.join(base_path, 'storage', 'datasets', 'default')
-    
-    # Create directory if it doesn't exist
-    os.makedirs(full_path, exist_ok=True)
-    
-    print(f"Reading files from: {full_path}")
-    
-    # Read all JSON files
-    for filename in os.listdir(full_path):
-        if filename.endswith('.json'):
-            file_path = os.path.join(full_path, filename)
-            print(f"\nReading file: {filename}")
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    json_data = json.load(f)
-                    print(f"Content: {json_data}")
-                    data.append(json_data)
-            except Exception as e:
-                print(f"Error reading {filename}: {str(e)}")
-                
-    return data
\ No newline at end of file
+    return list(iter_storage_data(dataset=dataset, path=path))
@@ -0,0 +1,212 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import html as html_lib
+import json
+import logging
+import re
+
+from .parsed_document import ParsedDocument
+
+logger = logging.getLogger(__name__)
+
+# JSON-LD blocks found with a regex, so pages with structured data never
+# need a DOM at all
+JSON_LD_PATTERN = re.compile(
+    r'<script\b[^>]*\btype\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+# Wrappers some CMSs leave around the JSON
+_JSON_WRAPPER = re.compile(r'^\s*(?:<!--|//\s*<!\[CDATA\[|<!\[CDATA\[)|(?:-->|//\s*\]\]>|\]\]>)\s*$')
+
+# Cheap markers telling whether a page has microdata or RDFa worth a parse
+MICRODATA_MARKER = re.compile(r'\bitemscope\b|\btypeof\s*=', re.IGNORECASE)
+
+# Properties that hold further entities worth looking inside
+NESTED_ENTITY_KEYS = ('@graph', 'mainEntity', 'mainEntityOfPage', 'itemListElement', 'item', 'about')
+
+
+def schema_types(item: Dict[str, Any]) -> List[str]:
+    """Lower-cased schema.org type names, e.g. 'https://schema.org/JobPosting' -> 'jobposting'."""
+    types = item.get('@type') or []
+    if isinstance(types, str):
+        types = types.split()
+    return [str(t).rstrip('/').rsplit('/', 1)[-1].rsplit(':', 1)[-1].lower() for t in types]
+
+
+def _walk(value: Any) -> Iterator[Dict[str, Any]]:
+    """Every typed entity in a JSON-LD value, outermost first."""
+    if isinstance(value, list):
+        for entry in value:
+            yield from _walk(entry)
+    elif isinstance(value, dict):
+        if '@type' in value:
+            yield value
+        for key in NESTED_ENTITY_KEYS:
+            if key in value:
+                yield from _walk(value[key])
+
+
+def iter_json_ld(html: str) -> Iterator[Dict[str, Any]]:
+    """Typed entities from every JSON-LD block, including @graph members and lists."""
+    for match in JSON_LD_PATTERN.finditer(html):
+        raw = _JSON_WRAPPER.sub('', match.group(1)).strip()
+        if not raw:
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            try:
+                # Some sites HTML-escape the JSON
+                data = json.loads(html_lib.unescape(raw))
+            except ValueError as e:
+                logger.debug(f"Skipping malformed JSON-LD block: {str(e)}")
+                continue
+        yield from _walk(data)
+
+
+def _property_value(element) -> Any:
+    for attribute in ('content', 'datetime', 'href', 'src', 'value'):
+        value = element.get(attribute)
+        if value is not None:
+            return value.strip()
+    return ' '.join(element.text_content().split())
+
+
+def _read_item(element, scope_attr: str, type_attr: str, prop_attr: str) -> Dict[str, Any]:
+    item: Dict[str, Any] = {}
+    item_type = element.get(type_attr)
+    if item_type:
+        item['@type'] = item_type.split()
+
+    # Properties belong to the nearest enclosing item, so stop descending at nested items
+    stack = list(element)
+    while stack:
+        child = stack.pop(0)
+        if not isinstance(child.tag, str):
+            continue
+        prop = child.get(prop_attr)
+        nested = child.get(scope_attr) is not None
+        if prop:
+            value = _read_item(child, scope_attr, type_attr, prop_attr) if nested else _property_value(child)
+            for name in prop.split():
+                # RDFa may prefix properties, e.g. 'schema:title'
+                name = name.rsplit(':', 1)[-1].rsplit('/', 1)[-1]
+                if name in item:
+                    existing = item[name]
+                    item[name] = (existing if isinstance(existing, list) else [existing]) + [value]
+                else:
+                    item[name] = value
+        if not nested:
+            stack[0:0] = list(child)
+    return item
+
+
+def iter_microdata(doc: ParsedDocument) -> Iterator[Dict[str, Any]]:
+    """Top-level microdata and RDFa items, shaped like JSON-LD entities."""
+    if not MICRODATA_MARKER.search(doc.html):
+        return
+    for element in doc.tree.xpath('//*[@itemscope and not(@itemprop)]'):
+        yield _read_item(element, 'itemscope', 'itemtype', 'itemprop')
+    for element in doc.tree.xpath('//*[@typeof and not(@property)]'):
+        yield _read_item(element, 'typeof', 'typeof', 'property')
+
+
+def iter_structured_items(doc: ParsedDocument) -> Iterator[Dict[str, Any]]:
+    """JSON-LD first, then microdata and RDFa, which need the parsed tree."""
+    yield from iter_json_ld(doc.html)
+    for item in iter_microdata(doc):
+        yield from _walk(item)
+
+
+def resolve(item: Dict[str, Any], path: str) -> Any:
+    """
+    Scalar at a dotted path, or None.
+
+    Lists along the way resolve to their first entry, and a path that ends
+    on an object does not count, so a fallback path can pick a better value.
+    """
+    value: Any = item
+    for key in path.split('.'):
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    if isinstance(value, list):
+        scalars = [v for v in value if not isinstance(v, (dict, list))]
+        return scalars or None
+    if isinstance(value, dict):
+        return None
+    return value
+
+
+@dataclass(frozen=True)
+class TypeMapping:
+    """Schema.org types and, per output field, the paths to try in order."""
+    types: frozenset
+    fields: Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+    def apply(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        mapped = {}
+        for field, paths in self.fields:
+            mapped[field] = None
+            for path in paths:
+                value = resolve(item, path)
+                if value is not None:
+                    mapped[field] = value
+                    break
+        mapped['structured'] = True  # Flag to indicate this came from structured data
+        return mapped
+
+
+def _mapping(types: Sequence[str], **fields: Sequence[str]) -> TypeMapping:
+    return TypeMapping(frozenset(types), tuple((field, tuple(paths)) for field, paths in fields.items()))
+
+
+# Keyed by ContentType value; the first mapping whose types match an entity wins
+STRUCTURED_MAPPINGS: Dict[str, List[TypeMapping]] = {
+    'job': [
+        _mapping(
+            ['jobposting', 'job'],
+            title=['title', 'name'],
+            description=['description'],
+            salary=['baseSalary.value.value', 'baseSalary.value.minValue', 'baseSalary.value',
+                    'estimatedSalary.value.value', 'baseSalary'],
+            company=['hiringOrganization.name', 'hiringOrganization'],
+            location=['jobLocation.address.addressLocality', 'jobLocation.address.addressRegion',
+                      'jobLocation.address', 'jobLocation.name', 'applicantLocationRequirements.name'],
+            date_posted=['datePosted'],
+            employment_type=['employmentType'],
+        ),
+    ],
+    'rental': [
+        _mapping(
+            ['apartment', 'house', 'rental', 'residence', 'singlefamilyresidence',
+             'accommodation', 'apartmentcomplex', 'realestatelisting', 'lodgingbusiness'],
+            title=['name', 'headline'],
+            description=['description'],
+            price=['price', 'offers.price', 'offers.priceSpecification.price', 'offers.lowPrice'],
+            location=['address.addressLocality', 'offers.itemOffered.address.addressLocality',
+                      'about.address.addressLocality', 'address'],
+        ),
+        # Listings published as an Offer for the property
+        _mapping(
+            ['offer'],
+            title=['itemOffered.name', 'name'],
+            description=['itemOffered.description', 'description'],
+            price=['price', 'priceSpecification.price'],
+            location=['itemOffered.address.addressLocality', 'availableAtOrFrom.address.addressLocality'],
+        ),
+    ],
+    # Generic pages still need main content and NLP, so nothing short-circuits them
+    'generic': [],
+}
+
+
+def find_mapping(item: Dict[str, Any], content_type: str) -> Optional[TypeMapping]:
+    """The content type's mapping for this entity's schema.org type, if any."""
+    types = set(schema_types(item))
+    for mapping in STRUCTURED_MAPPINGS.get(content_type) or []:
+        if types & mapping.types:
+            return mapping
+    return None
@@ -0,0 +1,131 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from typing import Any, Dict, Optional
+import hashlib
+import math
+import mmap
+import os
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'gclid', 'fbclid', 'msclkid', 'dclid', 'yclid', 'mc_cid', 'mc_eid',
+    'ref', 'referrer', 'source', 'trk', 'trackingid', '_hsenc', '_hsmi'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalise a URL so variants of the same page compare equal.
+
+    Lower-cases the scheme and host, drops default ports, fragments and
+    tracking parameters, sorts the remaining query parameters and removes
+    the trailing slash from non-root paths.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+
+    path = parts.path or '/'
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/') or '/'
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic seen-set.
+
+    Sized for `capacity` items at `error_rate` false positives, but never
+    larger than `max_bytes`; if the cap binds, the false-positive rate at
+    capacity rises accordingly (see `stats`). The bits live in a bytearray,
+    or in a memory-mapped file when `path` is given so the set survives a
+    restart.
+    """
+
+    def __init__(self,
+                 capacity: int = 10_000_000,
+                 error_rate: float = 0.001,
+                 max_bytes: Optional[int] = None,
+                 path: Optional[str] = None):
+        bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        if max_bytes is not None:
+            bits = min(bits, max_bytes * 8)
+        self.size_bytes = max(1, math.ceil(bits / 8))
+        self.num_bits = self.size_bytes * 8
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.capacity = capacity
+
+        self.count = 0
+        self.lookups = 0
+        self.duplicates = 0
+
+        self._file = None
+        if path:
+            self._bits = self._open_mmap(path)
+        else:
+            self._bits = bytearray(self.size_bytes)
+
+    def _open_mmap(self, path: str):
+        exists = os.path.exists(path)
+        self._file = open(path, 'r+b' if exists else 'w+b')
+        if not exists or os.path.getsize(path) != self.size_bytes:
+            self._file.truncate(self.size_bytes)
+        return mmap.mmap(self._file.fileno(), self.size_bytes)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def add(self, item: str) -> bool:
+        """Add an item; True if it was (probably) already present."""
+        self.lookups += 1
+        present = True
+        for pos in self._positions(item):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not self._bits[byte] & mask:
+                present = False
+                self._bits[byte] |= mask
+
+        if present:
+            self.duplicates += 1
+        else:
+            self.count += 1
+        return present
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory use, duplicate hit rate and current false-positive estimate."""
+        fill = 1 - math.exp(-self.num_hashes * self.count / self.num_bits)
+        return {
+            'memory_bytes': self.size_bytes,
+            'items': self.count,
+            'lookups': self.lookups,
+            'duplicate_rate': self.duplicates / self.lookups if self.lookups else 0.0,
+            'estimated_false_positive_rate': fill ** self.num_hashes
+        }
+
+    def flush(self) -> None:
+        if isinstance(self._bits, mmap.mmap):
+            self._bits.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._bits.close()
+            self._file.close()
+            self._file = None
@@ -1,45 +1,151 @@
 from urllib.parse import urlparse
-from typing import List, Set
+from typing import Any, Dict, Iterable, List, Optional, Set
 import re
 
+from .url_dedup import BloomFilter, canonicalize_url
+
+# Paths that never hold listings
+SKIPPED_PATH_PATTERN = re.compile(
+    '|'.join(re.escape(pattern) for pattern in [
+        '/login', '/signup', '/contact', '/about',
+        '/privacy', '/terms', '/cart', '/checkout'
+    ]),
+    re.IGNORECASE
+)
+
+# URLs with menu= parameter followed by numbers
+MENU_PATTERN = re.compile(r'menu=\d+$')
+
+
 class UrlFilter:
-    def __init__(self):
+    """
+    Crawl-wide frontier policy.
+
+    One instance is shared by the whole crawl and consulted before a URL is
+    added to the request queue, so disallowed links never cost a
+    navigation and the per-domain budget counts every page admitted so far.
+    URLs are canonicalised and remembered in a fixed-size Bloom filter, so
+    variants of one page are only considered once, even on very large crawls.
+    """
+
+    def __init__(self,
+                 max_pages_per_domain: int = 2,
+                 seen: Optional[BloomFilter] = None):
         self.visited_domains: Set[str] = set()
-        self.max_pages_per_domain = 2  # Adjust this number as needed
+        self.max_pages_per_domain = max_pages_per_domain  # Adjust this number as needed
         self.domain_page_counts: dict = {}
-        
-    def should_crawl_url(self, url: str) -> bool:
+        # Every canonical URL considered so far; the rules and budgets are
+        # deterministic, so a URL seen once never needs checking again
+        self.seen = seen or BloomFilter(capacity=1_000_000, error_rate=0.001)
+        # Domains whose count moved since the last checkpoint
+        self.changed_domains: Set[str] = set()
+
+    def is_allowed(self, url: str) -> bool:
+        """Path rules only; does not touch the domain budget."""
         parsed = urlparse(url)
-        domain = parsed.netloc
         path = parsed.path
-        
+
+        if parsed.scheme not in ('http', 'https'):
+            return False
+
         # Skip unwanted URL patterns
-        if any(pattern in path.lower() for pattern in [
-            '/login', '/signup', '/contact', '/about',
-            '/privacy', '/terms', '/cart', '/checkout'
-        ]):
+        if SKIPPED_PATH_PATTERN.search(path):
             return False
-        
+
         # Skip URLs with menu= parameter followed by numbers
-        if re.search(r'menu=\d+$', path):
+        if MENU_PATTERN.search(path):
             return False
 
         # Skip URLs if there is nothing right after the domain
         if not path or path == '/':
             return False
-        
+
         # Skip URLs with too many path segments
         if len(path.split('/')) > 4:  # Adjust number as needed
             return False
-        
+
+        return True
+
+    def should_crawl_url(self, url: str) -> bool:
+        """Admit a canonical URL to the frontier, charging it to its domain's budget."""
+        if self.seen.add(url):
+            return False
+
+        if not self.is_allowed(url):
+            return False
+
+        domain = urlparse(url).netloc
+
         # Initialize counter for new domains
         if domain not in self.domain_page_counts:
             self.domain_page_counts[domain] = 0
-            
+            self.visited_domains.add(domain)
+
         # Check if we've reached the limit for this domain
         if self.domain_page_counts[domain] >= self.max_pages_per_domain:
             return False
-            
+
         # Increment counter and return True if we should crawl
         self.domain_page_counts[domain] += 1
-        return True
\ No newline at end of file
+        self.changed_domains.add(domain)
+        return True
+
+    def filter_urls(self, urls: Iterable[str], same_host_as: Optional[str] = None) -> List[str]:
+        """
+        The canonical forms of the URLs that may be queued, in order.
+
+        With `same_host_as`, links to other hosts are dropped, matching
+        enqueue_links' default same-hostname strategy.
+        """
+        host = urlparse(canonicalize_url(same_host_as)).netloc if same_host_as else None
+        allowed = []
+        for url in urls:
+            try:
+                url = canonicalize_url(url)
+            except ValueError:
+                # Malformed, e.g. a non-numeric port
+                continue
+            if (host is None or urlparse(url).netloc == host) and self.should_crawl_url(url):
+                allowed.append(url)
+        return allowed
+
+    def drain_changed_domains(self) -> Dict[str, int]:
+        """Counts of the domains admitted to since the last call, for incremental checkpoints."""
+        changed = {domain: self.domain_page_counts[domain] for domain in self.changed_domains}
+        self.changed_domains = set()
+        return changed
+
+    def restore_counts(self, counts: Dict[str, int]) -> None:
+        """Reapply checkpointed domain budgets after a restart."""
+        self.domain_page_counts.update(counts)
+        self.visited_domains.update(counts)
+
+    def stats(self) -> Dict[str, Any]:
+        """Seen-set memory and duplicate rate, plus domain budget usage."""
+        return {
+            'seen': self.seen.stats(),
+            'domains': len(self.domain_page_counts),
+            'admitted': sum(self.domain_page_counts.values())
+        }
+
+
+_url_filter: Optional[UrlFilter] = None
+
+
+def configure_url_filter(max_pages_per_domain: int = 2,
+                         capacity: int = 1_000_000,
+                         error_rate: float = 0.001,
+                         max_bytes: Optional[int] = None,
+                         path: Optional[str] = None) -> UrlFilter:
+    """Start a frontier policy for a crawl; with `path` the seen-set is a file that survives restarts."""
+    global _url_filter
+    seen = BloomFilter(capacity=capacity, error_rate=error_rate, max_bytes=max_bytes, path=path)
+    _url_filter = UrlFilter(max_pages_per_domain, seen)
+    return _url_filter
+
+
+def get_url_filter() -> UrlFilter:
+    global _url_filter
+    if _url_filter is None:
+        _url_filter = UrlFilter()
+    return _url_filter
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The package directory is named my-crawler, so tests import it with
+# importlib.import_module('my-crawler.<module>') from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,47 @@
+import asyncio
+import importlib
+
+from crawlee.configuration import Configuration
+
+adaptive_fetch = importlib.import_module('my-crawler.adaptive_fetch')
+
+
+class FakeBrowserCrawler:
+    runs = []
+
+    def __init__(self, max_requests_per_crawl=None, **options):
+        self.max_requests_per_crawl = max_requests_per_crawl
+
+    def pre_navigation_hook(self, hook):
+        pass
+
+    async def run(self, urls):
+        self.runs.append((self.max_requests_per_crawl, urls))
+
+
+def resumed_crawler(tmp_path, served):
+    """A crawler resumed after its HTTP pass, which served `served` pages and escalated one."""
+    crawler = adaptive_fetch.AdaptiveCrawler(
+        max_requests_per_crawl=3,
+        policy=adaptive_fetch.DomainFetchPolicy(path=str(tmp_path / 'fetch_policy.json')),
+        configuration=Configuration(storage_dir=str(tmp_path / 'storage')),
+    )
+    crawler.http_done = True
+    crawler.http_served = served
+    crawler.escalated = ['https://a.example/']
+    return crawler
+
+
+def test_browser_pass_gets_what_the_http_pass_left(tmp_path, monkeypatch):
+    # crawlee's storage client may already be bound to the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(adaptive_fetch, 'PlaywrightCrawler', FakeBrowserCrawler)
+    monkeypatch.setattr(adaptive_fetch, 'make_browser_pool', lambda settings: None)
+    monkeypatch.setattr(FakeBrowserCrawler, 'runs', [])
+
+    asyncio.run(resumed_crawler(tmp_path, 2).run(['https://a.example/']))
+    assert FakeBrowserCrawler.runs == [(1, ['https://a.example/'])]
+
+    # Nothing left: the browser is not started at all
+    asyncio.run(resumed_crawler(tmp_path, 3).run(['https://a.example/']))
+    assert len(FakeBrowserCrawler.runs) == 1
@@ -0,0 +1,131 @@
+import asyncio
+import importlib
+import json
+import sys
+import threading
+
+checkpoint = importlib.import_module('my-crawler.checkpoint')
+
+
+class FakeSink:
+    def __init__(self):
+        self.calls = []
+
+    def flush(self):
+        self.calls.append('flush')
+
+    def sync(self):
+        self.calls.append('sync')
+
+
+def test_save_async_writes_off_the_loop(tmp_path):
+    sink = FakeSink()
+    store = checkpoint.CrawlCheckpoint(str(tmp_path)).attach(flushables=[sink])
+    store.seeds = ['https://example.com/']
+
+    async def crawl():
+        store.start()
+        await store.save_async()
+        await store.stop()
+
+    asyncio.run(crawl())
+
+    assert store.saves == 2
+    assert sink.calls == ['flush', 'sync', 'flush', 'sync']
+    assert store.load()['seeds'] == ['https://example.com/']
+
+
+def test_load_cuts_a_final_line_without_newline(tmp_path):
+    store = checkpoint.CrawlCheckpoint(str(tmp_path))
+    store.save()
+    complete = json.dumps({'domain': 'a.example', 'pages': 1}) + '\n'
+    # Parses as JSON, but the crash came before its newline
+    torn = json.dumps({'domain': 'b.example', 'pages': 2})
+    with open(store.journal_path, 'w', encoding='utf-8') as f:
+        f.write(complete + torn)
+
+    state = checkpoint.CrawlCheckpoint(str(tmp_path)).load()
+
+    assert state['domains'] == {'a.example': 1}
+    with open(store.journal_path, encoding='utf-8') as f:
+        assert f.read() == complete
+
+
+def attached(path):
+    url_filter = importlib.import_module('my-crawler.url_filter')
+    near_dedup = importlib.import_module('my-crawler.near_dedup')
+    store = checkpoint.CrawlCheckpoint(str(path))
+    frontier = url_filter.configure_url_filter(max_pages_per_domain=2, capacity=1000, path=store.bloom_path)
+    dedup = near_dedup.DedupIndex()
+    return store.attach(url_filter=frontier, dedup_index=dedup), frontier, dedup
+
+
+def test_resume_restores_budgets_seen_set_and_fingerprints(tmp_path):
+    store, frontier, dedup = attached(tmp_path)
+    store.seeds = ['https://a.example/1']
+    frontier.filter_urls(['https://a.example/1', 'https://a.example/2'])
+    store.save()
+    # Changes after the first checkpoint reach the journal on the next one
+    frontier.filter_urls(['https://b.example/1'])
+    fingerprint = dedup.fingerprint('some page text')
+    dedup.add('https://a.example/1', fingerprint)
+    store.save()
+    frontier.seen.close()
+
+    resumed, frontier, dedup = attached(tmp_path)
+    state = resumed.load()
+    resumed.restore(state)
+
+    assert resumed.seeds == ['https://a.example/1']
+    assert state['domains'] == {'a.example': 2, 'b.example': 1}
+    # Seen before the crash, and a.example's budget is spent
+    assert frontier.filter_urls(['https://a.example/1', 'https://a.example/3', 'https://b.example/2']) == [
+        'https://b.example/2'
+    ]
+    assert dedup.find('https://c.example/1', fingerprint).canonical_url == 'https://a.example/1'
+    frontier.seen.close()
+
+
+def test_compacted_journal_resumes_the_same(tmp_path):
+    store, frontier, dedup = attached(tmp_path)
+    store.compact_after = 2
+    for i in range(5):
+        frontier.filter_urls([f'https://site{i}.example/1'])
+        store.save()
+    frontier.seen.close()
+
+    with open(store.journal_path, encoding='utf-8') as f:
+        assert len(f.readlines()) == 5
+    state = checkpoint.CrawlCheckpoint(str(tmp_path)).load()
+    assert state['domains'] == {f'site{i}.example': 1 for i in range(5)}
+
+
+def test_sink_syncs_from_another_thread_across_segment_rollover(tmp_path):
+    result_store = importlib.import_module('my-crawler.result_store')
+    sink = result_store.SegmentedResultStore(str(tmp_path / 'results'), flush_every=1, segment_records=2, codec='gz')
+    errors = []
+    done = threading.Event()
+
+    def checkpoint_thread():
+        while not done.is_set():
+            try:
+                sink.sync()
+            except Exception as e:
+                errors.append(e)
+
+    # Switch threads as often as possible, so syncs land mid-rollover
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    thread = threading.Thread(target=checkpoint_thread)
+    thread.start()
+    try:
+        for i in range(1000):
+            sink.push({'url': f'https://example.com/{i}'})
+    finally:
+        done.set()
+        thread.join()
+        sys.setswitchinterval(previous)
+    sink.close()
+
+    assert errors == []
+    assert len(list(result_store.iter_results(path=str(tmp_path / 'results')))) == 1000
@@ -0,0 +1,108 @@
+import asyncio
+import importlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+extraction_pool = importlib.import_module('my-crawler.extraction_pool')
+ContentType = importlib.import_module('my-crawler.smart_extractor').ContentType
+
+NO_METRICS = {'counters': [], 'spans': []}
+
+
+class FakeExtractor:
+    seen = []
+
+    def __init__(self, nlp_batcher=None):
+        pass
+
+    def set_content_type(self, content_type):
+        pass
+
+    async def extract_content(self, html, url):
+        self.seen.append((url, html))
+        return {'title': url}
+
+    def outcome(self, extracted_data):
+        return 'fake'
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    # Threads stand in for worker processes, so the fakes below are used
+    pool = ThreadPoolExecutor(max_workers=8)
+    monkeypatch.setattr(extraction_pool.ExtractionExecutor, '_ensure_pool', lambda self: pool)
+    yield pool
+    pool.shutdown()
+
+
+def test_long_pages_are_truncated(monkeypatch):
+    monkeypatch.setattr(extraction_pool, 'SmartExtractor', FakeExtractor)
+    monkeypatch.setattr(FakeExtractor, 'seen', [])
+    executor = extraction_pool.ExtractionExecutor(max_html_chars=10)
+
+    async def crawl():
+        await executor.extract('<html>' + 'x' * 20, 'https://a.example/long', ContentType.JOB)
+        await executor.extract('<p>hi</p>', 'https://a.example/short', ContentType.JOB)
+
+    asyncio.run(crawl())
+    assert FakeExtractor.seen == [
+        ('https://a.example/long', '<html>xxxx'),
+        ('https://a.example/short', '<p>hi</p>'),
+    ]
+    assert extraction_pool.ExtractionExecutor(max_html_chars=None).max_html_chars is None
+
+
+def test_at_most_max_pending_pages_in_flight(monkeypatch, thread_pool):
+    lock = threading.Lock()
+    in_flight = [0, 0]
+
+    def extract_in_worker(html, url, content_type):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return {'url': url}, 'fake', NO_METRICS
+
+    monkeypatch.setattr(extraction_pool, '_extract_in_worker', extract_in_worker)
+    executor = extraction_pool.ExtractionExecutor(mode='process', max_workers=8, max_pending=2)
+
+    async def crawl():
+        return await asyncio.gather(*(
+            executor.extract('<p></p>', f'https://a.example/{i}', ContentType.GENERIC) for i in range(8)
+        ))
+
+    results = asyncio.run(crawl())
+    assert [result['url'] for result in results] == [f'https://a.example/{i}' for i in range(8)]
+    assert in_flight == [0, 2]
+
+
+def test_pages_batch_up_only_while_workers_are_busy(monkeypatch, thread_pool):
+    batches = []
+
+    def extract_batch_in_worker(pages, batcher_options):
+        batches.append(len(pages))
+        time.sleep(0.02)
+        return [({'url': url}, 'fake') for _, url, _ in pages], NO_METRICS
+
+    monkeypatch.setattr(extraction_pool, '_extract_batch_in_worker', extract_batch_in_worker)
+    executor = extraction_pool.ExtractionExecutor(
+        mode='process', max_workers=1, nlp_batcher=extraction_pool.NlpBatcher(batch_size=3)
+    )
+
+    async def crawl():
+        return await asyncio.gather(*(
+            executor.extract('<p></p>', f'https://a.example/{i}', ContentType.GENERIC) for i in range(7)
+        ))
+
+    results = asyncio.run(crawl())
+    executor.shutdown()
+    assert [result['url'] for result in results] == [f'https://a.example/{i}' for i in range(7)]
+    # The idle worker takes the first page alone; the rest queue behind it
+    assert batches[0] == 1
+    assert sum(batches) == 7
+    assert max(batches) == 3
@@ -0,0 +1,170 @@
+import asyncio
+import importlib
+
+import pytest
+
+frontier_queue = importlib.import_module('my-crawler.frontier_queue')
+
+
+def urls_for(shard, count, shards=2):
+    """URLs on distinct domains that all hash to `shard`."""
+    urls = []
+    i = 0
+    while len(urls) < count:
+        url = f'https://site-{i}.example/page'
+        if frontier_queue.shard_for(url, shards) == shard:
+            urls.append(url)
+        i += 1
+    return urls
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = frontier_queue.SqliteFrontierQueue(str(tmp_path / 'frontier.sqlite'), shards=2)
+    yield queue
+    queue.close()
+
+
+def test_put_dedups_and_files_by_domain(queue):
+    urls = urls_for(0, 2) + urls_for(1, 1)
+    assert queue.put(urls + urls[:1]) == 3
+    assert queue.put(urls) == 0
+    assert queue.counts()[0]['pending'] == 2
+    assert queue.counts()[1]['pending'] == 1
+
+
+def test_budgets(tmp_path):
+    queue = frontier_queue.SqliteFrontierQueue(
+        str(tmp_path / 'frontier.sqlite'), shards=1, max_requests=3, max_pages_per_domain=2
+    )
+    assert queue.put([f'https://a.example/{i}' for i in range(3)]) == 2
+    assert queue.put(['https://b.example/1', 'https://c.example/1']) == 1
+    # Workers read the settings back from the file
+    worker = frontier_queue.SqliteFrontierQueue(queue.path)
+    assert (worker.shards, worker.max_requests, worker.max_pages_per_domain) == (1, 3, 2)
+    worker.close()
+    queue.close()
+
+
+def test_claim_is_exclusive_and_in_order(queue):
+    urls = urls_for(0, 5)
+    queue.put(urls)
+
+    first = queue.claim(0, 2)
+    second = queue.claim(0, 2)
+    assert [request.url for request in first + second] == urls[:4]
+    assert queue.claim(1, 2) == []
+
+    # Completions ride along with the next claim
+    queue.claim(0, 0, [request.unique_key for request in first])
+    assert queue.counts()[0] == {'pending': 1, 'claimed': 2, 'handled': 2, 'abandoned': 0}
+    assert queue.unfinished(0) == 3
+
+
+def test_expired_lease_is_claimed_again(tmp_path, monkeypatch):
+    queue = frontier_queue.SqliteFrontierQueue(str(tmp_path / 'frontier.sqlite'), shards=1, lease_seconds=60)
+    queue.put(['https://a.example/1'])
+    [request] = queue.claim(0, 1)
+    assert queue.claim(0, 1) == []
+
+    now = frontier_queue.time.time()
+    monkeypatch.setattr(frontier_queue.time, 'time', lambda: now + 61)
+    assert [again.url for again in queue.claim(0, 1)] == [request.url]
+    queue.close()
+
+
+def test_reclaim_release_and_requeue(queue):
+    queue.put(urls_for(0, 3))
+    first, second, third = queue.claim(0, 3)
+
+    first.retry_count = 2
+    queue.reclaim(first)
+    queue.release([second.unique_key])
+    [again, released] = queue.claim(0, 2)
+    assert again.retry_count == 2
+    assert released.unique_key == second.unique_key
+
+    assert queue.requeue_claimed(1) == 0
+    assert queue.requeue_claimed(0) == 3
+    assert queue.counts()[0]['pending'] == 3
+
+
+def test_abandon_finishes_the_shard(queue):
+    queue.put(urls_for(0, 2))
+    queue.claim(0, 1)
+    assert queue.abandon(0) == 2
+    assert queue.claim(0, 8) == []
+    assert queue.unfinished() == 0
+
+
+def test_put_after_abandon_is_dropped(queue):
+    queue.put(urls_for(0, 3) + urls_for(1, 2))
+
+    assert queue.abandon(0) == 3
+    assert queue.put(urls_for(0, 5)[3:]) == 0
+    assert queue.put(urls_for(1, 3)[2:]) == 1
+
+    assert queue.unfinished(0) == 0
+    assert queue.counts()[0]['abandoned'] == 3
+    assert queue.counts()[1]['pending'] == 3
+
+
+def test_reset_forgets_abandoned_shards(queue):
+    queue.abandon(0)
+    queue.reset()
+
+    assert queue.put(urls_for(0, 2)) == 2
+    assert queue.unfinished(0) == 2
+
+
+def test_escalated_request_moves_to_the_browser_lane(queue):
+    queue.put(urls_for(0, 2))
+    first, second = queue.claim(0, 2)
+
+    queue.escalate([first.unique_key])
+    # The HTTP pass marks it handled afterwards, which must not finish it
+    queue.complete([first.unique_key, second.unique_key])
+
+    assert queue.unfinished(lane=frontier_queue.DEFAULT_LANE) == 0
+    assert queue.unfinished(lane=frontier_queue.BROWSER_LANE) == 1
+    assert [request.url for request in queue.claim(0, 8, lane=frontier_queue.BROWSER_LANE)] == [first.url]
+    assert queue.claim(0, 8) == []
+
+
+def test_browser_lane_provider_keeps_its_links_in_the_lane(queue):
+    async def crawl():
+        provider = frontier_queue.ShardRequestProvider(queue, 0)
+        queue.put(urls_for(0, 1))
+        request = await provider.fetch_next_request()
+        provider.escalate(request)
+        await provider.mark_request_as_handled(request)
+        assert await provider.is_finished()
+
+        browser = provider.for_lane(frontier_queue.BROWSER_LANE)
+        assert not await browser.is_finished()
+        assert (await browser.fetch_next_request()).url == request.url
+        await browser.add_requests_batched(urls_for(1, 1))
+        await browser.mark_request_as_handled(request)
+        browser.close()
+
+    asyncio.run(crawl())
+    assert queue.counts()[0]['handled'] == 1
+    assert queue.unfinished(1, frontier_queue.BROWSER_LANE) == 1
+
+
+def test_incomplete_backend_fails_when_created():
+    class PutOnly(frontier_queue.FrontierQueue):
+        def put(self, requests, lane=frontier_queue.DEFAULT_LANE):
+            return 0
+
+    with pytest.raises(TypeError):
+        PutOnly()
+
+
+def test_reopen_undoes_abandon(queue):
+    queue.put(urls_for(0, 2))
+    queue.abandon(0)
+
+    assert queue.reopen(0) == 2
+    assert queue.put(urls_for(0, 3)[2:]) == 1
+    assert len(queue.claim(0, 8)) == 3
@@ -0,0 +1,92 @@
+import importlib
+
+import pytest
+
+listing_index = importlib.import_module('my-crawler.listing_index')
+
+
+def record(url, title, content, prices=(), dates=(), entities=None, **extracted):
+    return {
+        'url': url,
+        'title': title,
+        'extracted_data': dict(
+            title=title,
+            main_content=content,
+            key_phrases=[title.lower()],
+            prices=[{'amount': amount, 'currency': currency} for amount, currency in prices],
+            dates=list(dates),
+            named_entities=entities or {},
+            **extracted
+        ),
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = listing_index.ListingIndex(str(tmp_path / 'listing_index.sqlite'), commit_every=2)
+    index.add_many([
+        record('https://a.example/1', 'Graduate developer', 'Join our Adelaide team as a graduate.',
+               prices=[(65000, 'AUD')], dates=['2026-03-01'], entities={'GPE': ['Adelaide', 'Adelaide']}),
+        record('https://b.example/1', 'Senior developer', 'Remote role for an experienced engineer.',
+               prices=[(140000, 'AUD')], dates=['2026-05-20T09:00:00'], entities={'GPE': ['Sydney']}),
+        record('https://c.example/1', 'Two bedroom unit', 'Close to the Adelaide CBD.',
+               dates=['2026-03-15'], entities={'GPE': ['Adelaide']}, price='450'),
+    ])
+    yield index
+    index.close()
+
+
+def urls(records):
+    return sorted(record['url'] for record in records)
+
+
+def test_records_without_extraction_are_skipped(index):
+    assert not index.add({'url': 'https://d.example/1', 'extracted_data': None})
+    assert not index.add({'extracted_data': {'title': 'No URL'}})
+    assert index.count() == 3
+
+
+def test_add_replaces_the_record_for_a_url(index):
+    index.add(record('https://a.example/1', 'Graduate analyst', 'Now in Melbourne.',
+                     prices=[(70000, 'AUD')], entities={'GPE': ['Melbourne']}))
+
+    assert index.count() == 3
+    assert urls(index.search('analyst')) == ['https://a.example/1']
+    # The old text, price and entities are gone with the old row
+    assert index.search('graduate AND adelaide') == []
+    assert urls(index.search(min_price=60000, max_price=66000)) == []
+    assert index.facets('GPE') == [('Adelaide', 1), ('Melbourne', 1), ('Sydney', 1)]
+
+
+def test_full_text_search(index):
+    assert urls(index.search('developer')) == ['https://a.example/1', 'https://b.example/1']
+    assert urls(index.search('adelaide')) == ['https://a.example/1', 'https://c.example/1']
+    assert index.search('developer', limit=1)[0]['url'] in ('https://a.example/1', 'https://b.example/1')
+
+
+def test_price_and_date_ranges(index):
+    assert urls(index.search(min_price=100000)) == ['https://b.example/1']
+    assert urls(index.search(max_price=1000)) == ['https://c.example/1']
+    assert urls(index.search(currency='AUD', max_price=100000)) == ['https://a.example/1']
+    assert urls(index.search(date_from='2026-03-01', date_to='2026-03-31')) == [
+        'https://a.example/1', 'https://c.example/1'
+    ]
+    # A bare day covers timestamps within it
+    assert urls(index.search(date_from='2026-05-20', date_to='2026-05-20')) == ['https://b.example/1']
+
+
+def test_entity_filters_and_facets(index):
+    assert urls(index.search(entities={'GPE': 'Adelaide'})) == ['https://a.example/1', 'https://c.example/1']
+    assert urls(index.search('developer', entities={'GPE': 'Adelaide'})) == ['https://a.example/1']
+    assert index.facets('GPE') == [('Adelaide', 2), ('Sydney', 1)]
+    assert index.facets('GPE', text='developer', min_price=100000) == [('Sydney', 1)]
+
+
+def test_committed_records_are_visible_when_reopened(index, tmp_path):
+    index.add(record('https://d.example/1', 'Intern', 'Summer internship.'))
+    index.commit()
+
+    reopened = listing_index.ListingIndex(str(tmp_path / 'listing_index.sqlite'))
+    assert reopened.count() == 4
+    assert urls(reopened.search('internship')) == ['https://d.example/1']
+    reopened.close()
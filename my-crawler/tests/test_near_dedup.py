@@ -0,0 +1,66 @@
+import importlib
+
+near_dedup = importlib.import_module('my-crawler.near_dedup')
+
+TEXT = ' '.join(f'word{i}' for i in range(1000))
+# One word changed; a few bits away from TEXT's SimHash
+EDITED = TEXT.replace('word30 ', 'changed ')
+
+
+def test_exact_duplicate_is_found_but_not_the_page_itself():
+    index = near_dedup.DedupIndex()
+    fingerprint = index.fingerprint(TEXT)
+    assert index.find('https://a.example/1', fingerprint) is None
+    index.add('https://a.example/1', fingerprint)
+
+    # The same page fetched again, e.g. a retry or a browser re-render
+    assert index.find('https://a.example/1', index.fingerprint(TEXT)) is None
+
+    match = index.find('https://b.example/1', index.fingerprint('  ' + TEXT.replace(' ', '\n')))
+    assert match == near_dedup.DuplicateMatch('exact', 'https://a.example/1')
+    assert index.counts == {'exact': 1, 'near': 0, 'unique': 1}
+
+
+def test_near_duplicate_within_distance():
+    index = near_dedup.DedupIndex()
+    index.add('https://a.example/1', index.fingerprint(TEXT))
+
+    match = index.find('https://b.example/1', index.fingerprint(EDITED))
+    assert match is not None and match.kind == 'near'
+    assert match.canonical_url == 'https://a.example/1'
+    assert match.distance <= index.near.max_distance
+
+    assert index.find('https://a.example/1', index.fingerprint(EDITED)) is None
+
+
+def test_short_texts_only_match_exactly():
+    index = near_dedup.DedupIndex()
+    fingerprint = index.fingerprint('a short page')
+    assert fingerprint.simhash is None
+    index.add('https://a.example/1', fingerprint)
+    assert index.find('https://b.example/1', index.fingerprint('a short page.')) is None
+
+
+def test_simhash_index_finds_closest():
+    index = near_dedup.SimHashIndex(max_distance=3)
+    index.add(0b1111, 'far')
+    index.add(0b0001, 'close')
+    assert index.find(0b0000) == ('close', 1)
+    assert index.find(0b0000, exclude='close') is None
+    assert index.find(0b0111, exclude='close') == ('far', 1)
+
+
+def test_journal_restores_into_a_new_index():
+    index = near_dedup.DedupIndex()
+    index.journal = []
+    index.add('https://a.example/1', index.fingerprint(TEXT))
+    index.add('https://a.example/1', index.fingerprint(TEXT))
+    entries = index.drain_journal()
+    assert len(entries) == 2
+    assert list(index.entries()) == entries
+
+    restored = near_dedup.DedupIndex()
+    for entry in entries:
+        restored.restore(entry)
+    assert restored.find('https://b.example/1', restored.fingerprint(TEXT)).kind == 'exact'
+    assert restored.find('https://b.example/1', restored.fingerprint(EDITED)).kind == 'near'
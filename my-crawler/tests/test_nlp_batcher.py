@@ -0,0 +1,70 @@
+import asyncio
+import importlib
+
+import pytest
+
+nlp_batcher = importlib.import_module('my-crawler.nlp_batcher')
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Texts of every batch analysed; spaCy and YAKE are replaced by an echo."""
+    batches = []
+
+    def analyse(self, texts):
+        batches.append(list(texts))
+        return [{'named_entities': {}, 'key_phrases': [text]} for text in texts]
+
+    monkeypatch.setattr(nlp_batcher.NlpBatcher, '_analyse', analyse)
+    return batches
+
+
+def run(batcher, texts):
+    async def process_all():
+        return await asyncio.gather(*(batcher.process(text) for text in texts))
+
+    try:
+        return asyncio.run(process_all())
+    finally:
+        batcher.shutdown()
+
+
+def test_full_batches_flush_at_once(batches):
+    batcher = nlp_batcher.NlpBatcher(batch_size=3, max_latency=60)
+    results = run(batcher, [f'text {i}' for i in range(6)])
+
+    # Each request gets its own result back
+    assert [result['key_phrases'] for result in results] == [[f'text {i}'] for i in range(6)]
+    assert batches == [['text 0', 'text 1', 'text 2'], ['text 3', 'text 4', 'text 5']]
+
+
+def test_partial_batch_flushes_after_max_latency(batches):
+    batcher = nlp_batcher.NlpBatcher(batch_size=32, max_latency=0.01)
+    results = run(batcher, ['a', 'b'])
+
+    assert [result['key_phrases'] for result in results] == [['a'], ['b']]
+    assert batches == [['a', 'b']]
+
+
+def test_batch_errors_reach_every_request(monkeypatch):
+    def analyse(self, texts):
+        raise RuntimeError('model missing')
+
+    monkeypatch.setattr(nlp_batcher.NlpBatcher, '_analyse', analyse)
+    batcher = nlp_batcher.NlpBatcher(batch_size=2)
+
+    async def process_all():
+        return await asyncio.gather(*(batcher.process(text) for text in 'ab'), return_exceptions=True)
+
+    results = asyncio.run(process_all())
+    batcher.shutdown()
+    assert [str(result) for result in results] == ['model missing', 'model missing']
+
+
+def test_options_rebuild_the_same_batcher():
+    batcher = nlp_batcher.NlpBatcher(batch_size=4, max_latency=0.2, disable=['parser'])
+    copy = nlp_batcher.NlpBatcher(**batcher.options())
+
+    assert copy.options() == batcher.options()
+    batcher.shutdown()
+    copy.shutdown()
@@ -0,0 +1,43 @@
+import importlib
+import sqlite3
+
+page_state = importlib.import_module('my-crawler.page_state')
+
+
+def stored_urls(path):
+    db = sqlite3.connect(path)
+    try:
+        return {url for url, in db.execute('SELECT url FROM page_state')}
+    finally:
+        db.close()
+
+
+def test_writes_are_committed_in_batches(tmp_path):
+    path = str(tmp_path / 'page_state.sqlite')
+    store = page_state.PageStateStore(path, commit_every=3, commit_interval=3600)
+
+    store.save('https://example.com/1', 'a', {'title': 'one'})
+    store.save('https://example.com/2', 'b', {'title': 'two'})
+    assert stored_urls(path) == set()
+
+    store.save('https://example.com/3', 'c', {'title': 'three'})
+    assert len(stored_urls(path)) == 3
+
+    store.save('https://example.com/4', 'd', {'title': 'four'})
+    store.close()
+    assert len(stored_urls(path)) == 4
+
+
+def test_conditional_requests(tmp_path):
+    store = page_state.PageStateStore(str(tmp_path / 'page_state.sqlite'))
+    store.save('https://example.com/etag', 'a', {}, {'ETag': '"v1"'})
+    store.save('https://example.com/plain', 'b', {})
+
+    requests = store.conditional_requests([
+        'https://example.com/new', 'https://example.com/etag', 'https://example.com/plain'
+    ])
+    store.close()
+
+    assert requests[0] == 'https://example.com/new'
+    assert requests[1].headers['If-None-Match'] == '"v1"'
+    assert requests[2] == 'https://example.com/plain'
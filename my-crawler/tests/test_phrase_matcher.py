@@ -0,0 +1,35 @@
+import importlib
+import random
+from collections import Counter
+
+phrase_matcher = importlib.import_module('my-crawler.phrase_matcher')
+
+PHRASES = [('job', 'a'), ('job title', 'a'), ('Title', 'b'), ('apply now', 'b'), ('now', 'c'), ('salary', 'c')]
+
+
+def scan(phrases, text):
+    """The per-phrase substring scan the matcher replaced."""
+    lowered = text.lower()
+    tags = {}
+    for phrase, tag in phrases:
+        tags.setdefault(phrase.lower(), set()).add(tag)
+    return Counter(tag for phrase, found in tags.items() if phrase in lowered for tag in found)
+
+
+def test_hits_match_a_substring_scan():
+    matcher = phrase_matcher.PhraseMatcher(PHRASES)
+    text = 'Senior JOB TITLE: engineer. Apply Now! Salary negotiable; apply now.'
+    assert matcher.hits(text) == scan(PHRASES, text) == Counter({'a': 2, 'b': 2, 'c': 2})
+    assert matcher.find(text) == {'job', 'job title', 'title', 'apply now', 'now', 'salary'}
+    assert matcher.hits('nothing here') == Counter()
+    assert phrase_matcher.PhraseMatcher([]).hits(text) == Counter()
+
+
+def test_phrases_across_chunk_boundaries(monkeypatch):
+    monkeypatch.setattr(phrase_matcher, 'CHUNK_CHARS', 7)
+    matcher = phrase_matcher.PhraseMatcher(PHRASES)
+    words = ['job', 'Title', 'APPLY', 'now', 'salary', 'x', 'y']
+    rng = random.Random(0)
+    for _ in range(200):
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(0, 12)))
+        assert matcher.hits(text) == scan(PHRASES, text), text
@@ -0,0 +1,116 @@
+import asyncio
+import importlib
+import math
+from types import SimpleNamespace
+
+import pytest
+
+politeness = importlib.import_module('my-crawler.politeness')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Ahead of the real clock, which DomainState.updated defaults to, so new
+    # domains start with a full bucket
+    now = [politeness.time.monotonic() + 3600]
+    monkeypatch.setattr(politeness.time, 'monotonic', lambda: now[0])
+
+    def advance(seconds):
+        now[0] += seconds
+
+    return advance
+
+
+def test_token_bucket_paces_each_host(clock):
+    scheduler = politeness.PolitenessScheduler(rate=1.0, burst=2.0, max_concurrency_per_domain=8)
+
+    assert scheduler.try_acquire('https://a.example/1')
+    assert scheduler.try_acquire('https://a.example/2')
+    assert not scheduler.try_acquire('https://a.example/3')
+    assert scheduler.ready_in('https://a.example/3') == pytest.approx(1.0, abs=1e-3)
+    # Other hosts have their own bucket
+    assert scheduler.try_acquire('https://b.example/1')
+
+    clock(0.5)
+    assert scheduler.ready_in('https://a.example/3') == pytest.approx(0.5, abs=1e-3)
+    clock(0.5)
+    assert scheduler.try_acquire('https://a.example/3')
+
+
+def test_concurrency_cap_per_host(clock):
+    scheduler = politeness.PolitenessScheduler(burst=4.0, max_concurrency_per_domain=1)
+
+    assert scheduler.try_acquire('https://a.example/1')
+    assert scheduler.ready_in('https://a.example/2') == math.inf
+    scheduler.release('https://a.example/1')
+    assert scheduler.try_acquire('https://a.example/2')
+
+
+def test_throttled_host_backs_off_and_slows_down(clock):
+    scheduler = politeness.PolitenessScheduler(rate=1.0, max_concurrency_per_domain=8)
+
+    scheduler.observe('https://a.example/1', 0.2, status=429, retry_after='10')
+    assert scheduler.ready_in('https://a.example/2') == pytest.approx(10.0)
+    assert scheduler.metrics()['a.example']['rate'] == 0.5
+    assert scheduler.metrics()['a.example']['throttled'] == 1
+
+    clock(10)
+    assert scheduler.try_acquire('https://a.example/2')
+    # Healthy responses let the rate recover
+    scheduler.observe('https://a.example/2', 0.2, status=200)
+    assert scheduler.metrics()['a.example']['rate'] == 0.6
+
+
+def test_slow_responses_lower_the_rate(clock):
+    scheduler = politeness.PolitenessScheduler(rate=1.0)
+    scheduler.observe('https://a.example/1', 0.1, status=200)
+    for _ in range(10):
+        scheduler.observe('https://a.example/1', 2.0, status=200)
+    assert scheduler.metrics()['a.example']['rate'] < 1.0
+
+
+class ListQueue:
+    def __init__(self, urls):
+        self.pending = [SimpleNamespace(url=url, unique_key=url) for url in urls]
+        self.handled = []
+
+    async def fetch_next_request(self):
+        return self.pending.pop(0) if self.pending else None
+
+    async def is_empty(self):
+        return not self.pending
+
+    async def is_finished(self):
+        return not self.pending
+
+    async def mark_request_as_handled(self, request):
+        self.handled.append(request.url)
+
+
+def test_provider_parks_busy_hosts_and_hands_out_ready_ones(clock):
+    scheduler = politeness.PolitenessScheduler(rate=1.0, burst=2.0, max_concurrency_per_domain=1)
+    inner = ListQueue(['https://a.example/1', 'https://a.example/2', 'https://a.example/3', 'https://b.example/1'])
+    provider = scheduler.wrap(inner)
+
+    async def crawl():
+        first = await provider.fetch_next_request()
+        # a.example has its one slot taken, so its next pages wait behind b.example
+        second = await provider.fetch_next_request()
+        assert [first.url, second.url] == ['https://a.example/1', 'https://b.example/1']
+        assert scheduler.metrics()['a.example']['queued'] == 2
+        assert await provider.fetch_next_request() is None
+        assert not await provider.is_finished()
+
+        await provider.mark_request_as_handled(first)
+        assert (await provider.fetch_next_request()).url == 'https://a.example/2'
+        await provider.mark_request_as_handled(second)
+
+    asyncio.run(crawl())
+    assert inner.handled == ['https://a.example/1', 'https://b.example/1']
+
+
+def test_interleave_by_domain():
+    urls = ['https://a.example/1', 'https://a.example/2', 'https://a.example/3', 'https://b.example/1', 'https://c.example/1']
+    assert politeness.interleave_by_domain(urls) == [
+        'https://a.example/1', 'https://b.example/1', 'https://c.example/1', 'https://a.example/2', 'https://a.example/3'
+    ]
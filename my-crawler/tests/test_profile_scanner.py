@@ -0,0 +1,58 @@
+import importlib
+import re
+
+import pytest
+
+profile_scanner = importlib.import_module('my-crawler.profile_scanner')
+smart_extractor = importlib.import_module('my-crawler.smart_extractor')
+
+PAGES = [
+    'Graduate Software Engineer\nJob Type: Full Time\nLocation: Adelaide, SA. Salary: $85000.00 '
+    'or USD 60000 from 2026-03-01 until 31/03/2026 (posted March 5, 2026). Apply now!',
+    'Two bedroom apartment. RENT: £450 per week, bond €1800.50. Available Jan 10 2026. '
+    'Bedrooms: 2\nPets allowed, close to public transport.',
+    'Page not found. 404 - the page you requested does not exist. Sign in to continue.',
+    '',
+]
+
+
+@pytest.mark.parametrize('content_type', list(smart_extractor.EXTRACTION_PROFILES))
+@pytest.mark.parametrize('page', PAGES)
+def test_scanner_matches_a_search_per_pattern(content_type, page):
+    profile = smart_extractor.EXTRACTION_PROFILES[content_type]
+    result = profile.scanner.scan(page)
+
+    assert result.prices == [m for p in profile_scanner.GENERIC_PRICE_PATTERNS for m in re.findall(p, page)]
+    assert result.dates == [m for p in profile_scanner.GENERIC_DATE_PATTERNS for m in re.findall(p, page)]
+
+    attributes = {}
+    for attr in profile.key_attributes:
+        match = re.search(rf'{re.escape(attr)}\s*:?\s*([^.\n]+)', page, re.IGNORECASE)
+        if match:
+            attributes[attr] = match.group(1).strip()
+    assert profile.scanner.attributes(page) == attributes
+
+
+@pytest.mark.parametrize('content_type', list(smart_extractor.EXTRACTION_PROFILES))
+@pytest.mark.parametrize('page', PAGES)
+def test_phrase_counts_match_a_substring_scan(content_type, page):
+    profile = smart_extractor.EXTRACTION_PROFILES[content_type]
+    lowered = page.lower()
+
+    def found(phrases):
+        return len({phrase.lower() for phrase in phrases if phrase.lower() in lowered})
+
+    hits = profile.phrases.hits(page)
+    assert hits['blacklist'] == found(profile.blacklist_phrases)
+    assert hits['title_blacklist'] == found(profile.title_blacklist_phrases)
+    assert hits['indicator'] == found(profile.content_indicators)
+
+
+def test_scanner_finds_values():
+    profile = smart_extractor.EXTRACTION_PROFILES[smart_extractor.ContentType.JOB]
+    result = profile.scanner.scan(PAGES[0])
+
+    assert result.prices == ['$85000.00', 'USD 60000']
+    assert result.dates == ['2026-03-01', '31/03/2026', 'March 5, 2026']
+    assert profile_scanner.ProfileScanner().attributes(PAGES[0]) == {}
+    assert profile.phrases.hits(PAGES[0])['indicator'] > 0
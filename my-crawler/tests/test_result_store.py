@@ -0,0 +1,76 @@
+import importlib
+import os
+
+import pytest
+
+result_store = importlib.import_module('my-crawler.result_store')
+
+CODECS = ['gz', pytest.param('zst', marks=pytest.mark.skipif(
+    result_store.zstandard is None, reason='zstandard is not installed'
+))]
+
+
+def write_records(path, count, codec, flush_every=10):
+    store = result_store.SegmentedResultStore(path=str(path), flush_every=flush_every, codec=codec)
+    for i in range(count):
+        store.push({'url': f'https://example.com/{i}', 'extracted_data': {'n': i}})
+    store.close()
+    return store
+
+
+def segment_files(path):
+    return sorted(name for name in os.listdir(path) if result_store.SEGMENT_PATTERN.match(name))
+
+
+@pytest.mark.parametrize('codec', CODECS)
+def test_round_trip(tmp_path, codec):
+    store = write_records(tmp_path, 25, codec)
+
+    records = list(result_store.iter_results(path=str(tmp_path)))
+    assert store.records_written == 25
+    assert [record['extracted_data']['n'] for record in records] == list(range(25))
+
+
+@pytest.mark.parametrize('codec', CODECS)
+def test_projection_and_filter(tmp_path, codec):
+    write_records(tmp_path, 10, codec)
+
+    records = list(result_store.iter_results(
+        fields=['extracted_data.n'],
+        where=lambda record: record['extracted_data']['n'] % 2 == 0,
+        path=str(tmp_path)
+    ))
+    assert records == [{'extracted_data.n': n} for n in range(0, 10, 2)]
+
+
+@pytest.mark.parametrize('codec', CODECS)
+def test_reopened_store_starts_a_new_segment(tmp_path, codec):
+    write_records(tmp_path, 5, codec)
+    write_records(tmp_path, 5, codec)
+
+    assert len(segment_files(tmp_path)) == 2
+    assert len(list(result_store.iter_results(path=str(tmp_path)))) == 10
+
+
+@pytest.mark.parametrize('codec', CODECS)
+def test_torn_final_frame_keeps_complete_frames(tmp_path, codec):
+    write_records(tmp_path, 30, codec)
+    segment = tmp_path / segment_files(tmp_path)[0]
+    data = segment.read_bytes()
+    # Cut into the last of the three frames, as a crash mid-write would
+    segment.write_bytes(data[:-7])
+
+    records = list(result_store.iter_results(path=str(tmp_path)))
+    numbers = [record['extracted_data']['n'] for record in records]
+    assert numbers[:20] == list(range(20))
+    assert numbers == list(range(len(numbers)))
+
+
+def test_torn_segment_does_not_hide_later_shards(tmp_path):
+    write_records(tmp_path, 10, 'gz')
+    segment = tmp_path / segment_files(tmp_path)[0]
+    segment.write_bytes(segment.read_bytes()[:-3])
+    write_records(tmp_path / 'shard-00', 5, 'gz')
+
+    records = list(result_store.iter_results(path=str(tmp_path)))
+    assert [record['extracted_data']['n'] for record in records][-5:] == list(range(5))
@@ -0,0 +1,86 @@
+import asyncio
+import importlib
+import time
+
+import pytest
+
+seeding = importlib.import_module('my-crawler.seeding')
+
+QUERY = 'graduate jobs in Adelaide'
+KEYWORDS = ['graduate', 'jobs', 'adelaide']
+
+
+def make_seeder(tmp_path, results):
+    cache = seeding.TTLCache(str(tmp_path / 'seed_cache.json'))
+    # Skips NLTK, which needs its corpora downloaded
+    cache.set(f'keywords:{QUERY}', KEYWORDS)
+    return seeding.SearchSeeder(providers=[seeding.FixtureSearchProvider(results)], cache=cache)
+
+
+def test_search_provider_is_abstract():
+    with pytest.raises(TypeError):
+        seeding.SearchProvider()
+
+
+def test_ttl_cache_hit_and_expiry(tmp_path, monkeypatch):
+    cache = seeding.TTLCache(str(tmp_path / 'cache.json'), ttl=60)
+    cache.set('key', ['value'])
+    assert cache.get('key') == ['value']
+    cache.save()
+
+    reloaded = seeding.TTLCache(str(tmp_path / 'cache.json'), ttl=60).load()
+    assert reloaded.get('key') == ['value']
+    assert reloaded.hits == 1
+
+    now = time.time()
+    monkeypatch.setattr(seeding.time, 'time', lambda: now + 61)
+    assert reloaded.get('key') is None
+    assert reloaded.misses == 1
+    assert seeding.TTLCache(str(tmp_path / 'cache.json')).load().entries == {}
+
+
+def test_query_variants():
+    assert seeding.query_variants(QUERY, KEYWORDS) == ['graduate jobs adelaide', QUERY, 'graduate jobs']
+    # Duplicates and empty strings are dropped
+    assert seeding.query_variants('jobs', ['jobs']) == ['jobs']
+    assert seeding.query_variants('the', []) == ['the']
+
+
+def test_seed_merges_round_robin_and_dedups(tmp_path):
+    seeder = make_seeder(tmp_path, {
+        'graduate jobs adelaide': ['https://a.example/1', 'https://a.example/2', 'https://a.example/3'],
+        QUERY: ['https://b.example/1', 'https://A.example/1/', 'https://www.youtube.com/watch'],
+        'graduate jobs': ['https://c.example/1'],
+    })
+
+    seeds = asyncio.run(seeder.seed(QUERY, 10))
+
+    assert seeds == [
+        'https://a.example/1', 'https://b.example/1', 'https://c.example/1',
+        'https://a.example/2', 'https://a.example/3',
+    ]
+    assert asyncio.run(seeder.seed(QUERY, 2)) == ['https://a.example/1', 'https://b.example/1']
+
+
+def test_seed_results_are_cached(tmp_path):
+    results = {'*': ['https://a.example/1']}
+    seeder = make_seeder(tmp_path, results)
+    asyncio.run(seeder.seed(QUERY, 5))
+
+    results['*'] = ['https://changed.example/']
+    assert asyncio.run(seeder.seed(QUERY, 5)) == ['https://a.example/1']
+
+
+def test_search_errors_are_logged_with_provider_and_query(tmp_path, caplog):
+    class Broken(seeding.SearchProvider):
+        name = 'broken'
+
+        async def search(self, query, num_results):
+            raise RuntimeError('rate limited')
+
+    seeder = seeding.SearchSeeder(providers=[Broken()], cache=make_seeder(tmp_path, {}).cache)
+
+    with caplog.at_level('WARNING', logger=seeding.__name__):
+        assert asyncio.run(seeder.seed(QUERY, 5)) == []
+
+    assert "Search error from broken for 'graduate jobs': rate limited" in caplog.messages
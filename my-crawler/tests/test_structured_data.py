@@ -0,0 +1,84 @@
+import importlib
+import json
+
+structured_data = importlib.import_module('my-crawler.structured_data')
+parsed_document = importlib.import_module('my-crawler.parsed_document')
+
+JOB_POSTING = {
+    '@type': 'JobPosting',
+    'title': 'Graduate Software Engineer',
+    'description': 'Build crawlers.',
+    'datePosted': '2024-05-01',
+    'employmentType': 'FULL_TIME',
+    'hiringOrganization': {'@type': 'Organization', 'name': 'Acme'},
+    'jobLocation': {'@type': 'Place', 'address': {'@type': 'PostalAddress', 'addressLocality': 'Adelaide'}},
+    'baseSalary': {'@type': 'MonetaryAmount', 'value': {'@type': 'QuantitativeValue', 'minValue': 70000}},
+}
+
+
+def page(json_ld, body=''):
+    return (f'<html><head><script type="application/ld+json">{json.dumps(json_ld)}</script>'
+            f'</head><body>{body}</body></html>')
+
+
+def mapped_items(html, content_type):
+    doc = parsed_document.ParsedDocument(html)
+    return [
+        mapping.apply(item)
+        for item in structured_data.iter_structured_items(doc)
+        for mapping in [structured_data.find_mapping(item, content_type)]
+        if mapping is not None
+    ]
+
+
+def test_graph_members_are_mapped():
+    html = page({
+        '@context': 'https://schema.org',
+        '@graph': [
+            {'@type': 'WebPage', 'name': 'Careers'},
+            {'@type': 'BreadcrumbList', 'itemListElement': []},
+            JOB_POSTING,
+        ],
+    })
+
+    [job] = mapped_items(html, 'job')
+
+    assert job == {
+        'title': 'Graduate Software Engineer',
+        'description': 'Build crawlers.',
+        'salary': 70000,
+        'company': 'Acme',
+        'location': 'Adelaide',
+        'date_posted': '2024-05-01',
+        'employment_type': 'FULL_TIME',
+        'structured': True,
+    }
+
+
+def test_types_are_matched_by_short_name():
+    assert structured_data.schema_types({'@type': 'https://schema.org/JobPosting'}) == ['jobposting']
+    assert structured_data.schema_types({'@type': ['schema:Apartment', 'Offer']}) == ['apartment', 'offer']
+
+
+def test_other_content_types_and_generic_do_not_map():
+    html = page({'@graph': [JOB_POSTING]})
+    assert mapped_items(html, 'rental') == []
+    assert mapped_items(html, 'generic') == []
+
+
+def test_wrapped_and_escaped_json_ld():
+    raw = json.dumps(JOB_POSTING).replace('"', '&quot;')
+    html = f'<script type="application/ld+json"><!-- {raw} --></script>'
+    assert [item['title'] for item in structured_data.iter_json_ld(html)] == ['Graduate Software Engineer']
+
+
+def test_microdata_items_are_shaped_like_json_ld():
+    html = (
+        '<div itemscope itemtype="https://schema.org/Apartment">'
+        '<span itemprop="name">Two bedroom flat</span>'
+        '<div itemprop="address" itemscope itemtype="https://schema.org/PostalAddress">'
+        '<span itemprop="addressLocality">Norwood</span></div></div>'
+    )
+    [rental] = mapped_items(html, 'rental')
+    assert rental['title'] == 'Two bedroom flat'
+    assert rental['location'] == 'Norwood'
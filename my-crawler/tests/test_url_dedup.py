@@ -0,0 +1,48 @@
+import importlib
+
+url_dedup = importlib.import_module('my-crawler.url_dedup')
+
+
+def test_canonicalize_url_variants_compare_equal():
+    canonical = url_dedup.canonicalize_url('https://example.com/jobs?a=1&b=2')
+    assert url_dedup.canonicalize_url('HTTPS://Example.COM:443/jobs/?b=2&a=1&utm_source=x#top') == canonical
+    assert url_dedup.canonicalize_url('https://example.com/jobs?gclid=abc&a=1&b=2') == canonical
+    assert url_dedup.canonicalize_url('https://example.com:8443/') == 'https://example.com:8443/'
+
+
+def test_bloom_filter_add_and_contains():
+    seen = url_dedup.BloomFilter(capacity=1000, error_rate=0.01)
+    assert seen.add('https://example.com/a') is False
+    assert seen.add('https://example.com/a') is True
+    assert 'https://example.com/a' in seen
+    assert 'https://example.com/b' not in seen
+
+    stats = seen.stats()
+    assert stats['items'] == 1
+    assert stats['duplicate_rate'] == 0.5
+
+
+def test_bloom_filter_false_positive_rate_is_near_target():
+    seen = url_dedup.BloomFilter(capacity=2000, error_rate=0.01)
+    for i in range(2000):
+        seen.add(f'https://example.com/{i}')
+    false_positives = sum(f'https://other.example/{i}' in seen for i in range(5000))
+    assert false_positives / 5000 < 0.03
+
+
+def test_bloom_filter_max_bytes_caps_size():
+    seen = url_dedup.BloomFilter(capacity=1_000_000, error_rate=0.001, max_bytes=1024)
+    assert seen.size_bytes == 1024
+
+
+def test_bloom_filter_file_survives_reopen(tmp_path):
+    path = str(tmp_path / 'seen.bloom')
+    seen = url_dedup.BloomFilter(capacity=1000, path=path)
+    seen.add('https://example.com/a')
+    seen.flush()
+    seen.close()
+
+    reopened = url_dedup.BloomFilter(capacity=1000, path=path)
+    assert 'https://example.com/a' in reopened
+    reopened.close()
+
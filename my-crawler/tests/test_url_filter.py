@@ -0,0 +1,14 @@
+import importlib
+
+url_filter = importlib.import_module('my-crawler.url_filter')
+
+
+def test_url_filter_budget_and_seen_set():
+    frontier = url_filter.UrlFilter(max_pages_per_domain=2)
+    allowed = frontier.filter_urls([
+        'https://a.example/1', 'https://a.example/1/', 'https://a.example/2',
+        'https://a.example/3', 'https://a.example/login', 'https://b.example/1',
+    ])
+    assert allowed == ['https://a.example/1', 'https://a.example/2', 'https://b.example/1']
+    assert frontier.drain_changed_domains() == {'a.example': 2, 'b.example': 1}
+    assert frontier.drain_changed_domains() == {}